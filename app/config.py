@@ -54,6 +54,9 @@ LANG_MAP = {
         "sync_data_success": "Versions synced successfully!",
         "sync_data_latest": "Version list is up to date",
         "refresh_data": "Refresh Version List",
+        "search_changelogs": "Search changelogs...",
+        "search_no_results": "No matching releases",
+        "search_not_listed": "{} is no longer listed, showing its changelog",
         
         "download_preparing": "Preparing download",
         "downloading": "Downloading",
@@ -81,7 +84,6 @@ LANG_MAP = {
         "firmware_install_confirm_local": "Install firmware {}?\n\nThis will replace existing firmware files.",
         "firmware_already_installed": "Version {} is already installed.\nAre you sure you want to reinstall?",
         "firmware_downloading": "Downloading Firmware...",
-        "firmware_verifying": "Verifying Integrity...",
         "firmware_installing": "Installing Firmware...",
         "firmware_install_success": "Success",
         "firmware_install_failed": "Failed",
@@ -107,6 +109,13 @@ LANG_MAP = {
         "lang": "Language",
         "downloader_engine": "Download Engine",
         "fetch_limit": "Fetch Limit",
+        "max_concurrent_downloads": "Max Concurrent Downloads",
+        "download_speed_limit": "Download Speed Limit",
+        "speed_unlimited": "Unlimited",
+        "download_queued": "Queued",
+        "download_paused": "Paused",
+        "pause": "Pause",
+        "resume": "Resume",
         "keep_archive": "Keep Eden Archive",
         "disable_ipv6": "Disable IPv6 (Aria2)",
         "aria2_verbose_log": "Verbose Log (Aria2)",
@@ -114,6 +123,9 @@ LANG_MAP = {
         "firmware_path": "Firmware Path",
         "keep_firmware_archive": "Keep Firmware Archive",
         "verify_firmware_checksum": "Verify Firmware (SHA256)",
+        "api_mirror": "API Mirror",
+        "download_mirror": "Download Mirror",
+        "mirror_placeholder": "Empty = GitHub (e.g. http://mirror.lan/api)",
         "dl_auto": "Auto (Aria2 Preferred)",
         "dl_requests": "Internal (Requests)",
         "open_user_folder": "Open Eden Data Folder",
@@ -256,6 +268,9 @@ LANG_MAP = {
         "sync_data_success": "版本同步成功",
         "sync_data_latest": "版本列表已是最新",
         "refresh_data": "刷新版本列表",
+        "search_changelogs": "搜索更新日志...",
+        "search_no_results": "没有匹配的版本",
+        "search_not_listed": "{} 已不在列表中，显示其更新日志",
         
         "download_preparing": "正在准备下载",
         "downloading": "正在下载...",
@@ -283,7 +298,6 @@ LANG_MAP = {
         "firmware_install_confirm_local": "安装固件 {}?\n\n这将替换现有的固件文件。",
         "firmware_already_installed": "版本 {} 已经安装。\n确定要重新安装吗？",
         "firmware_downloading": "正在下载固件...",
-        "firmware_verifying": "正在校验完整性...",
         "firmware_installing": "正在安装固件...",
         "firmware_install_success": "固件安装成功",
         "firmware_install_failed": "固件安装失败",
@@ -309,6 +323,13 @@ LANG_MAP = {
         "lang": "界面语言",
         "downloader_engine": "下载引擎",
         "fetch_limit": "版本显示数量",
+        "max_concurrent_downloads": "同时下载数",
+        "download_speed_limit": "下载限速",
+        "speed_unlimited": "不限速",
+        "download_queued": "排队中",
+        "download_paused": "已暂停",
+        "pause": "暂停",
+        "resume": "继续",
         "keep_archive": "保留 Eden 压缩包",
         "disable_ipv6": "禁用 IPv6 (Aria2)",
         "aria2_verbose_log": "详细日志 (Aria2)",
@@ -316,6 +337,9 @@ LANG_MAP = {
         "firmware_path": "固件保存位置",
         "keep_firmware_archive": "固件安装后保留压缩包",
         "verify_firmware_checksum": "校验固件完整性 (SHA256)",
+        "api_mirror": "API 镜像",
+        "download_mirror": "下载镜像",
+        "mirror_placeholder": "留空使用 GitHub (例如 http://mirror.lan/api)",
         "dl_auto": "自动 (优先 Aria2)",
         "dl_requests": "内部 (Python Requests)",
         "open_user_folder": "打开 Eden 配置文件夹",
@@ -455,6 +479,9 @@ LANG_MAP = {
         "sync_data_success": "版本同步成功",
         "sync_data_latest": "版本列表已是最新",
         "refresh_data": "刷新版本列表",
+        "search_changelogs": "搜尋更新日誌...",
+        "search_no_results": "沒有符合的版本",
+        "search_not_listed": "{} 已不在列表中，顯示其更新日誌",
         "download_preparing": "正在準備下載",
         "downloading": "正在下載...",
         "download_cancelled": "下載已取消",
@@ -479,7 +506,6 @@ LANG_MAP = {
         "firmware_install_confirm_local": "安裝固件 {}?\n\n這將替換現有的固件文件。",
         "firmware_already_installed": "版本 {} 已經安裝。\n確定要重新安裝嗎？",
         "firmware_downloading": "正在下載固件...",
-        "firmware_verifying": "正在校驗完整性...",
         "firmware_installing": "正在安裝固件...",
         "firmware_install_success": "固件安裝成功",
         "firmware_install_failed": "固件安裝失敗",
@@ -503,6 +529,13 @@ LANG_MAP = {
         "lang": "界面語言",
         "downloader_engine": "下載引擎",
         "fetch_limit": "版本顯示數量",
+        "max_concurrent_downloads": "同時下載數",
+        "download_speed_limit": "下載限速",
+        "speed_unlimited": "不限速",
+        "download_queued": "排隊中",
+        "download_paused": "已暫停",
+        "pause": "暫停",
+        "resume": "繼續",
         "keep_archive": "保留 Eden 壓縮包",
         "disable_ipv6": "禁用 IPv6 (Aria2)",
         "aria2_verbose_log": "詳細日誌 (Aria2)",
@@ -510,6 +543,9 @@ LANG_MAP = {
         "firmware_path": "固件保存位置",
         "keep_firmware_archive": "固件安裝後保留壓縮包",
         "verify_firmware_checksum": "校驗固件完整性 (SHA256)",
+        "api_mirror": "API 鏡像",
+        "download_mirror": "下載鏡像",
+        "mirror_placeholder": "留空使用 GitHub (例如 http://mirror.lan/api)",
         "dl_auto": "自動 (優先 Aria2)",
         "dl_requests": "內部 (Python Requests)",
         "open_user_folder": "打開 Eden 配置資料夾",
@@ -640,6 +676,9 @@ LANG_MAP = {
         "sync_data_success": "同期成功",
         "sync_data_latest": "バージョンリストは最新です",
         "refresh_data": "リストを更新",
+        "search_changelogs": "更新履歴を検索...",
+        "search_no_results": "一致するリリースはありません",
+        "search_not_listed": "{} は一覧にありません。更新履歴を表示します",
         "download_preparing": "ダウンロード準備中",
         "downloading": "ダウンロード中...",
         "download_cancelled": "ダウンロードキャンセル",
@@ -667,7 +706,6 @@ LANG_MAP = {
         "firmware_installing": "ファームウェアをインストール中...",
         "firmware_install_success": "ファームウェアをインストールしました",
         "firmware_install_failed": "インストール失敗",
-        "firmware_verifying": "整合性を確認中...",
         "firmware_restart_title": "再起動が必要",
         "firmware_restart_msg": "ファームウェアが正常にインストールされました。\n\n今すぐ Eden を起動してインストールを確認しますか？",
         "start_eden": "Eden を起動",
@@ -688,6 +726,13 @@ LANG_MAP = {
         "lang": "言語",
         "downloader_engine": "ダウンロードエンジン",
         "fetch_limit": "表示件数",
+        "max_concurrent_downloads": "同時ダウンロード数",
+        "download_speed_limit": "ダウンロード速度制限",
+        "speed_unlimited": "無制限",
+        "download_queued": "待機中",
+        "download_paused": "一時停止中",
+        "pause": "一時停止",
+        "resume": "再開",
         "keep_archive": "Eden アーカイブを保持",
         "disable_ipv6": "IPv6 を無効化 (Aria2)",
         "aria2_verbose_log": "詳細ログ (Aria2)",
@@ -695,6 +740,9 @@ LANG_MAP = {
         "firmware_path": "ファームウェア保存先",
         "keep_firmware_archive": "ファームウェアアーカイブを保持",
         "verify_firmware_checksum": "ファームウェア整合性確認 (SHA256)",
+        "api_mirror": "API ミラー",
+        "download_mirror": "ダウンロードミラー",
+        "mirror_placeholder": "空欄で GitHub (例: http://mirror.lan/api)",
         "dl_auto": "自動 (Aria2 推奨)",
         "dl_requests": "内部 (Python Requests)",
         "open_user_folder": "ユーザーフォルダを開く",
@@ -825,6 +873,9 @@ LANG_MAP = {
         "sync_data_success": "동기화 성공",
         "sync_data_latest": "최신 상태입니다",
         "refresh_data": "새로고침",
+        "search_changelogs": "변경 로그 검색...",
+        "search_no_results": "일치하는 릴리스가 없습니다",
+        "search_not_listed": "{}은(는) 목록에 없어 변경 로그만 표시합니다",
         "download_preparing": "다운로드 준비 중",
         "downloading": "다운로드 중...",
         "download_cancelled": "다운로드 취소됨",
@@ -852,7 +903,6 @@ LANG_MAP = {
         "firmware_installing": "펌웨어 설치 중...",
         "firmware_install_success": "설치 성공",
         "firmware_install_failed": "설치 실패",
-        "firmware_verifying": "무결성 확인 중...",
         "firmware_restart_title": "재시작 필요",
         "firmware_restart_msg": "펌웨어가 성공적으로 설치되었습니다.\n\n지금 Eden을 실행하여 설치를 확인하시겠습니까?",
         "start_eden": "Eden 실행",
@@ -873,6 +923,13 @@ LANG_MAP = {
         "lang": "언어",
         "downloader_engine": "다운로드 엔진",
         "fetch_limit": "표시 개수",
+        "max_concurrent_downloads": "동시 다운로드 수",
+        "download_speed_limit": "다운로드 속도 제한",
+        "speed_unlimited": "무제한",
+        "download_queued": "대기 중",
+        "download_paused": "일시 중지됨",
+        "pause": "일시 중지",
+        "resume": "재개",
         "keep_archive": "Eden 아카이브 유지",
         "disable_ipv6": "IPv6 비활성화 (Aria2)",
         "aria2_verbose_log": "상세 로그 (Aria2)",
@@ -880,6 +937,9 @@ LANG_MAP = {
         "firmware_path": "펌웨어 경로",
         "keep_firmware_archive": "펌웨어 아카이브 유지",
         "verify_firmware_checksum": "펌웨어 무결성 검사 (SHA256)",
+        "api_mirror": "API 미러",
+        "download_mirror": "다운로드 미러",
+        "mirror_placeholder": "비워두면 GitHub (예: http://mirror.lan/api)",
         "dl_auto": "자동 (Aria2 권장)",
         "dl_requests": "내부 (Python Requests)",
         "open_user_folder": "사용자 폴더 열기",
@@ -1008,6 +1068,9 @@ LANG_MAP = {
         "sync_data_success": "Успешно",
         "sync_data_latest": "Список версий обновлен",
         "refresh_data": "Обновить список",
+        "search_changelogs": "Поиск по журналам изменений...",
+        "search_no_results": "Совпадений не найдено",
+        "search_not_listed": "{} больше нет в списке, показан журнал изменений",
         "download_preparing": "Подготовка",
         "downloading": "Скачивание...",
         "download_cancelled": "Отменено",
@@ -1035,7 +1098,6 @@ LANG_MAP = {
         "firmware_installing": "Установка...",
         "firmware_install_success": "Успешно",
         "firmware_install_failed": "Ошибка",
-        "firmware_verifying": "Проверка целостности...",
         "firmware_restart_title": "Требуется перезапуск",
         "firmware_restart_msg": "Прошивка успешно установлена.\n\nЗапустить Eden сейчас для проверки?",
         "start_eden": "Запустить Eden",
@@ -1056,6 +1118,13 @@ LANG_MAP = {
         "lang": "Язык",
         "downloader_engine": "Движок загрузки",
         "fetch_limit": "Лимит версий",
+        "max_concurrent_downloads": "Одновременных загрузок",
+        "download_speed_limit": "Ограничение скорости",
+        "speed_unlimited": "Без ограничений",
+        "download_queued": "В очереди",
+        "download_paused": "Пауза",
+        "pause": "Пауза",
+        "resume": "Продолжить",
         "keep_archive": "Сохранять архивы Eden",
         "disable_ipv6": "Отключить IPv6 (Aria2)",
         "aria2_verbose_log": "Подробный лог (Aria2)",
@@ -1063,6 +1132,9 @@ LANG_MAP = {
         "firmware_path": "Путь к прошивкам",
         "keep_firmware_archive": "Сохранять архивы ПО",
         "verify_firmware_checksum": "Проверка SHA256",
+        "api_mirror": "Зеркало API",
+        "download_mirror": "Зеркало загрузок",
+        "mirror_placeholder": "Пусто = GitHub (напр. http://mirror.lan/api)",
         "dl_auto": "Авто (Aria2)",
         "dl_requests": "Встроенный (Requests)",
         "open_user_folder": "Открыть папку данных",
@@ -1192,6 +1264,9 @@ LANG_MAP = {
         "sync_data_success": "Sucesso",
         "sync_data_latest": "Lista atualizada",
         "refresh_data": "Atualizar lista",
+        "search_changelogs": "Pesquisar changelogs...",
+        "search_no_results": "Nenhuma versão encontrada",
+        "search_not_listed": "{} não está mais na lista, exibindo o changelog",
         "download_preparing": "Preparando",
         "downloading": "Baixando...",
         "download_cancelled": "Cancelado",
@@ -1219,7 +1294,6 @@ LANG_MAP = {
         "firmware_installing": "Instalando...",
         "firmware_install_success": "Instalado com sucesso",
         "firmware_install_failed": "Falha na instalação",
-        "firmware_verifying": "Verificando integridade...",
         "firmware_restart_title": "Reinício necessário",
         "firmware_restart_msg": "Firmware instalado com sucesso.\n\nIniciar Eden agora para verificar?",
         "start_eden": "Iniciar Eden",
@@ -1240,6 +1314,13 @@ LANG_MAP = {
         "lang": "Idioma",
         "downloader_engine": "Motor de Download",
         "fetch_limit": "Limite de versões",
+        "max_concurrent_downloads": "Downloads simultâneos",
+        "download_speed_limit": "Limite de velocidade",
+        "speed_unlimited": "Ilimitado",
+        "download_queued": "Na fila",
+        "download_paused": "Pausado",
+        "pause": "Pausar",
+        "resume": "Retomar",
         "keep_archive": "Manter arquivos Eden",
         "disable_ipv6": "Desativar IPv6",
         "aria2_verbose_log": "Log detalhado (Aria2)",
@@ -1247,6 +1328,9 @@ LANG_MAP = {
         "firmware_path": "Caminho de Firmware",
         "keep_firmware_archive": "Manter arquivo de firmware",
         "verify_firmware_checksum": "Verificar integridade (SHA256)",
+        "api_mirror": "Espelho da API",
+        "download_mirror": "Espelho de download",
+        "mirror_placeholder": "Vazio = GitHub (ex.: http://mirror.lan/api)",
         "dl_auto": "Auto (Aria2)",
         "dl_requests": "Interno (Requests)",
         "open_user_folder": "Abrir pasta de dados",
@@ -1376,6 +1460,9 @@ LANG_MAP = {
         "sync_data_success": "Succès",
         "sync_data_latest": "Liste à jour",
         "refresh_data": "Actualiser",
+        "search_changelogs": "Rechercher dans les notes...",
+        "search_no_results": "Aucune version correspondante",
+        "search_not_listed": "{} n'est plus listée, affichage de ses notes",
         "download_preparing": "Préparation",
         "downloading": "Téléchargement...",
         "download_cancelled": "Annulé",
@@ -1403,7 +1490,6 @@ LANG_MAP = {
         "firmware_installing": "Installation du firmware...",
         "firmware_install_success": "Succès",
         "firmware_install_failed": "Échec",
-        "firmware_verifying": "Vérification de l'intégrité...",
         "firmware_restart_title": "Redémarrage requis",
         "firmware_restart_msg": "Firmware installé avec succès.\n\nLancer Eden maintenant pour vérifier ?",
         "start_eden": "Lancer Eden",
@@ -1424,6 +1510,13 @@ LANG_MAP = {
         "lang": "Langue",
         "downloader_engine": "Moteur de téléchargement",
         "fetch_limit": "Limite de récupération",
+        "max_concurrent_downloads": "Téléchargements simultanés",
+        "download_speed_limit": "Limite de vitesse",
+        "speed_unlimited": "Illimité",
+        "download_queued": "En attente",
+        "download_paused": "En pause",
+        "pause": "Pause",
+        "resume": "Reprendre",
         "keep_archive": "Conserver les archives Eden",
         "disable_ipv6": "Désactiver IPv6 (Aria2)",
         "aria2_verbose_log": "Journal détaillé (Aria2)",
@@ -1431,6 +1524,9 @@ LANG_MAP = {
         "firmware_path": "Chemin du firmware",
         "keep_firmware_archive": "Conserver l'archive du firmware",
         "verify_firmware_checksum": "Vérifier Firmware (SHA256)",
+        "api_mirror": "Miroir API",
+        "download_mirror": "Miroir de téléchargement",
+        "mirror_placeholder": "Vide = GitHub (ex. http://mirror.lan/api)",
         "dl_auto": "Auto (Aria2)",
         "dl_requests": "Interne (Requests)",
         "open_user_folder": "Ouvrir dossier données",
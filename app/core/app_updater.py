@@ -1,21 +1,49 @@
 import os
 import sys
-import json
-import time
 import webbrowser
 import subprocess
 
-import requests
 from PySide6.QtCore import QObject, Qt, QTimer, QPropertyAnimation, QEasingCurve, QPoint, QThread, Signal
 from PySide6.QtGui import QColor
-from qfluentwidgets import InfoBar, InfoBarPosition, MessageBox, FluentIcon as FIF
+from qfluentwidgets import InfoBar, InfoBarPosition, MessageBox, TransparentToolButton, FluentIcon as FIF
 
 from app.config import CURRENT_VERSION
 from app.utils.downloader import DownloadThread
+from app.utils.download_queue import PRIORITY_HIGH, QUEUED, ACTIVE, PAUSED
+from app.core.github_api import APP_REPO, latest_release_url, prefetch_startup
+from app.utils import http_client
+from app.utils.response_cache import get_response_cache, ttl_for
+from app.utils.rate_limit import RateLimitedError, PRIORITY_BACKGROUND
+from app.utils.connectivity import get_monitor, OfflineError
 
 from app.utils.logger import get_logger
 logger = get_logger(__name__)
 
+def _parse_release(data):
+    """Extract tag, page and the platform-compatible binary from a GitHub release payload."""
+    result = {
+        "tag": data.get("tag_name", ""),
+        "html_url": data.get("html_url"),
+        "exe_url": None,
+        "exe_name": None,
+        "exe_digest": None
+    }
+
+    # Find compatible asset
+    for asset in data.get("assets", []):
+        name = asset['name'].lower()
+        if sys.platform == "win32" and name.endswith(".exe"):
+            result["exe_url"] = asset['browser_download_url']
+            result["exe_name"] = asset['name']
+            result["exe_digest"] = asset.get('digest')
+            break
+        elif sys.platform == "linux" and ("linux" in name or name.endswith(".appimage")):
+            result["exe_url"] = asset['browser_download_url']
+            result["exe_name"] = asset['name']
+            result["exe_digest"] = asset.get('digest')
+            break
+    return result
+
 class UpdateCheckWorker(QThread):
     finished = Signal(bool, dict)
 
@@ -24,37 +52,21 @@ class UpdateCheckWorker(QThread):
         self.repo = repo
 
     def run(self):
-        url = f"https://api.github.com/repos/{self.repo}/releases/latest"
-        headers = {'Accept': 'application/vnd.github.v3+json', 'User-Agent': 'EmuMan-App-Client'}
+        url = latest_release_url(self.repo)
         
         try:
-            res = requests.get(url, headers=headers, timeout=8)
-            if res.status_code != 200:
-                self.finished.emit(False, {})
-                return
-                
-            data = res.json()
-            result = {
-                "tag": data.get("tag_name", ""),
-                "html_url": data.get("html_url"),
-                "exe_url": None,
-                "exe_name": None
-            }
-            
-            # Find compatible asset
-            for asset in data.get("assets", []):
-                name = asset['name'].lower()
-                if sys.platform == "win32" and name.endswith(".exe"):
-                    result["exe_url"] = asset['browser_download_url']
-                    result["exe_name"] = asset['name']
-                    break
-                elif sys.platform == "linux" and ("linux" in name or name.endswith(".appimage")):
-                    result["exe_url"] = asset['browser_download_url']
-                    result["exe_name"] = asset['name']
-                    break
-            
-            self.finished.emit(True, result)
+            if self.repo == APP_REPO:
+                prefetch_startup(PRIORITY_BACKGROUND)
+            res = get_response_cache().fetch(url, ttl_for("app_update"), headers=http_client.github_headers(),
+                                             timeout=8, stale_if_error=False, priority=PRIORITY_BACKGROUND)
+            self.finished.emit(True, _parse_release(res.json()))
             
+        except RateLimitedError as e:
+            logger.info(f"Self-update check deferred: {e}")
+            self.finished.emit(False, {"retry_after": e.retry_after()})
+        except OfflineError as e:
+            logger.info(f"Self-update check skipped: {e}")
+            self.finished.emit(False, {"offline": True})
         except Exception as e:
             logger.warning(f"Self-update check failed in worker: {e}")
             self.finished.emit(False, {})
@@ -62,12 +74,13 @@ class UpdateCheckWorker(QThread):
 class AppUpdater(QObject):
     """Encapsulates self-update logic including UI feedback, download flow and process replacement."""
     
-    def __init__(self, repo="pflyly/EmuMan"):
+    def __init__(self, repo=APP_REPO):
         super().__init__()
         self.repo = repo
         self.latest_version = None
         self.update_exe_url = None
         self.update_exe_name = None
+        self.update_exe_digest = None
         self.html_url = None
         
         # UI References (weak injection)
@@ -79,8 +92,12 @@ class AppUpdater(QObject):
         
         self.anim = None
         self.new_app_path = None
+        self.dl_info = None
         
         self.check_worker = None
+        # A check skipped while offline runs again once the network is back
+        self.offline_check_pending = False
+        get_monitor().online.connect(self._on_back_online)
 
     # =========================================
     #             Public API
@@ -96,22 +113,23 @@ class AppUpdater(QObject):
 
     def check_for_updates(self):
         """
-        Check for updates via local cache or network (Async).
+        Check for updates via the shared response cache or network (Async).
         Returns: (bool available, str version) -> Only for cache hit. Network result is async.
         """
-        cache_path = os.path.join("cache", "app_cache.json")
-        
-        # 1. Try Local Cache
-        cache_data = self._load_cache(cache_path)
-        is_cache_valid = (time.time() - cache_data.get("timestamp", 0) < 86400)
-        cached_version = cache_data.get("version")
-
-        if is_cache_valid and cached_version:
-            if cached_version != CURRENT_VERSION:
-                self._apply_cached_data(cache_data)
-                self._show_update_notice()
-                return True, cached_version
-            return False, None
+        # 1. Try Local Cache (a response younger than the app_update TTL)
+        cached = get_response_cache().peek(latest_release_url(self.repo), max_age=ttl_for("app_update"))
+        if cached:
+            try:
+                data = _parse_release(cached.json())
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable cached release info: {e}")
+                data = None
+            if data:
+                if data["tag"] and data["tag"] != CURRENT_VERSION:
+                    self._apply_release(data, cached=True)
+                    self._show_update_notice()
+                    return True, data["tag"]
+                return False, None
         
         # 2. Start Async Network Check
         self.start_check_update_async()
@@ -126,32 +144,26 @@ class AppUpdater(QObject):
         self.check_worker.start()
 
     def _on_check_finished(self, success, data):
-        cache_path = os.path.join("cache", "app_cache.json")
-        
-        if success:
-            tag = data.get("tag")
-            if tag and tag != CURRENT_VERSION:
-                self._save_cache(cache_path, tag, data["html_url"], data["exe_url"], data["exe_name"])
-                self.update_exe_url = data["exe_url"]
-                self.update_exe_name = data["exe_name"]
-                self.html_url = data["html_url"]
-                self.latest_version = tag
-                
-                if not self.update_exe_url:
-                    logger.warning(f"New version {tag} detected but no compatible binary found.")
-                else:
-                    logger.info(f"New EmuMan Available: {tag} -> {self.update_exe_name}")
-                    
-                self._show_update_notice()
+        # The response itself is persisted by the response cache; a stale entry is
+        # never served past its TTL, so a failed check needs no cleanup here.
+        if not success:
+            if "retry_after" in data:
+                # Out of API budget: check again once the window resets instead of failing for this session
+                QTimer.singleShot((data["retry_after"] + 5) * 1000, self.start_check_update_async)
+            elif data.get("offline"):
+                self.offline_check_pending = True
+            return
+
+        tag = data.get("tag")
+        if tag and tag != CURRENT_VERSION:
+            self._apply_release(data)
+            
+            if not self.update_exe_url:
+                logger.warning(f"New version {tag} detected but no compatible binary found.")
             else:
-                self._save_cache(cache_path, tag or CURRENT_VERSION, data["html_url"], None, None)
-        else:
-            # Network failed, check if we have stale cache to clear
-            cache_data = self._load_cache(cache_path)
-            is_cache_valid = (time.time() - cache_data.get("timestamp", 0) < 86400)
-            if cache_data.get("version") and not is_cache_valid:
-                 logger.info("Cache is stale and network failed. Clearing invalid cache.")
-                 self._delete_cache(cache_path)
+                logger.info(f"New EmuMan Available: {tag} -> {self.update_exe_name}")
+                
+            self._show_update_notice()
 
     def start_self_update(self):
         """Triggers the full confirmation -> download -> restart flow."""
@@ -181,26 +193,66 @@ class AppUpdater(QObject):
         os.makedirs(temp_dir, exist_ok=True)
         self.new_app_path = os.path.join(temp_dir, self.update_exe_name)
         
-        # 2. Show Progress InfoBar
+        # 2. Show Progress InfoBar (pause button toggles the download, closing it cancels)
         self.dl_info = InfoBar.info(
             title=self.lang.get("downloading", "Downloading update..."),
             content=self.update_exe_name,
             orient=Qt.Horizontal,
-            isClosable=False,
+            isClosable=True,
             position=InfoBarPosition.TOP,
             duration=-1,
             parent=self.parent_win
         )
+        self.dl_pause_btn = TransparentToolButton(FIF.PAUSE, self.dl_info)
+        self.dl_pause_btn.setToolTip(self.lang.get("pause", "Pause"))
+        self.dl_pause_btn.clicked.connect(self._toggle_download_pause)
+        self.dl_info.addWidget(self.dl_pause_btn)
+        self.dl_info.destroyed.connect(self._on_download_info_closed)
         
         # 3. Start Download
-        self.thread = DownloadThread(self.update_exe_url, self.new_app_path)
-        self.thread.progress.connect(lambda p, s="": self.dl_info.titleLabel.setText(f"{self.lang.get('downloading')}: {p}%" + (f" - {s}" if s else "")))
+        # Jumps ahead of queued emulator/firmware downloads
+        self.thread = DownloadThread(self.update_exe_url, self.new_app_path, PRIORITY_HIGH, self.update_exe_name,
+                                     self.update_exe_digest)
+        self.thread.progress.connect(self._on_download_progress)
+        self.thread.state_changed.connect(self._on_download_state)
+        self._on_download_state(self.thread.state)
         self.thread.finished.connect(self._on_download_complete)
+        self.thread.cancelled.connect(lambda: InfoBar.info(self.lang.get("download_cancelled", "Download Cancelled"),
+                                                           self.update_exe_name, parent=self.parent_win, duration=2000))
         self.thread.start()
 
+    def _on_download_progress(self, percent, speed=""):
+        if self.dl_info and self.thread.state == ACTIVE:
+            self.dl_info.titleLabel.setText(f"{self.lang.get('downloading')}: {percent}%" + (f" - {speed}" if speed else ""))
+
+    def _on_download_state(self, state):
+        """Queue state of the update download (queued / active / paused)."""
+        if not self.dl_info:
+            return
+        paused = state == PAUSED
+        self.dl_pause_btn.setIcon(FIF.PLAY if paused else FIF.PAUSE)
+        self.dl_pause_btn.setToolTip(self.lang.get("resume" if paused else "pause", ""))
+        if state in (PAUSED, QUEUED):
+            self.dl_info.titleLabel.setText(self.lang.get(f"download_{state}", state.capitalize()))
+
+    def _toggle_download_pause(self):
+        if self.thread.state == PAUSED:
+            self.thread.resume()
+        else:
+            self.thread.pause()
+
+    def _on_download_info_closed(self):
+        """The user closed the progress InfoBar: cancel the update download."""
+        if self.dl_info is not None:
+            self.dl_info = None
+            logger.info("User cancelled the update download.")
+            self.thread.stop()
+
     def _on_download_complete(self, success, msg):
-        if hasattr(self, 'dl_info') and self.dl_info:
-            self.dl_info.close()
+        # Cleared first so closing the InfoBar does not count as a cancel
+        info, self.dl_info = self.dl_info, None
+        if info:
+            info.close()
             
         if not success:
             InfoBar.error("Update Failed", f"Unable to download: {msg}", parent=self.parent_win)
@@ -268,43 +320,20 @@ class AppUpdater(QObject):
         self.anim.setLoopCount(-1)
         self.anim.start()
 
+    def _on_back_online(self):
+        if self.offline_check_pending:
+            self.offline_check_pending = False
+            self.start_check_update_async()
+
     # =========================================
-    #            Cache Helpers
+    #            Release Helpers
     # =========================================
 
-    def _load_cache(self, cache_path):
-        if not os.path.exists(cache_path): return {}
-        try:
-            with open(cache_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception: return {}
-
-    def _save_cache(self, cache_path, version, html_url, download_url, filename):
-        try:
-            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
-            data = {
-                "version": version,
-                "html_url": html_url,
-                "download_url": download_url,
-                "filename": filename,
-                "timestamp": time.time()
-            }
-            with open(cache_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=4)
-        except Exception as e:
-            logger.error(f"Failed to save app cache: {e}")
-
-    def _apply_cached_data(self, data):
-        logger.info(f"New EmuMan Available (Cached): {data.get('version')}")
-        self.latest_version = data.get("version")
+    def _apply_release(self, data, cached=False):
+        if cached:
+            logger.info(f"New EmuMan Available (Cached): {data.get('tag')}")
+        self.latest_version = data.get("tag")
         self.html_url = data.get("html_url")
-        self.update_exe_url = data.get("download_url")
-        self.update_exe_name = data.get("filename")
-
-    def _delete_cache(self, cache_path):
-        if os.path.exists(cache_path):
-            try:
-                os.remove(cache_path)
-                logger.info("Stale cache file removed.")
-            except Exception as e:
-                logger.warning(f"Failed to remove stale cache: {e}")
+        self.update_exe_url = data.get("exe_url")
+        self.update_exe_name = data.get("exe_name")
+        self.update_exe_digest = data.get("exe_digest")
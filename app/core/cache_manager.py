@@ -1,124 +1,364 @@
 import os
-import json
 import time
 import hashlib
-import requests
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Optional
-from PySide6.QtCore import QObject, Signal, QThread
+from PySide6.QtCore import QObject, Signal, QThread, QTimer
+from PySide6.QtGui import QTextDocument
 
+from app.core.release_catalog import ReleaseCatalog
+from app.core.version_manager import VersionManager
+from app.core.github_api import (MASTER_REPO, NIGHTLY_REPO, MAX_PAGE_SIZE, INCREMENTAL_PAGE_SIZE,
+                                  release_list_url, prefetch_startup)
+from app.utils import http_client
+from app.utils.config_store import load_config
+from app.utils.lru_cache import LRUCache
+from app.utils.json_stream import iter_json_array
+from app.utils.json_store import JsonStore
+from app.utils.file_lock import FileLock
+from app.utils.connectivity import get_monitor
+from app.utils.path_utils import get_cache_dir
+from app.utils.response_cache import get_response_cache, ttl_for
+from app.utils.rate_limit import get_tracker, RateLimitedError, PRIORITY_USER, PRIORITY_BACKGROUND
 from app.utils.logger import get_logger
 logger = get_logger(__name__)
 
+def _extract_master_changelog(body):
+    """Master release bodies carry the changelog before the package list."""
+    return body.split("# Packages")[0].strip()
+
+def _extract_nightly_changelog(body):
+    """Robust changelog extraction for nightly release bodies."""
+    clean_body = body[:800]
+    start_marks = ["## Changelog:", "### Changelog:", "## 更新日志:"]
+    start_idx = -1
+    for mark in start_marks:
+        start_idx = body.find(mark)
+        if start_idx != -1: break
+    if start_idx != -1:
+        end_idx = body.find("##", start_idx + 5)
+        clean_body = body[start_idx:end_idx].strip() if end_idx != -1 else body[start_idx:].strip()
+
+    return clean_body.replace("**\n", "**\n\n")
+
+def render_changelog(markdown):
+    """
+    Render changelog markdown to Qt rich text once, so displaying it is only an HTML load.
+    QTextDocument is reentrant: one created and used only in the sync worker is fine there.
+    """
+    doc = QTextDocument()
+    doc.setMarkdown(markdown or "")
+    return doc.toHtml()
+
+CHANGELOG_EXTRACTORS = {
+    "master": _extract_master_changelog,
+    "nightly": _extract_nightly_changelog,
+}
+
+def _iter_slim_releases(payload, extract):
+    """
+    Stream a releases page, keeping only what the catalog stores: tag, asset
+    name/url/size/digest and the extracted changelog. Each full release object
+    (uploader records, raw body, ...) is dropped as soon as it is reduced.
+    """
+    for r in iter_json_array(payload):
+        yield {
+            "tag_name": r['tag_name'],
+            "assets": [{"name": a['name'], "browser_download_url": a['browser_download_url'],
+                        "size": a['size'], "digest": a.get('digest')} for a in r.get('assets', [])],
+            "changelog": extract(r.get('body') or ''),
+        }
+
+def _empty_diff(success):
+    """Sync diff payload with no changes."""
+    return {"channels": {}, "assets": {}, "changed": False, "success": success}
+
+# Tags kept per channel in the catalog (never fewer than fetch_limit); installed builds are always kept
+DEFAULT_RETENTION = 50
+
+# Deferred syncs wait this long past the rate-limit reset, to absorb clock skew
+RATE_LIMIT_GRACE = 5
+
+# How long an instance waits for another instance's sync of the shared cache before syncing itself
+SYNC_LOCK_TIMEOUT = 120
+
 # Worker Thread for Sync
 class SyncWorker(QThread):
     finished = Signal(dict)
     error = Signal(str, str)
     
-    def __init__(self, old_data=None, master_repo="eden-emulator/Releases", nightly_repo="pflyly/eden-nightly"):
+    def __init__(self, old_data=None, master_repo=MASTER_REPO, nightly_repo=NIGHTLY_REPO, backfill=False, catalog=None, force=False, sync_lock=None):
         super().__init__()
         self.old_data = old_data or {}
+        self.catalog = catalog
+        # Cross-process lock held from the first request until the manager has saved the result
+        self.sync_lock = sync_lock
+        self.backfill = backfill
+        self.force = force
+        # A forced sync is the user pressing refresh; it may spend the reserved API budget
+        self.priority = PRIORITY_USER if force else PRIORITY_BACKGROUND
         self.master_repo = master_repo
         self.nightly_repo = nightly_repo
+        # Branch -> repo. Every channel listed here is fetched in parallel.
+        self.repos = {"master": master_repo, "nightly": nightly_repo}
 
-    def run(self):
-        token = "" # Optional token
-        
-        headers = {'Accept': 'application/vnd.github.v3+json'}
-        # Try to load token from config (simple check)
-        # Try to load token and limit from config
-        fetch_limit = 15
-        if os.path.exists("config.json"):
-             try:
-                 with open("config.json", 'r', encoding='utf-8') as f:
-                     cfg = json.load(f)
-                     if cfg.get("gh_token"):
-                         headers['Authorization'] = f'token {cfg["gh_token"]}'
-                     fetch_limit = cfg.get("fetch_limit", 15)
-             except: pass
-
-        res_data = {"changelogs": {"master": {}, "nightly": {}}, "versions": {"master": [], "nightly": []}}
-        failed_branches = []
-        fetch_log_success = True
+    def _is_unchanged(self, branch, url, res):
+        """True if the first page is byte-identical to the one the cached branch data was built from."""
+        validators = self.old_data.get("validators", {}).get(branch, {})
+        # Only comparable for the same URL and when we still hold the data it describes
+        if validators.get("url") != url or not self.old_data.get("versions", {}).get(branch):
+            return False
+        return bool(res.digest) and validators.get("digest") == res.digest
 
-        # --- Master ---
+    def _cached_branch(self, branch):
+        """Build a branch result from the cached versions, changelogs and assets."""
+        versions = self.old_data.get("versions", {}).get(branch, [])
+        old_assets = self.old_data.get("assets", {})
+        return {
+            "versions": versions,
+            "changelogs": self.old_data.get("changelogs", {}).get(branch, {}),
+            "assets": {tag: old_assets[tag] for tag in versions if tag in old_assets},
+            "validators": self.old_data.get("validators", {}).get(branch),
+        }
+
+    def _diff_branch(self, branch, result):
+        """
+        What changed in a branch compared to the cached data this sync started from,
+        or None if nothing did.
+        """
+        old_versions = self.old_data.get("versions", {}).get(branch, [])
+        old_assets = self.old_data.get("assets", {})
+        new_versions = result["versions"]
+        old_set, new_set = set(old_versions), set(new_versions)
+
+        fetched = result["changelogs"]
         try:
-            url = f"https://api.github.com/repos/{self.master_repo}/releases?per_page={fetch_limit}"
-            logger.info(f"Fetching Master releases from: {url}")
-            m_res = requests.get(url, headers=headers, timeout=8)
-            m_res.raise_for_status()
-            if m_res.status_code == 200:
-                m_data = m_res.json()
-                logger.info(f"Master API Success. Found {len(m_data)} releases.")
-                res_data["versions"]["master"] = [r['tag_name'] for r in m_data]
-                res_data["assets"] = res_data.get("assets", {})
-                for r in m_data:
-                    tag = r['tag_name']
-                    res_data["assets"][tag] = [{"name": a['name'], "browser_download_url": a['browser_download_url'], "size": a['size']} for a in r.get('assets', [])]
-                    body = r.get('body', '').split("# Packages")[0].strip()
-                    res_data["changelogs"]["master"][tag] = body
+            stored = self.catalog.get_changelogs(branch, fetched) if self.catalog else self.old_data.get("changelogs", {}).get(branch, {})
         except Exception as e:
-            fetch_log_success = False
-            failed_branches.append("Master")
-            logger.error(f"Fetch Master failed: {e}")
+            logger.warning(f"Failed to compare {branch} changelogs: {e}")
+            stored = {}
+
+        diff = {
+            "versions": new_versions if new_versions != old_versions else None,
+            "added": [tag for tag in new_versions if tag not in old_set],
+            "removed": [tag for tag in old_versions if tag not in new_set],
+            "assets": [tag for tag in new_versions if result["assets"].get(tag) != old_assets.get(tag)],
+            "changelogs": [tag for tag, body in fetched.items() if stored.get(tag) != body],
+        }
+        if diff["versions"] is None and not diff["assets"] and not diff["changelogs"]:
+            return None
+        return diff
+
+    def _fetch_branch(self, branch, repo, headers, fetch_limit):
+        """
+        Fetch and parse the release list of a single branch. Raises on network/API errors.
+
+        Incremental mode (cache covers the fetch window): walk the `Link` pagination with
+        small pages only until the newest cached tag shows up, then merge the new releases
+        in front of the cached ones. Full mode (no cache, window grew, or backfill requested):
+        walk pages until `fetch_limit` releases are collected or history runs out.
+        """
+        name = branch.capitalize()
+        cached = self._cached_branch(branch)
+        known = set(cached["versions"])
+        exhausted = (cached["validators"] or {}).get("exhausted", False)
+        incremental = bool(known) and not self.backfill and (len(known) >= fetch_limit or exhausted)
+
+        page_size = INCREMENTAL_PAGE_SIZE if incremental else min(fetch_limit, MAX_PAGE_SIZE)
+        first_url = release_list_url(repo, page_size)
+        logger.info(f"Fetching {name} releases from: {first_url} ({'incremental' if incremental else 'full'})")
+
+        # Pages go through the shared response cache: a page younger than the TTL costs no
+        # request, an older one is revalidated with its ETag (304s do not count against the rate limit)
+        cache = get_response_cache()
+        max_age = 0 if self.force else ttl_for("releases")
+
+        extract = CHANGELOG_EXTRACTORS.get(branch, _extract_master_changelog)
+        releases = []
+        validators = None
+        url = first_url
+        while url and len(releases) < fetch_limit:
+            res = cache.fetch(url, max_age, headers=headers, timeout=8, stale_if_error=False, priority=self.priority)
+
+            if validators is None:
+                if self._is_unchanged(branch, first_url, res):
+                    # Unchanged since last sync: reuse cached data without parsing
+                    logger.info(f"{name} releases unchanged ({'304' if res.not_modified else 'cached'}). Reusing cached data.")
+                    return cached
+                validators = {"url": first_url, "digest": res.digest}
+
+            page = list(_iter_slim_releases(res.body, extract))
+            releases.extend(page)
+            url = res.links.get("next", {}).get("url")
+            if incremental and any(r['tag_name'] in known for r in page):
+                break
+
+        # A full walk that ran out of pages has seen the whole history
+        validators["exhausted"] = exhausted if incremental else url is None
+
+        result = {"versions": [], "changelogs": {}, "assets": {}, "validators": validators}
+        for r in releases:
+            tag = r['tag_name']
+            if tag in result["assets"]: continue
+            result["versions"].append(tag)
+            result["assets"][tag] = r["assets"]
+            result["changelogs"][tag] = r["changelog"]
 
-        # --- Nightly ---
+        new_count = sum(1 for tag in result["versions"] if tag not in known)
+
+        # Merge: freshly fetched releases first (they also refresh overlapping cached ones), then cached tail
+        for tag in cached["versions"]:
+            if tag in result["assets"]: continue
+            result["versions"].append(tag)
+            if tag in cached["assets"]:
+                result["assets"][tag] = cached["assets"][tag]
+            if tag in cached["changelogs"]:
+                result["changelogs"][tag] = cached["changelogs"][tag]
+
+        # Trim to the fetch window
+        for tag in result["versions"][fetch_limit:]:
+            result["assets"].pop(tag, None)
+            result["changelogs"].pop(tag, None)
+        result["versions"] = result["versions"][:fetch_limit]
+
+        logger.info(f"{name} API Success. Fetched {len(releases)} releases, {new_count} new.")
+        return result
+
+    def _adopt_shared_result(self, requested_at):
+        """
+        If another instance completed a sync of the shared catalog after this one was requested,
+        report its result instead of syncing again. Returns False if there is none.
+        """
         try:
-            url = f"https://api.github.com/repos/{self.nightly_repo}/releases?per_page={fetch_limit}"
-            logger.info(f"Fetching Nightly releases from: {url}")
-            n_res = requests.get(url, headers=headers, timeout=8)
-            n_res.raise_for_status()
-            if n_res.status_code == 200:
-                n_data = n_res.json()
-                logger.info(f"Nightly API Success. Found {len(n_data)} releases.")
-                res_data["versions"]["nightly"] = [r['tag_name'] for r in n_data]
-                if "assets" not in res_data: res_data["assets"] = {}
-                for r in n_data:
-                    tag = r['tag_name']
-                    res_data["assets"][tag] = [{"name": a['name'], "browser_download_url": a['browser_download_url'], "size": a['size']} for a in r.get('assets', [])]
-                    
-                    # Robust Changelog Extraction
-                    body = r.get('body', '')
-                    clean_body = body[:800]
-                    start_marks = ["## Changelog:", "### Changelog:", "## 更新日志:"]
-                    start_idx = -1
-                    for mark in start_marks:
-                        start_idx = body.find(mark)
-                        if start_idx != -1: break
-                    if start_idx != -1:
-                        end_idx = body.find("##", start_idx + 5)
-                        clean_body = body[start_idx:end_idx].strip() if end_idx != -1 else body[start_idx:].strip()
-                    
-                    clean_body = clean_body.replace("**\n", "**\n\n")
-                    res_data["changelogs"]["nightly"][tag] = clean_body
+            timestamp = self.catalog.get_timestamp()
+            if timestamp is None or timestamp < requested_at:
+                return False
+            fresh = self.catalog.load(include_changelogs=False) or {}
         except Exception as e:
-            fetch_log_success = False
-            failed_branches.append("Nightly")
-            logger.error(f"Fetch Nightly failed: {e}")
+            logger.warning(f"Failed to read the shared sync result: {e}")
+            return False
 
-        if failed_branches:
-            # Fallback Logic using passed old_data
-            if self.old_data:
-                if not res_data["versions"]["master"] and self.old_data.get("versions", {}).get("master"):
-                    res_data["versions"]["master"] = self.old_data["versions"]["master"]
-                    res_data["changelogs"]["master"] = self.old_data.get("changelogs", {}).get("master", {})
-                if not res_data["versions"]["nightly"] and self.old_data.get("versions", {}).get("nightly"):
-                    res_data["versions"]["nightly"] = self.old_data["versions"]["nightly"]
-                    res_data["changelogs"]["nightly"] = self.old_data.get("changelogs", {}).get("nightly", {})
-                if self.old_data.get("assets"):
-                    if "assets" not in res_data: res_data["assets"] = {}
-                    res_data["assets"].update(self.old_data["assets"])
+        logger.info("Another EmuMan instance just synced the shared cache. Reusing its result.")
+        diff = _empty_diff(success=True)
+        for branch in self.repos:
+            versions = fresh.get("versions", {}).get(branch, [])
+            result = {
+                "versions": versions,
+                "changelogs": {},
+                "assets": {tag: fresh["assets"][tag] for tag in versions if tag in fresh.get("assets", {})},
+                "validators": fresh.get("validators", {}).get(branch),
+            }
+            branch_diff = self._diff_branch(branch, result)
+            if branch_diff:
+                diff["channels"][branch] = branch_diff
+                diff["assets"].update({tag: result["assets"].get(tag, []) for tag in branch_diff["assets"]})
+        diff["changed"] = bool(diff["channels"])
+        self.finished.emit({"success": True, "coalesced": True, "diff": diff})
+        return True
+
+    def run(self):
+        requested_at = time.time()
+        if self.catalog and not self.old_data:
+            try:
+                # Changelog bodies stay in the catalog; only newly fetched ones travel in the payload
+                self.old_data = self.catalog.load(include_changelogs=False) or {}
+            except Exception as e:
+                logger.warning(f"Failed to load cached releases for sync: {e}")
+
+        try:
+            # One sync at a time per shared cache dir; the others wait and take its result
+            if self.sync_lock and not self.sync_lock.acquire(blocking=False):
+                logger.info("Another EmuMan instance is syncing. Waiting for its result...")
+                if not self.sync_lock.acquire(timeout=SYNC_LOCK_TIMEOUT):
+                    logger.warning("Timed out waiting for the other instance's sync. Syncing anyway.")
+                elif self.catalog and self._adopt_shared_result(requested_at):
+                    return
+            self._sync()
+        except Exception as e:
+            # CacheManager releases the sync lock when it gets a result, so always deliver one
+            logger.error(f"Release sync failed: {e}")
+            self.error.emit("Sync", str(e))
+            self.finished.emit({"success": False, "error": True, "diff": _empty_diff(success=False)})
+
+    def _sync(self):
+        # Offline: report right away instead of waiting for every branch request to time out
+        if not get_monitor().is_online(refresh=self.force):
+            logger.info("Offline. Keeping cached release data until the network is back.")
+            self.finished.emit({"success": False, "offline": True, "diff": _empty_diff(success=False)})
             return
 
-        res_data["success"] = fetch_log_success
+        if not self.force:
+            # With a token, one GraphQL query provides the first pages of both branches (and the
+            # update checks); the fetches below then hit the response cache
+            prefetch_startup(self.priority)
+
+        headers = http_client.github_headers()
+        # Try to load limit from config
+        fetch_limit = load_config().get("fetch_limit", 15)
+
+        res_data = {"changelogs": {}, "changelog_html": {}, "versions": {}, "assets": {}, "validators": {}}
+        diff = _empty_diff(success=False)
+        failed_branches = []
+        rate_limited_until = 0
+
+        # Issue all branch requests at once: sync latency is the slowest request, not the sum
+        with ThreadPoolExecutor(max_workers=len(self.repos), thread_name_prefix="sync") as pool:
+            futures = {branch: pool.submit(self._fetch_branch, branch, repo, headers, fetch_limit)
+                       for branch, repo in self.repos.items()}
+
+            for branch, future in futures.items():
+                try:
+                    result = future.result()
+                except RateLimitedError as e:
+                    # Not a failure: serve cached data and let the manager retry after the reset
+                    logger.warning(f"Fetch {branch.capitalize()} skipped: {e}")
+                    rate_limited_until = max(rate_limited_until, e.reset_at)
+                    result = self._cached_branch(branch)
+                except Exception as e:
+                    failed_branches.append(branch.capitalize())
+                    logger.error(f"Fetch {branch.capitalize()} failed: {e}")
+                    # Fallback: keep this branch's previous data, independently of the others
+                    result = self._cached_branch(branch)
+
+                res_data["versions"][branch] = result["versions"]
+                res_data["changelogs"][branch] = result["changelogs"]
+                res_data["assets"].update(result["assets"])
+                if result["validators"]:
+                    res_data["validators"][branch] = result["validators"]
+
+                branch_diff = self._diff_branch(branch, result)
+                if branch_diff:
+                    diff["channels"][branch] = branch_diff
+                    diff["assets"].update({tag: result["assets"].get(tag, []) for tag in branch_diff["assets"]})
+                    # Only new or edited changelogs are rendered; the catalog keeps the html of the rest
+                    res_data["changelog_html"][branch] = {tag: render_changelog(result["changelogs"][tag])
+                                                          for tag in branch_diff["changelogs"]}
+
+        if failed_branches:
+            self.error.emit("Sync", ", ".join(failed_branches))
+
+        if rate_limited_until:
+            res_data["rate_limited_until"] = rate_limited_until
+        res_data["success"] = not failed_branches and not rate_limited_until
+        diff["success"] = res_data["success"]
+        diff["changed"] = bool(diff["channels"])
+        res_data["diff"] = diff
         self.finished.emit(res_data)
 
 class CacheManager(QObject):
+    """
+    Owns the release catalog and its background sync.
+    Cached data is read directly (load_and_revalidate); syncs report only what changed through
+    sync_diff (per channel: new version list, added/removed tags, tags whose assets or changelog changed).
+    """
     sync_started = Signal()
-    sync_finished = Signal(dict)
+    sync_diff = Signal(dict)
     sync_error = Signal(str)
 
-    def __init__(self, cache_dir="cache", cache_file="eden_cache.json"):
+    def __init__(self, cache_dir=None, cache_file="eden_catalog.db"):
         super().__init__()
+        # The cache dir may be shared with other instances (see get_cache_dir)
+        cache_dir = cache_dir or get_cache_dir()
         self.cache_dir = cache_dir
         self.cache_path = os.path.join(cache_dir, cache_file)
         self.scan_cache_file = os.path.join(cache_dir, "scan_cache.json")
@@ -127,161 +367,312 @@ class CacheManager(QObject):
         self.sync_worker = None
         
         if not os.path.exists(cache_dir):
-            os.makedirs(cache_dir)
+            os.makedirs(cache_dir, exist_ok=True)
+        self.sync_lock = FileLock(os.path.join(cache_dir, "sync.lock"))
+
+        self.catalog = ReleaseCatalog(self.cache_path, legacy_json=os.path.join(cache_dir, "eden_cache.json"))
+        self._index_local_changelogs()
+
+        # Scan results and directory fingerprints live in memory; writes are debounced and atomic
+        self.scan_store = JsonStore(self.scan_cache_file)
+        self.hash_store = JsonStore(self.dir_hash_cache_file)
+
+        # Changelogs are loaded on demand; only the most recently viewed documents stay in memory
+        changelog_cache_size = load_config().get("changelog_cache_size", 16)
+        self.changelog_cache = LRUCache(changelog_cache_size)
+
+        # One pending retry at most, fired once the API rate limit window resets
+        self.deferred_sync_timer = QTimer(self)
+        self.deferred_sync_timer.setSingleShot(True)
+        self.deferred_sync_timer.timeout.connect(lambda: self.start_sync_task())
+
+        # A sync skipped while offline runs again as soon as the network is back
+        self.offline_sync_pending = False
+        get_monitor().online.connect(self._on_back_online)
             
-    def start_sync_task(self, force=False):
-        """Starts the data synchronization thread."""
-        is_fresh, old_data = self.is_cache_fresh()
-        
+    def start_sync_task(self, force=False, backfill=False):
+        """
+        Starts the data synchronization thread.
+        backfill: walk the full release history up to fetch_limit instead of only pulling new tags.
+        """
         # If cache is fresh and not forced, return immediately (optimization)
-        if is_fresh and not force and old_data:
-             logger.info("Using fresh cached API data.")
-             self.sync_finished.emit(old_data)
-             return
+        if self.is_cache_age_fresh() and not force and not backfill:
+            logger.info("Using fresh cached API data.")
+            self.sync_diff.emit(_empty_diff(success=True))
+            return
 
         if self.sync_worker and self.sync_worker.isRunning():
             logger.warning("Sync already in progress.")
             return
 
-        self.sync_started.emit()
-        # Pass old_data for fallback purposes
-        self.sync_worker = SyncWorker(old_data=old_data)
+        # Background syncs that the API budget cannot cover are not even started;
+        # whatever is displayed from the catalog simply stays as it is
+        tracker = get_tracker()
+        if not force and not tracker.allow(PRIORITY_BACKGROUND):
+            logger.info("API rate limit budget low, keeping cached data until the reset.")
+            self._schedule_deferred_sync(tracker.reset_at())
+            return
+
+        # Background revalidation of data that is already on screen stays silent
+        if force or self.catalog.get_timestamp() is None:
+            self.sync_started.emit()
+        # The worker loads cached data itself (for 304 reuse and fallback), off the UI thread
+        self.sync_worker = SyncWorker(catalog=self.catalog, backfill=backfill, force=force, sync_lock=self.sync_lock)
         self.sync_worker.finished.connect(self._on_worker_finished)
         self.sync_worker.error.connect(lambda t, m: self.sync_error.emit(f"{t}: {m}"))
         self.sync_worker.start()
 
+    def load_and_revalidate(self):
+        """
+        Stale-while-revalidate entry point: return the cached data (or None) for immediate
+        display and, if it is stale, refresh it in the background. Changes arrive as sync_diff.
+        """
+        cached = self.load_cache()
+        if not self.is_cache_age_fresh():
+            logger.info("Cache missing or expired. Revalidating in background...")
+            self.start_sync_task(force=False)
+        return cached["data"] if cached else None
+
     def _on_worker_finished(self, data):
         """Handle data from worker, save to cache, and notify UI."""
-        if data.get("success", False):
-            self.save_cache(data)
-        self.sync_finished.emit(data)
+        if data.get("coalesced"):
+            # Another instance already saved this result; which changelogs it edited is unknown
+            self.changelog_cache.clear()
+        elif data.get("offline"):
+            self.offline_sync_pending = True
+            if self.sync_worker and self.sync_worker.force:
+                self.sync_error.emit("Offline")
+        elif data.get("error"):
+            pass  # Nothing fetched; the worker already reported the error
+        else:
+            # Partial results are persisted too (so new changelogs are available), but only a
+            # fully successful sync refreshes the cache timestamp.
+            self.save_cache(data, touch=data.get("success", False))
+            self.compact_catalog()
+            for branch, change in data.get("diff", {}).get("channels", {}).items():
+                for tag in change.get("changelogs", []):
+                    self.changelog_cache.pop((branch, tag))
+        self.sync_lock.release()
+        if data.get("rate_limited_until"):
+            self._schedule_deferred_sync(data["rate_limited_until"])
+            if self.sync_worker and self.sync_worker.force:
+                self.sync_error.emit(f"RateLimit: {int(max(0, data['rate_limited_until'] - time.time()))}s")
+        # Only the changes travel to the UI; changelogs are served lazily through get_changelog_document()
+        self.sync_diff.emit(data.get("diff") or _empty_diff(data.get("success", False)))
+
+    def _on_back_online(self):
+        if self.offline_sync_pending:
+            self.offline_sync_pending = False
+            logger.info("Network is back. Running the sync skipped while offline.")
+            self.start_sync_task()
+
+    def _schedule_deferred_sync(self, reset_at):
+        """Retry the sync once the rate limit window is over (replaces any pending retry)."""
+        delay = max(0, reset_at - time.time()) + RATE_LIMIT_GRACE
+        self.deferred_sync_timer.start(int(delay * 1000))
+        logger.info(f"Deferred sync scheduled in {int(delay)}s.")
+
+    def get_changelog_document(self, branch, tag):
+        """
+        Return a ready-to-display QTextDocument for a changelog (None if unknown).
+        Documents are built from the pre-rendered html and kept in a bounded LRU, so
+        switching between recently viewed tags is a plain document swap. UI thread only.
+        """
+        key = (branch, tag)
+        doc = self.changelog_cache.get(key)
+        if doc is None:
+            try:
+                body, html = self.catalog.get_rendered_changelog(branch, tag)
+            except Exception as e:
+                logger.warning(f"Failed to load changelog {branch}/{tag}: {e}")
+                return None
+            if not body:
+                return None
+            doc = QTextDocument()
+            if html:
+                doc.setHtml(html)
+            else:
+                # Rows stored before changelogs were pre-rendered; same renderer as render_changelog
+                doc.setMarkdown(body)
+            self.changelog_cache.put(key, doc)
+        return doc
+
+    def _index_local_changelogs(self, directory="changelogs"):
+        """Make bundled changelogs/<branch>_<tag>.md files searchable too (synced bodies take precedence)."""
+        if not os.path.isdir(directory):
+            return
+        bodies = {}
+        for name in os.listdir(directory):
+            branch, sep, rest = name.partition("_")
+            if not sep or not rest.endswith(".md"):
+                continue
+            try:
+                with open(os.path.join(directory, name), 'r', encoding='utf-8') as f:
+                    bodies.setdefault(branch, {})[rest[:-3]] = f.read()
+            except Exception as e:
+                logger.warning(f"Skipping unreadable changelog {name}: {e}")
+        try:
+            for branch, changelogs in bodies.items():
+                self.catalog.index_changelogs(branch, changelogs)
+        except Exception as e:
+            logger.warning(f"Failed to index local changelogs: {e}")
+
+    def search_changelogs(self, query, limit=50):
+        """Full-text search over every synced changelog: [(branch, tag, snippet)], best match first."""
+        try:
+            return self.catalog.search(query, limit=limit)
+        except Exception as e:
+            logger.warning(f"Changelog search failed for {query!r}: {e}")
+            return []
+
+    def get_indexed_changelog(self, branch, tag):
+        """Changelog body of any indexed tag, including ones no longer listed."""
+        try:
+            return self.catalog.get_indexed_changelog(branch, tag)
+        except Exception as e:
+            logger.warning(f"Failed to load indexed changelog {branch}/{tag}: {e}")
+            return None
+
+    def compact_catalog(self):
+        """Apply the retention policy: N newest tags per channel plus locally installed ones."""
+        cfg = load_config()
+        keep = cfg.get("cache_retention", DEFAULT_RETENTION)
+        fetch_limit = cfg.get("fetch_limit", 15)
+
+        try:
+            # Installed builds come from the scan cache, so no filesystem access is needed here
+            pinned = {}
+            for key, entry in self.scan_store.items():
+                branch = key.rsplit(":", 1)[-1]
+                installed = (entry or {}).get("result", {})
+                if installed:
+                    matched = VersionManager.match_tags(branch, installed, self.catalog.get_history(branch))
+                    pinned.setdefault(branch, set()).update(matched)
+            self.catalog.compact(max(int(keep), int(fetch_limit)), pinned)
+        except Exception as e:
+            logger.warning(f"Failed to compact release catalog: {e}")
 
     def load_cache(self):
         """Load cache data if it exists."""
-        if not os.path.exists(self.cache_path):
-            return None
-        
         try:
-            with open(self.cache_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            return data
+            timestamp = self.catalog.get_timestamp()
+            if timestamp is None:
+                return None
+            return {"timestamp": timestamp, "data": self.catalog.load(include_changelogs=False)}
         except Exception as e:
             logger.warning(f"Failed to load cache: {e}")
             return None
 
-    def save_cache(self, data):
-        """Save data to cache with current timestamp."""
+    def save_cache(self, data, touch=True):
+        """Save data to cache; touch=True stamps it with the current time."""
         try:
-            cache_data = {
-                "timestamp": time.time(),
-                "data": data
-            }
-            with open(self.cache_path, 'w', encoding='utf-8') as f:
-                json.dump(cache_data, f, indent=4)
+            self.catalog.save(data, time.time() if touch else None)
         except Exception as e:
             logger.error(f"Failed to save cache: {e}")
 
-    def is_cache_fresh(self, max_age=3600):
-        """Check if cache exists and is fresh."""
-        data = self.load_cache()
-        if not data:
-            return False, None
-        
-        timestamp = data.get("timestamp", 0)
-        content = data.get("data")
-        
-        if time.time() - timestamp < max_age:
-            return True, content
-        return False, content
-
+    def is_cache_age_fresh(self, max_age=None):
+        """O(1) freshness check: reads only the catalog's timestamp row."""
+        if max_age is None:
+            max_age = ttl_for("releases")
+        try:
+            timestamp = self.catalog.get_timestamp()
+        except Exception as e:
+            logger.warning(f"Failed to read cache timestamp: {e}")
+            return False
+        return timestamp is not None and time.time() - timestamp < max_age
 
     def _get_directory_hash(self, base_path: str) -> str:
-        """Calculate directory hash to detect changes."""
+        """Fingerprint of the versions root: one scandir pass over names, mtimes and sizes."""
         if not os.path.exists(base_path): return ""
         try:
             items = []
-            for item in sorted(os.listdir(base_path)):
-                item_path = os.path.join(base_path, item)
-                if os.path.isdir(item_path):
-                    stat = os.stat(item_path)
-                    items.append(f"dir:{item}:{int(stat.st_mtime)}")
-                else:
-                    if not item.lower().endswith(('.zip', '.7z')):
-                        stat = os.stat(item_path)
-                        items.append(f"file:{item}:{stat.st_size}:{int(stat.st_mtime)}")
-            content = "|".join(items)
+            with os.scandir(base_path) as it:
+                for entry in it:
+                    if entry.is_dir():
+                        items.append(f"dir:{entry.name}:{entry.stat().st_mtime_ns}")
+                    elif not entry.name.lower().endswith(('.zip', '.7z', '.part', '.part.json')):
+                        stat = entry.stat()
+                        items.append(f"file:{entry.name}:{stat.st_size}:{stat.st_mtime_ns}")
+            content = "|".join(sorted(items))
             return hashlib.md5(content.encode()).hexdigest()
         except Exception as e:
             logger.error(f"Failed to calculate dir hash: {e}")
             return ""
 
-    def is_scan_cache_valid(self, base_path: str, branch: str) -> bool:
+    @staticmethod
+    def _get_executables_hash(base_path: str, items, locate) -> str:
+        """
+        Fingerprint of the matched executables and the folders holding them, which the
+        top-level scandir does not see (e.g. a build re-extracted into its existing folder).
+        """
+        stamps = []
+        for item in sorted(items):
+            exe = locate(base_path, item)
+            try:
+                stamps.append(f"{exe}:{os.stat(os.path.dirname(exe)).st_mtime_ns}:{os.stat(exe).st_mtime_ns}")
+            except (OSError, TypeError):
+                stamps.append(f"{item}:missing")
+        return hashlib.md5("|".join(stamps).encode()).hexdigest()
+
+    def get_local_candidates(self, base_path: str, branches, scanner, locate=None) -> Dict[str, Dict]:
+        """
+        Installed build candidates per branch, rescanned only when the versions root changed.
+        scanner(branch, base_path) performs the full scan; the directory fingerprint is
+        computed once for all requested branches. With locate(base_path, item) -> executable,
+        the cached result also has to match the executables it found.
+        """
+        if not base_path or not os.path.exists(base_path):
+            return {branch: {} for branch in branches}
+
+        fingerprint = self._get_directory_hash(base_path)
+        results = {}
+        for branch in branches:
+            if fingerprint and self.is_scan_cache_valid(base_path, branch, fingerprint):
+                cached = self.get_cached_scan_result(base_path, branch)
+                if cached is not None and (locate is None or cached.get("executables") ==
+                                           self._get_executables_hash(base_path, cached["result"], locate)):
+                    results[branch] = cached["result"]
+                    continue
+            results[branch] = scanner(branch, base_path)
+            if fingerprint:
+                executables = self._get_executables_hash(base_path, results[branch], locate) if locate else None
+                self.save_scan_result(base_path, branch, results[branch], fingerprint, executables)
+        return results
+
+    def is_scan_cache_valid(self, base_path: str, branch: str, fingerprint: str = None) -> bool:
         """Check if scan cache is valid based on directory hash."""
         if not base_path or not os.path.exists(base_path): return False
         
-        current_hash = self._get_directory_hash(base_path)
+        current_hash = fingerprint or self._get_directory_hash(base_path)
         if not current_hash: return False
-        
-        try:
-            if os.path.exists(self.dir_hash_cache_file):
-                with open(self.dir_hash_cache_file, 'r', encoding='utf-8') as f:
-                    hash_data = json.load(f)
-                stored = hash_data.get(f"{base_path}:{branch}")
-                if stored == current_hash: return True
-        except Exception: pass
-        return False
-
-    def update_directory_hash(self, base_path: str, branch: str):
+        return self.hash_store.get(f"{base_path}:{branch}") == current_hash
+
+    def update_directory_hash(self, base_path: str, branch: str, fingerprint: str = None):
         """Update directory hash in cache."""
-        current_hash = self._get_directory_hash(base_path)
+        current_hash = fingerprint or self._get_directory_hash(base_path)
         if not current_hash: return
-        try:
-            data = {}
-            if os.path.exists(self.dir_hash_cache_file):
-                with open(self.dir_hash_cache_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-            data[f"{base_path}:{branch}"] = current_hash
-            with open(self.dir_hash_cache_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2)
-        except Exception: pass
+        self.hash_store.set(f"{base_path}:{branch}", current_hash)
 
     def get_cached_scan_result(self, base_path: str, branch: str) -> Optional[Dict]:
         """Retrieve cached scan result."""
-        try:
-            if os.path.exists(self.scan_cache_file):
-                with open(self.scan_cache_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                return data.get(f"{base_path}:{branch}")
-        except Exception: pass
-        return None
-
-    def save_scan_result(self, base_path: str, branch: str, result: Dict):
+        return self.scan_store.get(f"{base_path}:{branch}")
+
+    def save_scan_result(self, base_path: str, branch: str, result: Dict, fingerprint: str = None, executables: str = None):
         """Save scan result and update directory hash."""
-        try:
-            data = {}
-            if os.path.exists(self.scan_cache_file):
-                with open(self.scan_cache_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-            
-            data[f"{base_path}:{branch}"] = {
-                "result": result,
-                "timestamp": time.time()
-            }
-            with open(self.scan_cache_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2)
-            
-            self.update_directory_hash(base_path, branch)
-        except Exception as e:
-            logger.error(f"Failed to save scan result: {e}")
+        self.scan_store.set(f"{base_path}:{branch}", {
+            "result": result,
+            "executables": executables,
+            "timestamp": time.time()
+        })
+        self.update_directory_hash(base_path, branch, fingerprint)
 
     def invalidate_scan_cache(self, base_path: str, branch: str):
         """Invalidate scan cache for specific path/branch."""
         key = f"{base_path}:{branch}"
-        for fpath in [self.scan_cache_file, self.dir_hash_cache_file]:
-            if os.path.exists(fpath):
-                try:
-                    with open(fpath, 'r', encoding='utf-8') as f: d = json.load(f)
-                    if key in d:
-                        del d[key]
-                        with open(fpath, 'w', encoding='utf-8') as f: json.dump(d, f, indent=2)
-                except Exception: pass
+        self.scan_store.delete(key)
+        self.hash_store.delete(key)
+
+    def flush(self):
+        """Write pending scan/hash cache changes to disk (called on shutdown)."""
+        self.scan_store.flush()
+        self.hash_store.flush()
@@ -14,15 +14,16 @@ class FileProcessor(QObject):
     Now manages the download lifecycle to reduce UI complexity.
     """
     
-    # Signals for UI updates
-    download_progress = Signal(int, str)
+    # Signals for UI updates (several downloads can be in flight, keyed by tag)
+    download_progress = Signal(str, int, str)  # tag, percent, speed_str
+    download_state = Signal(str, str)  # tag, download_queue state
     process_finished = Signal(bool, str, str, str)  # success, msg/path, branch, tag
-    process_cancelled = Signal()
+    process_cancelled = Signal(str)  # tag
     manual_required = Signal(str) # path
 
     def __init__(self):
         super().__init__()
-        self.dl_thread = None
+        self.dl_threads = {}  # tag -> DownloadThread
 
     @staticmethod
     def is_debian_based():
@@ -51,26 +52,40 @@ class FileProcessor(QObject):
             logger.warning(f"chmod failed for {path}: {e}")
             return False
 
-    def start_download_task(self, url, save_path, branch, tag):
-        """Starts the download thread and manages the workflow."""
-        if self.dl_thread and self.dl_thread.isRunning():
-            logger.warning("Download already in progress.")
+    def start_download_task(self, url, save_path, branch, tag, digest=None):
+        """Queues the download (verified against digest, if the release publishes one)."""
+        # Finished threads are dropped here rather than from their own signals, which fire while they still run
+        self.dl_threads = {t: th for t, th in self.dl_threads.items() if th.isRunning()}
+        if tag in self.dl_threads:
+            logger.warning(f"Download of {tag} already in progress.")
             return
 
-        self.dl_thread = DownloadThread(url, save_path)
-        self.dl_thread.progress.connect(self.download_progress.emit)
-        self.dl_thread.finished.connect(lambda ok, path: self._on_download_complete_internal(ok, path, branch, tag))
+        thread = DownloadThread(url, save_path, label=f"{branch} {tag}", digest=digest)
+        thread.progress.connect(lambda p, s: self.download_progress.emit(tag, p, s))
+        thread.state_changed.connect(lambda state: self.download_state.emit(tag, state))
+        thread.finished.connect(lambda ok, path: self._on_download_complete_internal(ok, path, branch, tag))
         
         # 绑定取消信号
-        self.dl_thread.cancelled.connect(self.process_cancelled.emit)
+        thread.cancelled.connect(lambda: self.process_cancelled.emit(tag))
         
-        self.dl_thread.start()
+        self.dl_threads[tag] = thread
+        thread.start()
 
-    def cancel_download_task(self):
-        """Cancels the current download task if running."""
-        if self.dl_thread and self.dl_thread.isRunning():
-            logger.info("Requesting download cancellation...")
-            self.dl_thread.stop()
+    def cancel_download_task(self, tag):
+        """Cancels the download of tag, whether it is running, queued or paused."""
+        thread = self.dl_threads.get(tag)
+        if thread and thread.isRunning():
+            logger.info(f"Requesting cancellation of {tag}...")
+            thread.stop()
+
+    def pause_download_task(self, tag):
+        """Pauses the download of tag, keeping its partial data; frees its slot in the queue."""
+        thread = self.dl_threads.get(tag)
+        return bool(thread and thread.isRunning() and thread.pause())
+
+    def resume_download_task(self, tag):
+        thread = self.dl_threads.get(tag)
+        return bool(thread and thread.isRunning() and thread.resume())
 
     def _on_download_complete_internal(self, ok, path, branch, tag):
         """Internal handler for download completion."""
@@ -10,26 +10,56 @@ from pathlib import Path
 from app.utils.logger import get_logger
 logger = get_logger(__name__)
 
-import requests
 from PySide6.QtCore import QObject, Signal, QThread
 
 from app.utils.downloader import Downloader
+from app.utils.download_queue import get_download_queue, PRIORITY_NORMAL, PAUSED
+from app.utils.digest import DigestMismatch
+from app.utils.partial_download import PartialDownload
+from app.core.github_api import FIRMWARE_REPO, latest_release_url, prefetch_startup
+from app.utils import http_client
+from app.utils.response_cache import get_response_cache, ttl_for
+from app.utils.rate_limit import PRIORITY_BACKGROUND
+from app.utils.json_store import update_json_file
+from app.utils.config_store import load_config
+from app.utils.path_utils import get_cache_dir
+from app.utils.connectivity import get_monitor
+
+FIRMWARE_RELEASE_URL = latest_release_url(FIRMWARE_REPO)
+
+def _parse_firmware_release(data):
+    """Pick the firmware zip out of a GitHub release payload."""
+    info = {"version": data.get("tag_name", ""), "download_url": None, "sha256": None, "size": 0}
+    for asset in data.get("assets", []):
+        if asset['name'].lower().endswith('.zip'):
+            info["download_url"] = asset['browser_download_url']
+            info["size"] = asset.get('size', 0)
+            # Extract SHA256 from digest field (format: "sha256:xxxxx...")
+            digest = asset.get('digest') or ''
+            if digest.startswith('sha256:'):
+                info["sha256"] = digest[7:]  # Remove "sha256:" prefix
+            break
+    return info
 
 class FirmwareUpdateCheckWorker(QThread):
     """异步检查固件更新的Worker"""
     finished = Signal(bool, str, str)  # has_update, latest_version, download_url
     
-    def __init__(self, current_version):
+    def __init__(self, current_version, priority=PRIORITY_BACKGROUND):
         super().__init__()
         self.current_version = current_version
+        self.priority = priority
+        self.offline = False  # The check was skipped (or served from cache) because the network is down
     
     def run(self):
-        has_update, latest_version, download_url, _ = FirmwareManager.check_for_updates(self.current_version)
+        has_update, latest_version, download_url, _ = FirmwareManager.check_for_updates(self.current_version, self.priority)
+        self.offline = get_monitor().known_offline()
         self.finished.emit(has_update, latest_version or "", download_url or "")
 
 class FirmwareInstallWorker(QThread):
     """后台线程：下载并安装固件"""
     progress = Signal(str, int, int, str)  # phase, current, total, speed
+    state_changed = Signal(str)  # download_queue state: queued / active / paused
     finished = Signal(bool, str)  # success, message
 
     def __init__(self, download_url, eden_exe_path=None, version_tag=None):
@@ -38,11 +68,25 @@ class FirmwareInstallWorker(QThread):
         self.eden_exe_path = eden_exe_path
         self.version_tag = version_tag
         self._is_cancelled = False
+        self.item = None  # Download queue item, once submitted
 
     def cancel(self):
         """Request cancellation"""
         self._is_cancelled = True
 
+    def toggle_pause(self):
+        """Pause the download (keeps partial data), or resume it; no-op outside the download phase."""
+        if not self.item:
+            return False
+        if self.item.state == PAUSED:
+            return get_download_queue().resume(self.item.id)
+        return get_download_queue().pause(self.item.id)
+
+    def _on_submit(self, item):
+        self.item = item
+        item.on_state = self.state_changed.emit
+        self.state_changed.emit(item.state)
+
     def run(self):
         def progress_callback(phase, current, total, speed=""):
             if not self._is_cancelled:
@@ -56,7 +100,8 @@ class FirmwareInstallWorker(QThread):
             self.eden_exe_path,
             progress_callback,
             cancel_check,
-            self.version_tag
+            self.version_tag,
+            self._on_submit
         )
         
         if not self._is_cancelled:
@@ -75,16 +120,26 @@ class FirmwareManager(QObject):
     @staticmethod
     def _get_expected_sha256(version):
         """Get expected SHA256 from cache for verification."""
-        cache_path = Path("cache") / "firmware_cache.json"
-        if cache_path.exists():
-            try:
-                with open(cache_path, 'r') as f:
-                    cache_data = json.load(f)
-                    if cache_data.get("version") == version:
-                        return cache_data.get("sha256")
-            except: pass
+        info = FirmwareManager.get_cached_remote_info()
+        if info.get("version") == version:
+            return info.get("sha256")
         return None
 
+    @staticmethod
+    def get_cached_remote_info():
+        """
+        Latest remote firmware info from the response cache, without touching the network.
+        Stale entries are returned too. Returns {} if nothing is cached.
+        """
+        cached = get_response_cache().peek(FIRMWARE_RELEASE_URL)
+        if not cached:
+            return {}
+        try:
+            return _parse_firmware_release(cached.json())
+        except Exception as e:
+            logger.warning(f"Failed to read cached firmware info: {e}")
+            return {}
+
     @staticmethod
     def get_firmware_path_config():
         """Get configured firmware download path."""
@@ -199,23 +254,11 @@ class FirmwareManager(QObject):
     def _save_local_firmware_record(version):
         """保存本地固件记录 (到 firmware_cache.json)"""
         try:
-            cache_path = Path("cache") / "firmware_cache.json"
-            cache_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            data = {}
-            if cache_path.exists():
-                try:
-                    with open(cache_path, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                except: pass
-            
-            data["installed"] = {
+            cache_path = Path(get_cache_dir()) / "firmware_cache.json"
+            update_json_file(str(cache_path), {"installed": {
                 "version": version,
                 "timestamp": time.time()
-            }
-            
-            with open(cache_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=4)
+            }})
         except Exception as e:
             logger.warning(f"Failed to save local firmware record: {e}")
 
@@ -223,7 +266,7 @@ class FirmwareManager(QObject):
     def _load_local_firmware_record():
         """读取本地固件记录 (从 firmware_cache.json)"""
         try:
-            cache_path = Path("cache") / "firmware_cache.json"
+            cache_path = Path(get_cache_dir()) / "firmware_cache.json"
             if cache_path.exists():
                 with open(cache_path, 'r', encoding='utf-8') as f:
                     content = f.read().strip()
@@ -244,9 +287,7 @@ class FirmwareManager(QObject):
             
             # Check for update in cache
             try:
-                cache_path = os.path.join("cache", "firmware_cache.json")
-                cache = FirmwareManager._load_firmware_cache(cache_path)
-                remote_ver = cache.get("version")
+                remote_ver = FirmwareManager.get_cached_remote_info().get("version")
                 
                 if remote_ver and FirmwareManager._compare_versions(firmware_version, remote_ver):
                      text += lang_dict.get("firmware_update_hint", " (Update: {})").format(remote_ver)
@@ -257,166 +298,37 @@ class FirmwareManager(QObject):
         return "", False
     
     @staticmethod
-    def check_for_updates(current_version=None):
+    def check_for_updates(current_version=None, priority=PRIORITY_BACKGROUND):
         """
         检查固件更新
         
         Returns:
             tuple: (has_update, latest_version, download_url, cache_updated)
         """
-        cache_path = os.path.join("cache", "firmware_cache.json")
-        
+        # Within the firmware TTL the cached response is used as is; past it the request is
+        # revalidated, and a network failure falls back to the last known release.
         try:
-            cache_data = FirmwareManager._load_firmware_cache(cache_path)
-            cached_version = cache_data.get("version")
-            cached_url = cache_data.get("download_url")
-            cache_time = cache_data.get("timestamp", 0)
-            
-            is_cache_valid = (time.time() - cache_time < 86400)
-            
-            if is_cache_valid and cached_version:
-                if current_version and cached_version:
-                    has_update = FirmwareManager._compare_versions(current_version, cached_version)
-                    return has_update, cached_version, cached_url, False
-                return False, cached_version, cached_url, False
-            
-            url = "https://api.github.com/repos/THZoria/NX_Firmware/releases/latest"
-            headers = {
-                'Accept': 'application/vnd.github.v3+json',
-                'User-Agent': 'EmuMan-App-Client'
-            }
-            res = requests.get(url, headers=headers, timeout=8)
-            
-            if res.status_code == 200:
-                data = res.json()
-                remote_version = data.get("tag_name", "")
-                assets = data.get("assets", [])
-                download_url = None
-                sha256 = None
-                size = 0
-                
-                for asset in assets:
-                    if asset['name'].lower().endswith('.zip'):
-                        download_url = asset['browser_download_url']
-                        size = asset.get('size', 0)
-                        # Extract SHA256 from digest field (format: "sha256:xxxxx...")
-                        digest = asset.get('digest', '')
-                        if digest.startswith('sha256:'):
-                            sha256 = digest[7:]  # Remove "sha256:" prefix
-                        break
-                
-                FirmwareManager._save_firmware_cache(cache_path, remote_version, download_url, sha256, size)
-                logger.info(f"Remote firmware info cached: {remote_version}")
-                
-                if current_version:
-                    logger.info(f"Current local firmware version: {current_version}")
-                    if remote_version:
-                        has_update = FirmwareManager._compare_versions(current_version, remote_version)
-                    return has_update, remote_version, download_url, True
-                
-                return False, remote_version, download_url, True
-            else:
-                if cached_version:
-                    logger.warning(f"Failed to fetch firmware updates, using cached version: {cached_version}")
-                    if current_version:
-                        has_update = FirmwareManager._compare_versions(current_version, cached_version)
-                        return has_update, cached_version, cached_url, False
-                    return False, cached_version, cached_url, False
-                return False, None, None, False
-            
+            prefetch_startup(priority)
+            res = get_response_cache().fetch(FIRMWARE_RELEASE_URL, ttl_for("firmware"),
+                                             headers=http_client.github_headers(), timeout=8, stale_if_error=True,
+                                             priority=priority)
+            info = _parse_firmware_release(res.json())
         except Exception as e:
             logger.warning(f"Firmware update check failed: {e}")
-            cache_data = FirmwareManager._load_firmware_cache(cache_path)
-            if cache_data.get("version"):
-                cached_version = cache_data.get("version")
-                cached_url = cache_data.get("download_url")
-                if current_version:
-                    has_update = FirmwareManager._compare_versions(current_version, cached_version)
-                    return has_update, cached_version, cached_url, False
-                return False, cached_version, cached_url, False
             return False, None, None, False
-    
-    @staticmethod
-    def _load_firmware_cache(cache_path):
-        if not os.path.exists(cache_path):
-            return {}
-        
-        try:
-            with open(cache_path, 'r', encoding='utf-8') as f:
-                content = f.read().strip()
-                if not content: return {}
-                return json.loads(content)
-        except Exception as e:
-            logger.warning(f"Failed to load firmware cache: {e}")
-            try:
-                os.remove(cache_path) # Auto-heal
-            except: pass
-            return {}
-    
-    @staticmethod
-    def _save_firmware_cache(cache_path, version, download_url, sha256=None, size=0):
-        try:
-            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
-            
-            existing_data = {}
-            if os.path.exists(cache_path):
-                try:
-                    with open(cache_path, 'r', encoding='utf-8') as f:
-                        existing_data = json.load(f)
-                except: pass
 
-            cache_data = {
-                "version": version,
-                "download_url": download_url,
-                "sha256": sha256,
-                "size": size,
-                "timestamp": time.time()
-            }
-            
-            existing_data.update(cache_data)
-            
-            with open(cache_path, 'w', encoding='utf-8') as f:
-                json.dump(existing_data, f, indent=4)
-        except Exception as e:
-            logger.error(f"Failed to save firmware cache: {e}")
+        remote_version = info["version"]
+        cache_updated = not res.from_cache
+        if res.stale:
+            logger.warning(f"Failed to fetch firmware updates, using cached version: {remote_version}")
+        elif cache_updated:
+            logger.info(f"Remote firmware info cached: {remote_version}")
 
-    @staticmethod
-    def verify_sha256(file_path, expected_sha256):
-        """
-        Verify SHA256 checksum of a file.
-        
-        Args:
-            file_path: Path to the file to verify
-            expected_sha256: Expected SHA256 hex string
-            
-        Returns:
-            bool: True if checksum matches, False otherwise
-        """
-        if not expected_sha256:
-            logger.warning("No SHA256 checksum available for verification")
-            return True  # Skip verification if no checksum available
-            
-        try:
-            import hashlib
-            sha256_hash = hashlib.sha256()
-            
-            with open(file_path, "rb") as f:
-                # Read in chunks to handle large files
-                for byte_block in iter(lambda: f.read(4096), b""):
-                    sha256_hash.update(byte_block)
-            
-            calculated_sha256 = sha256_hash.hexdigest()
-            
-            if calculated_sha256 == expected_sha256:
-                logger.info(f"SHA256 verification passed: {expected_sha256[:16]}...")
-                return True
-            else:
-                logger.error(f"SHA256 mismatch! Expected: {expected_sha256}, Got: {calculated_sha256}")
-                return False
-                
-        except Exception as e:
-            logger.error(f"SHA256 verification failed: {e}")
-            return False
+        has_update = False
+        if current_version and remote_version:
+            logger.info(f"Current local firmware version: {current_version}")
+            has_update = FirmwareManager._compare_versions(current_version, remote_version)
+        return has_update, remote_version, info["download_url"], cache_updated
     
     @staticmethod
     def _compare_versions(current, remote):
@@ -568,7 +480,8 @@ class FirmwareManager(QObject):
             return False, str(e), 0
 
     @staticmethod
-    def download_and_install(download_url, eden_exe_path=None, progress_callback=None, cancel_check=None, version_tag=None):
+    def download_and_install(download_url, eden_exe_path=None, progress_callback=None, cancel_check=None, version_tag=None,
+                             on_submit=None):
         """
         下载并安装固件 (使用统一 Downloader)
         
@@ -579,6 +492,7 @@ class FirmwareManager(QObject):
                 phase: 'download' 或 'install'
             cancel_check: 取消检查回调，返回 True 则取消
             version_tag: 固件版本号
+            on_submit: 收到下载队列项 (DownloadItem) 的回调，用于暂停/继续
                 
         Returns:
             tuple: (success, message)
@@ -596,46 +510,39 @@ class FirmwareManager(QObject):
             filename = f"firmware_{version_tag}.zip" if version_tag else "firmware.zip"
         
         zip_path = temp_dir / filename
+        downloaded = False
         
         try:
             logger.info(f"Starting firmware download via Unified Downloader: {download_url}")
             logger.info(f"Saving to: {zip_path}")
             
-            if progress_callback:
-                progress_callback('download', 0, 100, "Connecting...")
-            
-            if not Downloader.download(download_url, zip_path, lambda phase, cur, tot, speed="": progress_callback('download', cur, tot, speed) if progress_callback else None, cancel_check):
-                return False, "Download failed or cancelled"
-            
-            logger.info(f"Firmware downloaded: {zip_path}")
-            
-            # Verify SHA256 checksum if enabled
-            verify_checksum = True
-            if os.path.exists("config.json"):
-                try:
-                    with open("config.json", 'r', encoding='utf-8') as f:
-                        verify_checksum = json.load(f).get("verify_firmware_checksum", True)
-                except Exception as e:
-                    logger.warning(f"Failed to read verify_firmware_checksum setting: {e}")
+            # Verify SHA256 checksum if enabled (hashed while downloading, no extra pass)
+            verify_checksum = load_config().get("verify_firmware_checksum", True)
             
+            digest = None
             if verify_checksum:
                 expected_sha256 = FirmwareManager._get_expected_sha256(version_tag)
-                
                 if expected_sha256:
-                    logger.info(f"Verifying firmware integrity (Expected: {expected_sha256})...")
-                    if progress_callback:
-                        progress_callback('verifying', 0, 0, "Verifying (SHA256)...")
-                    
-                    if not FirmwareManager.verify_sha256(str(zip_path), expected_sha256):
-                        try:
-                            os.remove(zip_path)
-                            logger.warning("Corrupted firmware deleted after failed verification.")
-                        except: pass
-                        return False, "Firmware checksum verification failed. File may be corrupted."
-                    logger.info("Firmware integrity verified.")
+                    logger.info(f"Firmware will be verified against SHA256 {expected_sha256}")
+                    digest = f"sha256:{expected_sha256}"
                 else:
                     logger.info("No SHA256 checksum found in cache, skipping verification.")
             
+            if progress_callback:
+                progress_callback('download', 0, 100, "Connecting...")
+            
+            try:
+                if not Downloader.download_queued(download_url, zip_path, lambda phase, cur, tot, speed="": progress_callback('download', cur, tot, speed) if progress_callback else None,
+                                                  cancel_check, PRIORITY_NORMAL, f"Firmware {version_tag or filename}", digest,
+                                                  on_submit):
+                    return False, "Download failed or cancelled"
+            except DigestMismatch as e:
+                logger.error(f"Corrupted firmware deleted after failed verification: {e}")
+                return False, "Firmware checksum verification failed. File may be corrupted."
+            downloaded = True
+            
+            logger.info(f"Firmware downloaded{' and verified' if digest else ''}: {zip_path}")
+            
             def install_progress(current, total):
                 if progress_callback:
                     progress_callback('install', current, total, "")
@@ -657,16 +564,12 @@ class FirmwareManager(QObject):
             logger.error(f"Firmware update failed: {e}")
             return False, str(e)
         finally:
-            should_keep = False
-            try:
-                if os.path.exists("config.json"):
-                    with open("config.json", 'r', encoding='utf-8') as f:
-                        cfg = json.load(f)
-                        should_keep = cfg.get("keep_firmware_archive", False)
-            except Exception as e:
-                logger.warning(f"Failed to read keep_firmware_archive setting: {e}")
+            should_keep = load_config().get("keep_firmware_archive", False)
             
-            if not should_keep:
+            if not downloaded and PartialDownload(zip_path, download_url).resumable():
+                # An interrupted download resumes from its .part file next time
+                logger.info(f"Kept partial firmware download for resume: {temp_dir}")
+            elif not should_keep:
                 try:
                     if temp_dir.exists():
                         shutil.rmtree(temp_dir)
@@ -0,0 +1,179 @@
+import json
+import time
+import threading
+
+from app.utils import http_client, mirrors
+from app.utils.config_store import load_config
+from app.utils.connectivity import is_online
+from app.utils.response_cache import get_response_cache, ttl_for
+from app.utils.rate_limit import get_tracker, PRIORITY_BACKGROUND
+
+from app.utils.logger import get_logger
+logger = get_logger(__name__)
+
+# =========================================
+#             Endpoints
+# =========================================
+
+MASTER_REPO = "eden-emulator/Releases"
+NIGHTLY_REPO = "pflyly/eden-nightly"
+FIRMWARE_REPO = "THZoria/NX_Firmware"
+APP_REPO = "pflyly/EmuMan"
+
+# GitHub caps per_page at 100; incremental syncs only need to reach the newest cached tag
+MAX_PAGE_SIZE = 100
+INCREMENTAL_PAGE_SIZE = 10
+
+
+def release_list_url(repo, per_page):
+    return f"{http_client.GITHUB_API}/repos/{repo}/releases?per_page={per_page}"
+
+
+def latest_release_url(repo):
+    return f"{http_client.GITHUB_API}/repos/{repo}/releases/latest"
+
+
+# =========================================
+#             Batched GraphQL Prefetch
+# =========================================
+# With a token, everything fetched at startup (both release lists, the firmware and EmuMan
+# latest releases) comes from one GraphQL query. The results are converted to the REST shape
+# and stored in the response cache under the REST URLs, so the sync and update-check code
+# reads them exactly as before; without a token (or if the query fails) they use REST.
+
+# (alias, repo) of the release lists synced at startup, and of the "latest release" lookups
+STARTUP_LISTS = (("master", MASTER_REPO), ("nightly", NIGHTLY_REPO))
+STARTUP_LATEST = (("firmware", FIRMWARE_REPO, "firmware"), ("app", APP_REPO, "app_update"))
+
+# After an attempt, further prefetches within this window go straight to REST
+PREFETCH_RETRY_AFTER = 60
+
+RELEASE_FRAGMENT = """
+fragment rel on Release {
+  tagName
+  url
+  description
+  releaseAssets(first: 100) { nodes { name size downloadUrl digest } }
+}
+"""
+
+_prefetch_lock = threading.Lock()
+_last_attempt = 0
+
+
+def _page_sizes(cfg):
+    """First-page sizes the sync may request: incremental and full (see SyncWorker._fetch_branch)."""
+    fetch_limit = int(cfg.get("fetch_limit", 15))
+    return sorted({INCREMENTAL_PAGE_SIZE, min(fetch_limit, MAX_PAGE_SIZE)})
+
+
+def _build_query():
+    parts = []
+    for alias, repo in STARTUP_LISTS:
+        owner, name = repo.split("/")
+        parts.append(f'{alias}: repository(owner: "{owner}", name: "{name}") {{ '
+                     'releases(first: $count, orderBy: {field: CREATED_AT, direction: DESC}) '
+                     '{ pageInfo { hasNextPage } nodes { ...rel } } }')
+    for alias, repo, _ in STARTUP_LATEST:
+        owner, name = repo.split("/")
+        parts.append(f'{alias}: repository(owner: "{owner}", name: "{name}") {{ latestRelease {{ ...rel }} }}')
+    return "query($count: Int!) {\n  " + "\n  ".join(parts) + "\n}\n" + RELEASE_FRAGMENT
+
+
+def _to_rest(node):
+    """A GraphQL Release node in the REST shape (only the fields EmuMan reads)."""
+    return {
+        "tag_name": node["tagName"],
+        "html_url": node["url"],
+        "body": node.get("description") or "",
+        "assets": [{"name": a["name"], "size": a["size"], "browser_download_url": a["downloadUrl"],
+                    "digest": a.get("digest")} for a in node["releaseAssets"]["nodes"]],
+    }
+
+
+def _startup_urls(cfg):
+    """Cached REST URL -> TTL kind for everything the prefetch provides."""
+    urls = {}
+    for _, repo in STARTUP_LISTS:
+        for size in _page_sizes(cfg):
+            urls[release_list_url(repo, size)] = "releases"
+    for _, repo, kind in STARTUP_LATEST:
+        urls[latest_release_url(repo)] = kind
+    return urls
+
+
+def prefetch_startup(priority=PRIORITY_BACKGROUND):
+    """
+    Fill the response cache for all startup requests with one GraphQL query.
+    Safe to call from every consumer: concurrent callers wait for the query in flight, and
+    nothing is sent when the cached entries are still fresh. Returns True if the cache
+    holds fresh entries for all startup URLs afterwards. Never raises: on any failure
+    (e.g. a locked shared cache) the callers simply go through REST.
+    """
+    try:
+        return _prefetch_startup(priority)
+    except Exception as e:
+        logger.warning(f"GraphQL prefetch failed, using REST: {e}")
+        return False
+
+
+def _prefetch_startup(priority):
+    global _last_attempt
+    cfg = load_config()
+    token = cfg.get("gh_token")
+    # GraphQL needs a token; a LAN mirror (REST only) is cheaper still
+    if not token or mirrors.api_url(latest_release_url(APP_REPO)) or not is_online():
+        return False
+
+    with _prefetch_lock:
+        cache = get_response_cache()
+        urls = _startup_urls(cfg)
+        if all(cache.peek(url, ttl_for(kind)) for url, kind in urls.items()):
+            return True
+        if time.time() - _last_attempt < PREFETCH_RETRY_AFTER:
+            return False
+        _last_attempt = time.time()
+
+        tracker = get_tracker()
+        if not tracker.acquire(priority, "graphql"):
+            logger.info("GraphQL rate limit budget low, using REST.")
+            return False
+
+        sizes = _page_sizes(cfg)
+        count = max(sizes)
+        try:
+            res = http_client.get_session().post(
+                f"{http_client.GITHUB_API}/graphql",
+                json={"query": _build_query(), "variables": {"count": count}},
+                headers={"Authorization": f"bearer {token}"}, timeout=10)
+            res.raise_for_status()
+            payload = res.json()
+        except Exception as e:
+            logger.warning(f"GraphQL prefetch failed, using REST: {e}")
+            return False
+
+        for error in payload.get("errors") or []:
+            logger.warning(f"GraphQL prefetch error: {error.get('message')}")
+        data = payload.get("data") or {}
+
+        stored = 0
+        for alias, repo in STARTUP_LISTS:
+            releases = ((data.get(alias) or {}).get("releases")) or None
+            if not releases:
+                continue
+            nodes = [_to_rest(n) for n in releases["nodes"]]
+            for size in sizes:
+                # Same pages the REST API would return, including the link to the rest of the history
+                url = release_list_url(repo, size)
+                more = len(nodes) > size or releases["pageInfo"]["hasNextPage"]
+                link = f'<{url}&page=2>; rel="next"' if more else None
+                cache.put(url, json.dumps(nodes[:size]).encode(), link)
+                stored += 1
+        for alias, repo, _ in STARTUP_LATEST:
+            node = (data.get(alias) or {}).get("latestRelease")
+            if node:
+                cache.put(latest_release_url(repo), json.dumps(_to_rest(node)).encode())
+                stored += 1
+
+        logger.info(f"GraphQL prefetch stored {stored}/{len(urls)} startup responses in one request.")
+        return stored == len(urls)
@@ -0,0 +1,393 @@
+import os
+import re
+import json
+import sqlite3
+from contextlib import contextmanager
+
+from app.utils import sqlite_store
+
+from app.utils.logger import get_logger
+logger = get_logger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS channels (
+    channel TEXT PRIMARY KEY,
+    validators TEXT
+);
+CREATE TABLE IF NOT EXISTS releases (
+    channel TEXT NOT NULL,
+    tag TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (channel, tag)
+);
+CREATE INDEX IF NOT EXISTS idx_releases_order ON releases (channel, position);
+CREATE TABLE IF NOT EXISTS assets (
+    tag TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    url TEXT,
+    size INTEGER,
+    digest TEXT,
+    PRIMARY KEY (tag, name)
+);
+CREATE TABLE IF NOT EXISTS history (
+    channel TEXT NOT NULL,
+    tag TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    PRIMARY KEY (channel, tag)
+);
+CREATE TABLE IF NOT EXISTS changelogs (
+    channel TEXT NOT NULL,
+    tag TEXT NOT NULL,
+    body TEXT,
+    html TEXT,
+    PRIMARY KEY (channel, tag)
+);
+CREATE TABLE IF NOT EXISTS search_docs (
+    id INTEGER PRIMARY KEY,
+    channel TEXT NOT NULL,
+    tag TEXT NOT NULL,
+    body TEXT NOT NULL,
+    UNIQUE (channel, tag)
+);
+"""
+
+# Full-text index over search_docs (external content: bodies are stored once, in search_docs).
+# Unlike the changelogs table it is not subject to retention, so old releases stay searchable.
+SEARCH_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS changelog_search USING fts5(
+    body, content='search_docs', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+"""
+
+class ReleaseCatalog:
+    """
+    SQLite-backed store for synced release data (versions, assets, changelogs per channel).
+    Freshness metadata lives in its own row, so age checks and per-tag lookups are
+    single indexed queries instead of a full document parse.
+    """
+
+    def __init__(self, db_path, legacy_json=None):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            sqlite_store.use_rollback_journal(conn)
+            conn.executescript(SCHEMA)
+            # Catalogs from older versions lack columns added later
+            self._add_missing_column(conn, "changelogs", "html", "TEXT")
+            self._add_missing_column(conn, "assets", "digest", "TEXT")
+            try:
+                conn.executescript(SEARCH_SCHEMA)
+                self.fts = True
+            except sqlite3.OperationalError as e:
+                # SQLite built without FTS5: search falls back to substring matching
+                logger.warning(f"FTS5 unavailable, changelog search uses plain matching: {e}")
+                self.fts = False
+            # Catalogs from before the search index: index the changelogs they already hold
+            if not conn.execute("SELECT 1 FROM search_docs LIMIT 1").fetchone():
+                for channel, in conn.execute("SELECT DISTINCT channel FROM changelogs").fetchall():
+                    rows = conn.execute("SELECT c.tag, c.body FROM changelogs c LEFT JOIN history h "
+                                        "ON h.channel = c.channel AND h.tag = c.tag WHERE c.channel = ? "
+                                        "ORDER BY h.seq DESC", (channel,)).fetchall()
+                    self._index(conn, channel, dict(rows))
+        if legacy_json:
+            self._migrate_legacy_json(legacy_json)
+
+    @staticmethod
+    def _add_missing_column(conn, table, column, decl):
+        if column not in [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+
+    @contextmanager
+    def _connect(self):
+        """Short-lived connection per operation; safe to use from worker threads."""
+        conn = sqlite_store.connect(self.db_path)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _migrate_legacy_json(self, legacy_json):
+        """Import a pre-catalog eden_cache.json once, then remove it."""
+        if not os.path.exists(legacy_json):
+            return
+        try:
+            if self.get_timestamp() is None:
+                with open(legacy_json, 'r', encoding='utf-8') as f:
+                    legacy = json.load(f)
+                if legacy.get("data"):
+                    self.save(legacy["data"], legacy.get("timestamp", 0))
+                    logger.info("Migrated legacy eden_cache.json into release catalog.")
+            os.remove(legacy_json)
+        except Exception as e:
+            logger.warning(f"Failed to migrate legacy cache: {e}")
+
+    # =========================================
+    #             Freshness
+    # =========================================
+
+    def get_timestamp(self):
+        """Time of the last successful sync, or None if the catalog is empty."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'timestamp'").fetchone()
+        return float(row[0]) if row else None
+
+    # =========================================
+    #             Per-tag Lookups
+    # =========================================
+
+    def get_versions(self, channel):
+        with self._connect() as conn:
+            rows = conn.execute("SELECT tag FROM releases WHERE channel = ? ORDER BY position", (channel,)).fetchall()
+        return [r[0] for r in rows]
+
+    def get_assets(self, tag):
+        with self._connect() as conn:
+            rows = conn.execute("SELECT name, url, size, digest FROM assets WHERE tag = ? ORDER BY position", (tag,)).fetchall()
+        return [{"name": name, "browser_download_url": url, "size": size, "digest": digest} for name, url, size, digest in rows]
+
+    def get_changelog(self, channel, tag):
+        with self._connect() as conn:
+            row = conn.execute("SELECT body FROM changelogs WHERE channel = ? AND tag = ?", (channel, tag)).fetchone()
+        return row[0] if row else None
+
+    def get_rendered_changelog(self, channel, tag):
+        """(markdown, pre-rendered html) of a changelog; html is None if it was never rendered."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT body, html FROM changelogs WHERE channel = ? AND tag = ?", (channel, tag)).fetchone()
+        return tuple(row) if row else (None, None)
+
+    def get_history(self, channel):
+        """Every retained tag of a channel, newest first (a superset of the listed versions)."""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT tag FROM history WHERE channel = ? ORDER BY seq DESC", (channel,)).fetchall()
+        return [r[0] for r in rows]
+
+    def get_changelogs(self, channel, tags):
+        """Stored changelog bodies for the given tags of a channel (missing tags are left out)."""
+        tags = list(tags)
+        if not tags:
+            return {}
+        with self._connect() as conn:
+            rows = conn.execute(f"SELECT tag, body FROM changelogs WHERE channel = ? AND tag IN ({','.join('?' * len(tags))})",
+                                (channel, *tags)).fetchall()
+        return dict(rows)
+
+    # =========================================
+    #             Bulk Load / Save
+    # =========================================
+
+    def load(self, include_changelogs=True):
+        """
+        Load the sync payload in the shape produced by SyncWorker, or None if empty.
+        Changelog bodies can be left out; they are fetched per tag via get_rendered_changelog().
+        """
+        if self.get_timestamp() is None:
+            return None
+
+        data = {"versions": {}, "changelogs": {}, "assets": {}, "validators": {}}
+        with self._connect() as conn:
+            for channel, validators in conn.execute("SELECT channel, validators FROM channels"):
+                data["versions"][channel] = []
+                data["changelogs"][channel] = {}
+                if validators:
+                    data["validators"][channel] = json.loads(validators)
+            for channel, tag in conn.execute("SELECT channel, tag FROM releases ORDER BY channel, position"):
+                data["versions"].setdefault(channel, []).append(tag)
+            if include_changelogs:
+                for channel, tag, body in conn.execute("SELECT channel, tag, body FROM changelogs"):
+                    data["changelogs"].setdefault(channel, {})[tag] = body
+            for tag, name, url, size, digest in conn.execute("SELECT tag, name, url, size, digest FROM assets ORDER BY tag, position"):
+                data["assets"].setdefault(tag, []).append({"name": name, "browser_download_url": url, "size": size, "digest": digest})
+        return data
+
+    def save(self, data, timestamp=None):
+        """
+        Store a sync payload in a single transaction. The listed versions of each channel are
+        replaced; assets and changelogs are upserted per tag and only dropped by compact().
+        timestamp=None keeps the previous sync time.
+        """
+        versions = data.get("versions", {})
+        changelogs = data.get("changelogs", {})
+        changelog_html = data.get("changelog_html", {})
+        assets = data.get("assets", {})
+        validators = data.get("validators", {})
+
+        with self._connect() as conn:
+            for channel, tags in versions.items():
+                conn.execute("INSERT OR REPLACE INTO channels (channel, validators) VALUES (?, ?)",
+                             (channel, json.dumps(validators[channel]) if validators.get(channel) else None))
+                conn.execute("DELETE FROM releases WHERE channel = ?", (channel,))
+                conn.executemany("INSERT OR REPLACE INTO releases (channel, tag, position) VALUES (?, ?, ?)",
+                                 [(channel, tag, i) for i, tag in enumerate(tags)])
+
+                self._update_history(conn, channel, tags)
+
+                listed = set(tags)
+                # Rendered html survives an upsert without one as long as the markdown is unchanged
+                rendered = changelog_html.get(channel, {})
+                conn.executemany("INSERT INTO changelogs (channel, tag, body, html) VALUES (?, ?, ?, ?) "
+                                 "ON CONFLICT (channel, tag) DO UPDATE SET body = excluded.body, "
+                                 "html = COALESCE(excluded.html, CASE WHEN changelogs.body = excluded.body THEN changelogs.html END)",
+                                 [(channel, tag, body, rendered.get(tag)) for tag, body in changelogs.get(channel, {}).items() if tag in listed])
+                self._index(conn, channel, {tag: body for tag, body in changelogs.get(channel, {}).items() if tag in listed})
+
+            conn.executemany("DELETE FROM assets WHERE tag = ?", [(tag,) for tag in assets])
+            conn.executemany("INSERT OR REPLACE INTO assets (tag, position, name, url, size, digest) VALUES (?, ?, ?, ?, ?, ?)",
+                             [(tag, i, a["name"], a.get("browser_download_url"), a.get("size", 0), a.get("digest"))
+                              for tag, items in assets.items() for i, a in enumerate(items)])
+
+            if timestamp is not None:
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('timestamp', ?)", (str(timestamp),))
+            else:
+                conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('timestamp', '0')")
+
+    @staticmethod
+    def _update_history(conn, channel, tags):
+        """
+        Merge the listed tags (newest first) into the channel's history, which orders every
+        tag ever listed by release order (oldest gets the lowest seq). New tags go where the
+        listing puts them, so backfilled old releases land below the newer known ones.
+        """
+        history = [r[0] for r in conn.execute("SELECT tag FROM history WHERE channel = ? ORDER BY seq DESC", (channel,))]
+        known = set(history)
+        if known.issuperset(tags):
+            return
+        merged, rest = [], iter(history)
+        for tag in tags:
+            if tag in known:
+                # Unlisted history tags newer than this one keep their place in front of it
+                for h in rest:
+                    merged.append(h)
+                    if h == tag:
+                        break
+            else:
+                merged.append(tag)
+        merged.extend(rest)
+        conn.execute("DELETE FROM history WHERE channel = ?", (channel,))
+        conn.executemany("INSERT INTO history (channel, tag, seq) VALUES (?, ?, ?)",
+                         [(channel, tag, len(merged) - i) for i, tag in enumerate(merged)])
+
+    # =========================================
+    #             Search
+    # =========================================
+
+    def _index(self, conn, channel, changelogs, replace=True):
+        """
+        Add changelogs ({tag: body}, newest first) to the search index. Only new tags and
+        edited bodies touch the index; replace=False leaves already indexed tags alone.
+        """
+        if not changelogs:
+            return 0
+        tags = list(changelogs)
+        indexed = {}
+        for i in range(0, len(tags), 500):
+            chunk = tags[i:i + 500]
+            indexed.update({tag: (doc_id, body) for doc_id, tag, body in conn.execute(
+                f"SELECT id, tag, body FROM search_docs WHERE channel = ? AND tag IN ({','.join('?' * len(chunk))})",
+                (channel, *chunk))})
+
+        count = 0
+        # Oldest first, so newer releases get higher ids (the tie-breaker in search results)
+        for tag in reversed(tags):
+            body = changelogs[tag]
+            old = indexed.get(tag)
+            if not body or (old and (old[1] == body or not replace)):
+                continue
+            if old:
+                if self.fts:
+                    conn.execute("INSERT INTO changelog_search (changelog_search, rowid, body) VALUES ('delete', ?, ?)", old)
+                conn.execute("UPDATE search_docs SET body = ? WHERE id = ?", (body, old[0]))
+                doc_id = old[0]
+            else:
+                doc_id = conn.execute("INSERT INTO search_docs (channel, tag, body) VALUES (?, ?, ?)",
+                                      (channel, tag, body)).lastrowid
+            if self.fts:
+                conn.execute("INSERT INTO changelog_search (rowid, body) VALUES (?, ?)", (doc_id, body))
+            count += 1
+        return count
+
+    def index_changelogs(self, channel, changelogs):
+        """Index changelogs from another source (e.g. local .md files) without overriding synced ones."""
+        with self._connect() as conn:
+            return self._index(conn, channel, changelogs, replace=False)
+
+    def get_indexed_changelog(self, channel, tag):
+        """Changelog body from the search index (also covers tags dropped by compact())."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT body FROM search_docs WHERE channel = ? AND tag = ?", (channel, tag)).fetchone()
+        return row[0] if row else None
+
+    def search(self, query, channel=None, limit=50):
+        """
+        Tags whose changelog matches every word of query (the last word may be partial), best
+        match first; newer releases win ties. Returns [(channel, tag, snippet)].
+        """
+        words = re.findall(r"\w+", query.lower())
+        if not words:
+            return []
+        channel_filter = "AND d.channel = ?" if channel else ""
+        params = [channel] if channel else []
+        with self._connect() as conn:
+            if self.fts:
+                # Whole words, except a trailing partial word of 3+ characters
+                match = " ".join(f'"{w}"' for w in words[:-1])
+                match += f' "{words[-1]}"' + ("*" if len(words[-1]) >= 3 else "")
+                # Rank first, then build snippets for the returned rows only
+                hits = conn.execute(
+                    "SELECT d.id, d.channel, d.tag FROM changelog_search JOIN search_docs d ON d.id = changelog_search.rowid "
+                    f"WHERE changelog_search MATCH ? {channel_filter} ORDER BY rank, d.id DESC LIMIT ?",
+                    (match, *params, limit)).fetchall()
+                if not hits:
+                    return []
+                snippets = dict(conn.execute(
+                    "SELECT rowid, snippet(changelog_search, 0, '[', ']', '…', 12) FROM changelog_search "
+                    f"WHERE changelog_search MATCH ? AND rowid IN ({','.join('?' * len(hits))})",
+                    (match, *[h[0] for h in hits])).fetchall())
+                return [(ch, tag, snippets.get(doc_id, "")) for doc_id, ch, tag in hits]
+
+            # Without FTS5: all words as substrings, newest first
+            likes = " AND ".join("LOWER(d.body) LIKE ?" for _ in words)
+            rows = conn.execute(f"SELECT d.channel, d.tag, d.body FROM search_docs d WHERE {likes} {channel_filter} "
+                                "ORDER BY d.id DESC LIMIT ?", (*[f"%{w}%" for w in words], *params, limit)).fetchall()
+        results = []
+        for ch, tag, body in rows:
+            pos = body.lower().find(words[0])
+            start = max(0, pos - 40)
+            results.append((ch, tag, ("…" if start else "") + body[start:pos + 60].replace("\n", " ")))
+        return results
+
+    # =========================================
+    #             Retention
+    # =========================================
+
+    def compact(self, keep, pinned=None):
+        """
+        Drop the history, assets and changelogs of tags outside the retention window.
+        Per channel the `keep` newest tags are retained, plus the listed versions and
+        any tag in pinned ({channel: tags}, e.g. locally installed builds).
+        Returns the number of tags removed.
+        """
+        pinned = pinned or {}
+        removed = 0
+        with self._connect() as conn:
+            for (channel,) in conn.execute("SELECT DISTINCT channel FROM history").fetchall():
+                tags = [r[0] for r in conn.execute("SELECT tag FROM history WHERE channel = ? ORDER BY seq DESC", (channel,))]
+                listed = {r[0] for r in conn.execute("SELECT tag FROM releases WHERE channel = ?", (channel,))}
+                retained = set(tags[:keep]) | listed | set(pinned.get(channel, ()))
+                drop = [(channel, tag) for tag in tags if tag not in retained]
+                conn.executemany("DELETE FROM history WHERE channel = ? AND tag = ?", drop)
+                removed += len(drop)
+
+            # Everything else follows the history; assets are keyed by tag alone
+            conn.execute("DELETE FROM changelogs WHERE NOT EXISTS "
+                         "(SELECT 1 FROM history h WHERE h.channel = changelogs.channel AND h.tag = changelogs.tag)")
+            conn.execute("DELETE FROM assets WHERE tag NOT IN (SELECT tag FROM history)")
+        if removed:
+            logger.info(f"Release catalog compacted: {removed} tags dropped.")
+        return removed
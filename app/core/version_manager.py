@@ -67,19 +67,23 @@ class VersionManager:
             return (major, minor, patch, rc_weight)
         return sorted(version_list, key=version_key, reverse=True)
 
-    def get_local_list(self, branch, base_path, known_cloud_tags):
-        """Scan directory and return mapping of {Tag: FolderName}."""
+    def scan_candidates(self, branch, base_path):
+        """
+        Scan the versions directory for installed builds of a branch.
+        Returns {ItemName: ShortVersion} for every entry that contains an executable.
+        Depends only on the filesystem, so the result can be cached against a directory fingerprint.
+        """
         if not base_path or not os.path.exists(base_path):
             return {}
         
-        local_map = {}
+        candidates = {}
         try:
             for item in os.listdir(base_path):
                 item_path = os.path.join(base_path, item)
                 is_dir = os.path.isdir(item_path)
                 
-                # Skip obvious archives
-                if not is_dir and item.lower().endswith((".zip", ".7z", ".aria2")):
+                # Skip obvious archives and unfinished downloads
+                if not is_dir and item.lower().endswith((".zip", ".7z", ".aria2", ".part", ".part.json")):
                     continue
                 
                 # Master validation (usually directories or specific linux packages)
@@ -89,20 +93,23 @@ class VersionManager:
                 if not self.is_item_for_branch(item, branch):
                     continue
 
-                short = self.get_short_version(item)
-                matched = None
-                for k in known_cloud_tags:
-                    if branch == "master":
-                        if k == short: matched = k; break
-                    else: # Nightly
-                        if short in k: matched = k; break
-                
-                if matched:
-                    # Final Integrity Guard: Only mark as installed if executable exists
-                    exe = self.find_executable(base_path, item)
-                    if exe and os.path.exists(exe):
-                        local_map[matched] = item
-            return local_map
+                # Final Integrity Guard: Only count as installed if executable exists
+                exe = self.find_executable(base_path, item)
+                if exe and os.path.exists(exe):
+                    candidates[item] = self.get_short_version(item)
+            return candidates
         except Exception as e:
             logger.error(f"Failed to scan local versions for {branch}: {e}")
             return {}
+
+    @staticmethod
+    def match_tags(branch, candidates, known_cloud_tags):
+        """Map scanned candidates onto cloud tags. Returns {Tag: FolderName}."""
+        local_map = {}
+        for item, short in candidates.items():
+            for k in known_cloud_tags:
+                if branch == "master":
+                    if k == short: local_map[k] = item; break
+                else: # Nightly
+                    if short in k: local_map[k] = item; break
+        return local_map
@@ -1,6 +1,6 @@
 import os
 from PySide6.QtCore import Signal, Qt
-from PySide6.QtGui import QColor, QIcon, QPixmap, QImage
+from PySide6.QtGui import QColor, QIcon, QPixmap, QImage, QTextDocument
 from PySide6.QtWidgets import QVBoxLayout, QHBoxLayout
 
 from app.utils.logger import get_logger
@@ -37,6 +37,7 @@ class ChannelCard(CardWidget):
         self.branch = branch
         self.lang = {}
         self.downloading_versions = set()
+        self._document = None
         self.setup_ui()
         
     def setup_ui(self):
@@ -68,6 +69,9 @@ class ChannelCard(CardWidget):
         # 4. Changelog
         self.changelog = TextBrowser(self)
         self.changelog.setOpenExternalLinks(True)
+        # Owned by the card: the browser deletes documents it created itself when swapped out
+        self._own_document = QTextDocument(self)
+        self.changelog.setDocument(self._own_document)
         
         
         # 5. Action Buttons
@@ -185,8 +189,19 @@ class ChannelCard(CardWidget):
         self.statusLabel.setText(f"{prefix}{status_val}")
 
     def set_changelog(self, content):
+        # Never render into a shared cached document; switch back to the browser's own
+        if self._document is not None:
+            self._document = None
+            self.changelog.setDocument(self._own_document)
         self.changelog.setMarkdown(content)
 
+    def set_changelog_document(self, document):
+        """Show a pre-built changelog document (kept referenced while it is displayed)."""
+        if document.defaultFont() != self.changelog.font():
+            document.setDefaultFont(self.changelog.font())
+        self._document = document
+        self.changelog.setDocument(document)
+
     def set_download_progress(self, progress):
         """
         Updates the download progress display.
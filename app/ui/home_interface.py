@@ -13,7 +13,7 @@ from PySide6.QtWidgets import QFrame, QVBoxLayout, QHBoxLayout
 
 from qfluentwidgets import (DisplayLabel, setFont, FluentIcon as FIF, TransparentToolButton,
                             InfoBar, InfoBarPosition, ImageLabel, CaptionLabel, MessageBox,
-                            MessageBoxBase, SubtitleLabel, ComboBox)
+                            MessageBoxBase, SubtitleLabel, ComboBox, SearchLineEdit, RoundMenu, Action)
 
 from app.config import LANG_MAP, CURRENT_VERSION
 from app.core.version_manager import VersionManager
@@ -24,6 +24,7 @@ from app.core.app_updater import AppUpdater
 from app.core.firmware_manager import FirmwareManager
 from app.ui.components.channel_card import ChannelCard
 from app.utils.path_utils import get_resource_path, open_directory
+from app.utils.download_queue import QUEUED, PAUSED
 
 class DownloadSelectionDialog(MessageBoxBase):
     def __init__(self, parent, title, items, best_index=0):
@@ -58,9 +59,10 @@ class HomeInterface(QFrame):
         self.m_versions = []
         self.n_versions = []
         self.downloading_versions = set()
-        self.cloud_changelogs = {}
         self.cloud_assets = {}
+        self.manual_sync = False
         self.current_download_params = {}
+        self.downloads = {}  # tag -> {"branch", "bar", "button", "paused"}; one InfoBar per queued download
         self.lang = LANG_MAP.get("en")
         
         # Selection Restore State
@@ -82,13 +84,14 @@ class HomeInterface(QFrame):
         self.file_processor = FileProcessor()
         # Connect FileProcessor signals
         self.file_processor.download_progress.connect(self.on_download_progress)
+        self.file_processor.download_state.connect(self.on_download_state)
         self.file_processor.process_finished.connect(self.on_process_finished)
         self.file_processor.manual_required.connect(self.on_manual_required)
         self.file_processor.process_cancelled.connect(self.on_process_cancelled)
         
         self.cache_manager = CacheManager()
         self.cache_manager.sync_started.connect(self.on_sync_started)
-        self.cache_manager.sync_finished.connect(self.on_sync_finished)
+        self.cache_manager.sync_diff.connect(self.on_sync_diff)
         self.cache_manager.sync_error.connect(self.on_sync_error)
         
         self.app_updater = AppUpdater()
@@ -163,11 +166,19 @@ class HomeInterface(QFrame):
         self.openEdenFolderBtn = TransparentToolButton(FIF.GAME, self)
         self.openEdenFolderBtn.setToolTip(self.lang.get("open_eden_folder", "Open Eden Folder"))
         self.openEdenFolderBtn.clicked.connect(self.open_eden_folder)
+
+        # Changelog search (Enter or the search button)
+        self.searchEdit = SearchLineEdit(self)
+        self.searchEdit.setPlaceholderText(self.lang.get("search_changelogs", "Search changelogs..."))
+        self.searchEdit.setFixedWidth(240)
+        self.searchEdit.searchSignal.connect(self.on_search_changelogs)
         
         header.addWidget(logo)
         header.addSpacing(15)
         header.addLayout(titles)
         header.addStretch(1)
+        header.addWidget(self.searchEdit)
+        header.addSpacing(8)
         header.addWidget(self.openEdenFolderBtn)
         header.addWidget(self.openUserFolderBtn)
         header.addWidget(self.refreshBtn)
@@ -202,24 +213,23 @@ class HomeInterface(QFrame):
 
         
         self.refreshBtn.setToolTip(self.lang.get("refresh_data", "Refresh"))
+        self.searchEdit.setPlaceholderText(self.lang.get("search_changelogs", "Search changelogs..."))
         self.openUserFolderBtn.setToolTip(self.lang.get("open_user_folder", "Open Data Folder"))
         self.openEdenFolderBtn.setToolTip(self.lang.get("open_eden_folder", "Open Eden Folder"))
         
     def load_initial_cache(self):
-        # Use our persistent manager instance
-        is_fresh, data = self.cache_manager.is_cache_fresh()
-        
-        # 1. Always load existing data if available (even if stale) to populate UI immediately
+        # Show cached data (even if stale) immediately; a stale cache is revalidated in the
+        # background and only its changes come back through on_sync_diff
+        data = self.cache_manager.load_and_revalidate()
         if data:
-            logger.info(f"Local API cache loaded. Fresh: {is_fresh}")
-            self.on_sync_finished(data, silent=True)
-            
-        # 2. If missing or expired, trigger background sync
-        if not is_fresh:
-            logger.info("Cache missing or expired. Starting data sync...")
-            self.cache_manager.start_sync_task(force=False)
+            logger.info("Local API cache loaded.")
+            self.apply_release_data(data)
 
     def refresh_local_and_ui(self):
+        self._refresh_channels(("master", "nightly"))
+
+    def _refresh_channels(self, branches):
+        """Rescan local builds and rebuild the combo boxes of the given channels only."""
         base_path = ""
         if os.path.exists("config.json"): 
             try:
@@ -235,54 +245,45 @@ class HomeInterface(QFrame):
                  try: os.makedirs(base_path, exist_ok=True)
                  except: pass
 
-        m_local = self.version_mgr.get_local_list("master", base_path, self.m_versions)
-        n_local = self.version_mgr.get_local_list("nightly", base_path, self.n_versions)
+        local = self._get_local_maps(base_path, branches)
+        for branch in branches:
+            card = self.masterCard if branch == "master" else self.nightlyCard
+            cloud = self.m_versions if branch == "master" else self.n_versions
+
+            all_tags = list(set(cloud) | set(local[branch].keys()))
+            if branch == "master":
+                full_list = self.version_mgr.sort_versions(all_tags)
+            else:
+                full_list = sorted(all_tags, key=lambda x: self.version_mgr.get_short_version(x), reverse=True)
+            card.update_data(full_list, local[branch], self.downloading_versions)
+
+            # Restore selection if pending (One-time)
+            restore = self.restore_master if branch == "master" else self.restore_nightly
+            if restore:
+                idx = card.combo.findData(restore)
+                if idx >= 0: card.combo.setCurrentIndex(idx)
+                if branch == "master": self.restore_master = None
+                else: self.restore_nightly = None
         
         # Only log scan results if we have cloud version data to match against
-        if self.m_versions or self.n_versions:
-            if (len(m_local), len(n_local)) != self.last_scan_counts:
-                logger.info(f"Local Scan: Found {len(m_local)} Master, {len(n_local)} Nightly versions.")
-                self.last_scan_counts = (len(m_local), len(n_local))
-        
-        m_all = list(set(self.m_versions) | set(m_local.keys()))
-        m_full_list = self.version_mgr.sort_versions(m_all)
-        
-        n_all = list(set(self.n_versions) | set(n_local.keys()))
-        n_full_list = sorted(n_all, key=lambda x: self.version_mgr.get_short_version(x), reverse=True)
-
-        self.masterCard.update_data(m_full_list, m_local, self.downloading_versions)
-        self.nightlyCard.update_data(n_full_list, n_local, self.downloading_versions)
-
-        # Restore selection if pending (One-time)
-        if self.restore_master:
-            idx = self.masterCard.combo.findData(self.restore_master)
-            if idx >= 0: self.masterCard.combo.setCurrentIndex(idx)
-            self.restore_master = None
-
-        if self.restore_nightly:
-            idx = self.nightlyCard.combo.findData(self.restore_nightly)
-            if idx >= 0: self.nightlyCard.combo.setCurrentIndex(idx)
-            self.restore_nightly = None
-
-    def on_selection_changed(self, branch):
-        card = self.masterCard if branch == "master" else self.nightlyCard
-        tag = card.combo.currentData()
-        if not tag: return
-        
-        # Update Changelog
-        content = self.cloud_changelogs.get(branch, {}).get(tag)
-        if not content:
-            cache_path = os.path.join("changelogs", f"{branch}_{tag}.md")
-            if os.path.exists(cache_path):
-                try:
-                    with open(cache_path, 'r', encoding='utf-8') as f: content = f.read()
-                except Exception: pass
-        
-        card.set_changelog(content or self.lang.get("changelog_placeholder", "### Loading..."))
-        card.update_ui_state()
+        if len(local) == 2 and (self.m_versions or self.n_versions):
+            counts = (len(local["master"]), len(local["nightly"]))
+            if counts != self.last_scan_counts:
+                logger.info(f"Local Scan: Found {counts[0]} Master, {counts[1]} Nightly versions.")
+                self.last_scan_counts = counts
+
+    def _get_local_maps(self, base_path, branches):
+        """{branch: {Tag: FolderName}} from the fingerprint-validated scan cache."""
+        candidates = self.cache_manager.get_local_candidates(base_path, branches, self.version_mgr.scan_candidates,
+                                                             self.version_mgr.find_executable)
+        return {
+            branch: self.version_mgr.match_tags(branch, candidates[branch], self.m_versions if branch == "master" else self.n_versions)
+            for branch in branches
+        }
 
     def start_data_sync(self):
         self.refreshBtn.setEnabled(False)
+        self.manual_sync = True
         self.cache_manager.start_sync_task(force=True)
 
     def on_sync_started(self):
@@ -290,17 +291,14 @@ class HomeInterface(QFrame):
 
     def on_sync_error(self):
         self.refreshBtn.setEnabled(True)
+        self.manual_sync = False
         if self.syncInfoBar: self.syncInfoBar.close(); self.syncInfoBar = None
         InfoBar.warning(title=self.lang.get("network_error", "Error"), content="", parent=self, duration=3000)
 
-    def on_sync_finished(self, data, silent=False):
-        self.refreshBtn.setEnabled(True)
-        if self.syncInfoBar: self.syncInfoBar.close(); self.syncInfoBar = None
-        
-        changed = (data.get("versions", {}).get("master", []) != self.m_versions)
+    def apply_release_data(self, data):
+        """Populate both channels from a full data snapshot (initial cache load)."""
         self.m_versions = data.get("versions", {}).get("master", [])
         self.n_versions = data.get("versions", {}).get("nightly", [])
-        self.cloud_changelogs = data.get("changelogs", {})
         self.cloud_assets = data.get("assets", {})
         
         self.refresh_local_and_ui()
@@ -308,9 +306,39 @@ class HomeInterface(QFrame):
         # Trigger changelog display for both cards
         self.on_selection_changed("master")
         self.on_selection_changed("nightly")
-        
-        if not silent:
-            msg = self.lang.get("sync_data_success" if changed else "sync_data_latest", "Done")
+
+    def on_sync_diff(self, diff):
+        """Patch only what a sync changed; an unchanged sync does no UI work."""
+        self.refreshBtn.setEnabled(True)
+        if self.syncInfoBar: self.syncInfoBar.close(); self.syncInfoBar = None
+        manual, self.manual_sync = self.manual_sync, False
+
+        channels = diff.get("channels", {})
+        self.cloud_assets.update(diff.get("assets", {}))
+
+        relisted = []
+        for branch, change in channels.items():
+            for tag in change.get("removed", []):
+                self.cloud_assets.pop(tag, None)
+            if change.get("versions") is not None:
+                if branch == "master": self.m_versions = change["versions"]
+                else: self.n_versions = change["versions"]
+                relisted.append(branch)
+        if relisted:
+            self._refresh_channels(relisted)
+
+        for branch, change in channels.items():
+            card = self.masterCard if branch == "master" else self.nightlyCard
+            tag = card.combo.currentData()
+            # A rebuilt list may have moved the selection; otherwise only the shown tag matters
+            if branch in relisted or tag in change.get("changelogs", []):
+                self.on_selection_changed(branch)
+            elif tag in change.get("assets", []):
+                card.update_ui_state()
+        
+        # Partial results after a failed branch fetch are reported by on_sync_error instead
+        if manual and diff.get("success"):
+            msg = self.lang.get("sync_data_success" if diff.get("changed") else "sync_data_latest", "Done")
             InfoBar.success(title=msg, content="", parent=self, duration=2000)
 
     def open_user_data_folder(self):
@@ -384,25 +412,61 @@ class HomeInterface(QFrame):
         if not tag: return
         
         # Update Changelog
-        content = self.cloud_changelogs.get(branch, {}).get(tag)
-        if not content:
+        document = self.cache_manager.get_changelog_document(branch, tag)
+        if document is not None:
+            card.set_changelog_document(document)
+        else:
+            content = None
             cache_path = os.path.join("changelogs", f"{branch}_{tag}.md")
             if os.path.exists(cache_path):
                 try:
                     with open(cache_path, 'r', encoding='utf-8') as f: content = f.read()
                 except Exception: pass
-        
-        card.set_changelog(content or self.lang.get("changelog_placeholder", "### Loading..."))
+            card.set_changelog(content or self.lang.get("changelog_placeholder", "### Loading..."))
         card.update_ui_state()
 
+    def on_search_changelogs(self, query):
+        """Show the releases whose changelog matches query, best match first."""
+        if not query.strip(): return
+        results = self.cache_manager.search_changelogs(query, limit=20)
+        if not results:
+            InfoBar.info(title=self.lang.get("search_no_results", "No matching releases"), content="",
+                         parent=self, duration=2000)
+            return
+
+        menu = RoundMenu(parent=self)
+        for branch, tag, snippet in results:
+            snippet = " ".join(snippet.split())
+            if len(snippet) > 70: snippet = snippet[:70] + "…"
+            action = Action(FIF.SEARCH, f"{branch.capitalize()}  {tag}   {snippet}", menu)
+            action.triggered.connect(lambda checked=False, b=branch, t=tag: self.show_search_result(b, t))
+            menu.addAction(action)
+        menu.exec(self.searchEdit.mapToGlobal(self.searchEdit.rect().bottomLeft()))
+
+    def show_search_result(self, branch, tag):
+        card = self.masterCard if branch == "master" else self.nightlyCard
+        index = card.combo.findData(tag)
+        if index >= 0:
+            # Selecting it loads the changelog like a manual selection
+            if index == card.combo.currentIndex():
+                self.on_selection_changed(branch)
+            else:
+                card.combo.setCurrentIndex(index)
+            return
+        # Older than the listed versions: the index still has its changelog
+        body = self.cache_manager.get_indexed_changelog(branch, tag)
+        if body:
+            card.set_changelog(body)
+            InfoBar.info(title=self.lang.get("search_not_listed", "{} is no longer listed").format(tag), content="",
+                         parent=self, duration=3000)
+
     def on_launch_clicked(self, branch):
         card = self.masterCard if branch == "master" else self.nightlyCard
         tag = card.combo.currentData()
         with open("config.json", 'r', encoding='utf-8') as f:
             base = json.load(f).get("path", "")
         
-        known_tags = self.m_versions if branch == "master" else self.n_versions
-        local_map = self.version_mgr.get_local_list(branch, base, known_tags)
+        local_map = self._get_local_maps(base, (branch,))[branch]
         exe = self.version_mgr.find_executable(base, local_map.get(tag, ""))
         
         if exe and os.path.exists(exe):
@@ -426,8 +490,9 @@ class HomeInterface(QFrame):
 
         # Preference Score
         with open("config.json", 'r', encoding='utf-8') as f: base = json.load(f).get("path", "")
-        local_map = self.version_mgr.get_local_list(branch, base, [])
-        pref_features = [f for f in ["msvc", "clang", "mingw", "appimage", "deb"] if any(f in v.lower() for v in local_map.values())]
+        installed = self.cache_manager.get_local_candidates(base, (branch,), self.version_mgr.scan_candidates,
+                                                            self.version_mgr.find_executable)[branch]
+        pref_features = [f for f in ["msvc", "clang", "mingw", "appimage", "deb"] if any(f in v.lower() for v in installed)]
         valid.sort(key=lambda x: self.asset_mgr.calculate_score(x["name"], pref_features), reverse=True)
         
         items = [(a["name"], a["browser_download_url"]) for a in valid]
@@ -439,9 +504,10 @@ class HomeInterface(QFrame):
                 msg = f"{self.lang.get('extract_manual_msg', '')}\n\n{fname}\n\nContinue?"
                 if not MessageBox(title, msg, self.window()).exec(): return
             
-            self.start_download(url, fname, branch, tag)
+            digest = next((a.get("digest") for a in valid if a["name"] == fname), None)
+            self.start_download(url, fname, branch, tag, digest)
 
-    def start_download(self, url, filename, branch, tag):
+    def start_download(self, url, filename, branch, tag, digest=None):
         base = ""
         if os.path.exists("config.json"):
             try:
@@ -467,56 +533,91 @@ class HomeInterface(QFrame):
                 return
 
         self.downloading_versions.add(tag)
-        self.current_download_tag = tag
-        self.current_download_branch = branch
         self.refresh_local_and_ui()
         
-        # Create persistent InfoBar for cancellation
-        self.download_active = True
-        self.downloadInfoBar = InfoBar.info(
-            title=self.lang.get("downloading", "Downloading..."),
-            content=f"0% - 0.0 MB/s",
+        # Persistent InfoBar per download: the pause button toggles it, closing it cancels it
+        bar = InfoBar.info(
+            title=f"{self.lang.get('downloading', 'Downloading').rstrip('.')} {tag}",
+            content=self.lang.get("download_queued", "Queued"),
             parent=self,
             duration=-1 
         )
-        self.downloadInfoBar.destroyed.connect(self.on_download_info_closed)
+        button = TransparentToolButton(FIF.PAUSE, bar)
+        button.setToolTip(self.lang.get("pause", "Pause"))
+        button.clicked.connect(lambda: self.on_download_pause_clicked(tag))
+        bar.addWidget(button)
+        bar.destroyed.connect(lambda: self.on_download_info_closed(tag))
+        self.downloads[tag] = {"branch": branch, "base": base, "bar": bar, "button": button, "paused": False}
         
         save_path = os.path.join(base, filename)
         
-        # Show progress bar on the correct card
+        # Show progress bar on the correct card (the card follows its branch's latest download)
         card = self.masterCard if branch == "master" else self.nightlyCard
         card.set_download_progress(0)
         
         # Delegate background task to FileProcessor
-        self.file_processor.start_download_task(url, save_path, branch, tag)
-
-    def on_download_progress(self, progress, speed=""):
-        """Generic handler for download progress, updating both cards if active."""
-        if hasattr(self, 'downloadInfoBar') and self.downloadInfoBar:
-             if hasattr(self.downloadInfoBar, 'contentLabel'):
-                 content = f"{progress}%"
-                 if speed:
-                     content += f" - {speed}"
-                 self.downloadInfoBar.contentLabel.setText(content)
-        
-        if getattr(self, 'current_download_tag', None):
-             pass
-
-        branch = getattr(self, 'current_download_branch', None)
-        if branch:
-            card = self.masterCard if branch == "master" else self.nightlyCard
+        self.file_processor.start_download_task(url, save_path, branch, tag, digest)
+
+    def _latest_download(self, branch):
+        """Tag of the most recently started download on branch, which its card's progress bar shows."""
+        tags = [t for t, d in self.downloads.items() if d["branch"] == branch]
+        return tags[-1] if tags else None
+
+    def _close_download_bar(self, tag):
+        """Forget the download and close its InfoBar (without the close counting as a cancel)."""
+        entry = self.downloads.pop(tag, None)
+        if entry:
+            try:
+                entry["bar"].close()
+            except RuntimeError: pass
+            card = self.masterCard if entry["branch"] == "master" else self.nightlyCard
+            if self._latest_download(entry["branch"]) is None:
+                card.set_download_progress(-1)
+        return entry
+
+    def on_download_progress(self, tag, progress, speed=""):
+        """Progress of one download: its InfoBar, and its card if it is that branch's latest download."""
+        entry = self.downloads.get(tag)
+        if not entry:
+            return
+        if not entry["paused"]:
+            content = f"{progress}%"
+            if speed:
+                content += f" - {speed}"
+            entry["bar"].contentLabel.setText(content)
+
+        if self._latest_download(entry["branch"]) == tag:
+            card = self.masterCard if entry["branch"] == "master" else self.nightlyCard
             card.set_download_progress(progress)
 
+    def on_download_state(self, tag, state):
+        """Queue state changes (queued / active / paused) of one download."""
+        entry = self.downloads.get(tag)
+        if not entry:
+            return
+        entry["paused"] = state == PAUSED
+        entry["button"].setIcon(FIF.PLAY if entry["paused"] else FIF.PAUSE)
+        entry["button"].setToolTip(self.lang.get("resume" if entry["paused"] else "pause", ""))
+        if state == PAUSED:
+            entry["bar"].contentLabel.setText(self.lang.get("download_paused", "Paused"))
+        elif state == QUEUED:
+            entry["bar"].contentLabel.setText(self.lang.get("download_queued", "Queued"))
+
+    def on_download_pause_clicked(self, tag):
+        entry = self.downloads.get(tag)
+        if not entry:
+            return
+        if entry["paused"]:
+            self.file_processor.resume_download_task(tag)
+        else:
+            self.file_processor.pause_download_task(tag)
+
     def on_process_finished(self, ok, result_msg, branch, tag):
         # result_msg is final path if success, or error msg if failed
-        self.download_active = False
-        if hasattr(self, 'downloadInfoBar') and self.downloadInfoBar:
-            self.downloadInfoBar.close()
-            self.downloadInfoBar = None
-
-        card = self.masterCard if branch == "master" else self.nightlyCard
-        # Reset card progress state
-        card.set_download_progress(-1)
+        entry = self._close_download_bar(tag)
+        if ok:
+            # Extracted (possibly over an existing folder): the cached scan must not be reused
+            self.cache_manager.invalidate_scan_cache(entry["base"] if entry else os.path.dirname(result_msg), branch)
         
         if tag in self.downloading_versions: self.downloading_versions.remove(tag)
         
@@ -552,45 +653,33 @@ class HomeInterface(QFrame):
         except Exception as e:
             logger.error(f"Failed to save selection state: {e}")
 
-    def on_download_info_closed(self):
-        """Handle user closing the download InfoBar -> Cancel download."""
-        # InfoBar is already destroyed/destroying, clear reference immediately
-        self.downloadInfoBar = None
-        
-        if getattr(self, 'download_active', False):
-            logger.info("User requested download cancellation.")
-            self.download_active = False
-            self.file_processor.cancel_download_task()
+    def on_download_info_closed(self, tag):
+        """Handle user closing a download InfoBar -> Cancel that download."""
+        # Closed by us (finished/cancelled) if it is no longer tracked
+        if self.downloads.pop(tag, None) is not None:
+            logger.info(f"User requested cancellation of {tag}.")
+            self.file_processor.cancel_download_task(tag)
 
-    def on_process_cancelled(self):
+    def on_process_cancelled(self, tag):
         """Handle successful cancellation signal from FileProcessor."""
-        self.download_active = False
-        
-        if hasattr(self, 'downloadInfoBar') and self.downloadInfoBar:
-            try:
-                self.downloadInfoBar.close()
-            except RuntimeError: pass
-            self.downloadInfoBar = None
+        entry = self._close_download_bar(tag)
 
         InfoBar.info(
             title=self.lang.get("download_cancelled", "Download Cancelled"), 
-            content="", 
+            content=tag, 
             parent=self, 
             duration=2000
         )
         
         # Reset state
-        if hasattr(self, 'current_download_tag') and self.current_download_tag:
-             if self.current_download_tag in self.downloading_versions:
-                 self.downloading_versions.remove(self.current_download_tag)
-             self.current_download_tag = None
-        
-        # Reset UI on active card if possible
-        branch = getattr(self, 'current_download_branch', None)
-        if branch:
-            card = self.masterCard if branch == "master" else self.nightlyCard
-            card.set_download_progress(-1)
-            self.current_download_branch = None
+        if tag in self.downloading_versions:
+            self.downloading_versions.remove(tag)
+        
+        # Reset UI on the card if nothing else is downloading on it
+        if entry is None:
+            for branch, card in (("master", self.masterCard), ("nightly", self.nightlyCard)):
+                if self._latest_download(branch) is None:
+                    card.set_download_progress(-1)
              
         self.refresh_local_and_ui()
 
@@ -647,17 +736,11 @@ class HomeInterface(QFrame):
         if not base_path:
             return None
         
-        master_tag = self.masterCard.combo.currentData()
-        if master_tag:
-            local_map = self.version_mgr.get_local_list("master", base_path, self.m_versions)
-            exe = self.version_mgr.find_executable(base_path, local_map.get(master_tag, ""))
-            if exe and os.path.exists(exe):
-                return exe
-        
-        nightly_tag = self.nightlyCard.combo.currentData()
-        if nightly_tag:
-            local_map = self.version_mgr.get_local_list("nightly", base_path, self.n_versions)
-            exe = self.version_mgr.find_executable(base_path, local_map.get(nightly_tag, ""))
+        selected = {"master": self.masterCard.combo.currentData(), "nightly": self.nightlyCard.combo.currentData()}
+        branches = tuple(branch for branch, tag in selected.items() if tag)
+        local = self._get_local_maps(base_path, branches)
+        for branch in branches:
+            exe = self.version_mgr.find_executable(base_path, local[branch].get(selected[branch], ""))
             if exe and os.path.exists(exe):
                 return exe
         
@@ -234,6 +234,7 @@ class MainWindow(FluentWindow):
         # Save validation selections
         if hasattr(self, 'homeInterface'):
             self.homeInterface.save_selection_state()
+            self.homeInterface.cache_manager.flush()
 
         minimize_to_tray = self.settingInterface.minimizeToTraySwitch.isChecked()
         if minimize_to_tray:
@@ -11,6 +11,8 @@ from qfluentwidgets import (CardWidget, StrongBodyLabel, SubtitleLabel, BodyLabe
                             setTheme, setThemeColor, Theme, setFont, TransparentToolButton)
 
 from app.config import LANG_MAP
+from app.utils.bandwidth import get_limiter
+from app.utils.download_queue import get_download_queue, DEFAULT_MAX_CONCURRENT
 
 class SettingRow(QWidget):
     """A single row setting: Title + Control"""
@@ -93,6 +95,8 @@ class SettingGroupCard(CardWidget):
 class SettingInterface(QFrame):
 
     LANG_CODES = ["en", "zh", "cht", "ja", "ko", "ru", "pt", "fr"]
+    CONCURRENT_DOWNLOADS = ["1", "2", "3", "4"]
+    SPEED_LIMITS = [0, 1024, 2048, 5120, 10240, 20480, 51200]  # KiB/s, 0 = unlimited
 
     def __init__(self, parent=None):
         super().__init__(parent=parent)
@@ -178,6 +182,17 @@ class SettingInterface(QFrame):
         self.dlRow = SettingRow(LANG_MAP["en"]["downloader_engine"], self.dlCombo)
         self.dlGroup.addSetting(self.dlRow)
         
+        # Download Queue
+        self.concurrentCombo = ComboBox()
+        self.concurrentCombo.addItems(self.CONCURRENT_DOWNLOADS)
+        self.concurrentRow = SettingRow(LANG_MAP["en"]["max_concurrent_downloads"], self.concurrentCombo)
+        self.dlGroup.addSetting(self.concurrentRow)
+        
+        # Speed Limit (items filled in update_combo_items)
+        self.speedLimitCombo = ComboBox()
+        self.speedLimitRow = SettingRow(LANG_MAP["en"]["download_speed_limit"], self.speedLimitCombo)
+        self.dlGroup.addSetting(self.speedLimitRow)
+        
         # IPv6
         self.disableIPv6Switch = SwitchButton()
         self.disableIPv6Switch.setOnText(LANG_MAP["en"]["on"])
@@ -212,6 +227,21 @@ class SettingInterface(QFrame):
         self.verifyFirmwareSwitch.setOffText(LANG_MAP["en"]["off"])
         self.verifyFirmwareRow = SettingRow(LANG_MAP["en"]["verify_firmware_checksum"], self.verifyFirmwareSwitch)
         self.dlGroup.addSetting(self.verifyFirmwareRow)
+
+        # Mirrors
+        self.apiMirrorEdit = LineEdit()
+        self.apiMirrorEdit.setPlaceholderText(LANG_MAP["en"]["mirror_placeholder"])
+        self.apiMirrorEdit.setClearButtonEnabled(True)
+        self.apiMirrorEdit.setMinimumWidth(260)
+        self.apiMirrorRow = SettingRow(LANG_MAP["en"]["api_mirror"], self.apiMirrorEdit)
+        self.dlGroup.addSetting(self.apiMirrorRow)
+
+        self.downloadMirrorEdit = LineEdit()
+        self.downloadMirrorEdit.setPlaceholderText(LANG_MAP["en"]["mirror_placeholder"])
+        self.downloadMirrorEdit.setClearButtonEnabled(True)
+        self.downloadMirrorEdit.setMinimumWidth(260)
+        self.downloadMirrorRow = SettingRow(LANG_MAP["en"]["download_mirror"], self.downloadMirrorEdit)
+        self.dlGroup.addSetting(self.downloadMirrorRow)
         self.gridLayout.addWidget(self.dlGroup, 0, 1)
 
     def initPathGroup(self):
@@ -262,6 +292,14 @@ class SettingInterface(QFrame):
         self.dlCombo.setCurrentIndex(max(0, old_dl_idx))
         self.dlCombo.blockSignals(False)
 
+        # Speed Limit
+        self.speedLimitCombo.blockSignals(True)
+        old_limit_idx = self.speedLimitCombo.currentIndex()
+        self.speedLimitCombo.clear()
+        self.speedLimitCombo.addItems([t["speed_unlimited"] if v == 0 else f"{v // 1024} MB/s" for v in self.SPEED_LIMITS])
+        self.speedLimitCombo.setCurrentIndex(max(0, old_limit_idx))
+        self.speedLimitCombo.blockSignals(False)
+
     def update_ui_texts(self):
         try:
              lang = self.LANG_CODES[self.langCombo.currentIndex()]
@@ -278,11 +316,17 @@ class SettingInterface(QFrame):
         
         self.dlGroup.setTitle(texts["settings_group_download"])
         self.dlRow.setTitle(texts["downloader_engine"])
+        self.concurrentRow.setTitle(texts["max_concurrent_downloads"])
+        self.speedLimitRow.setTitle(texts["download_speed_limit"])
         self.ipv6Row.setTitle(texts["disable_ipv6"])
         self.aria2Row.setTitle(texts["aria2_verbose_log"])
         self.keepArchiveRow.setTitle(texts["keep_archive"])
         self.keepFirmwareRow.setTitle(texts["keep_firmware_archive"])
         self.verifyFirmwareRow.setTitle(texts["verify_firmware_checksum"])
+        self.apiMirrorRow.setTitle(texts["api_mirror"])
+        self.downloadMirrorRow.setTitle(texts["download_mirror"])
+        self.apiMirrorEdit.setPlaceholderText(texts["mirror_placeholder"])
+        self.downloadMirrorEdit.setPlaceholderText(texts["mirror_placeholder"])
         
         self.pathGroup.setTitle(texts["settings_group_path"])
         self.edenPathRow.setTitle(texts["eden_path"])
@@ -337,6 +381,8 @@ class SettingInterface(QFrame):
         self.rememberSelectionSwitch.checkedChanged.connect(self.save_and_apply)
         self.dlCombo.currentIndexChanged.connect(self.save_and_apply)
         self.fetchLimitCombo.currentIndexChanged.connect(self.save_and_apply)
+        self.concurrentCombo.currentIndexChanged.connect(self.save_and_apply)
+        self.speedLimitCombo.currentIndexChanged.connect(self.save_and_apply)
         self.keepArchiveSwitch.checkedChanged.connect(self.save_and_apply)
         self.disableIPv6Switch.checkedChanged.connect(self.save_and_apply)
         self.aria2VerboseSwitch.checkedChanged.connect(self.save_and_apply)
@@ -345,6 +391,8 @@ class SettingInterface(QFrame):
         self.firmwareBrowseBtn.clicked.connect(self.on_firmware_browse)
         self.keepFirmwareSwitch.checkedChanged.connect(self.save_and_apply)
         self.verifyFirmwareSwitch.checkedChanged.connect(self.save_and_apply)
+        self.apiMirrorEdit.editingFinished.connect(self.save_and_apply)
+        self.downloadMirrorEdit.editingFinished.connect(self.save_and_apply)
 
     def get_current_config_dict(self):
         try:
@@ -364,6 +412,10 @@ class SettingInterface(QFrame):
 
         fetch_limit_val = self.fetchLimitCombo.currentText()
 
+        concurrent_val = int(self.concurrentCombo.currentText() or "2")
+
+        speed_limit_val = self.SPEED_LIMITS[max(0, self.speedLimitCombo.currentIndex())]
+
         keep_archive = self.keepArchiveSwitch.isChecked()
 
         disable_ipv6 = self.disableIPv6Switch.isChecked()
@@ -375,6 +427,8 @@ class SettingInterface(QFrame):
         firmware_path = self.firmwarePathEdit.text()
         keep_firmware = self.keepFirmwareSwitch.isChecked()
         verify_firmware = self.verifyFirmwareSwitch.isChecked()
+        api_mirror = self.apiMirrorEdit.text().strip().rstrip("/")
+        download_mirror = self.downloadMirrorEdit.text().strip().rstrip("/")
 
         return {
             "lang": lang, 
@@ -384,6 +438,8 @@ class SettingInterface(QFrame):
             "remember_last_selection": remember_selection_val,
             "downloader_type": dl_val, 
             "fetch_limit": int(fetch_limit_val or "15"),
+            "max_concurrent_downloads": concurrent_val,
+            "download_speed_limit": speed_limit_val,
             "keep_archive": keep_archive,
             "disable_ipv6": disable_ipv6,
             "aria2_verbose_log": aria2_verbose,
@@ -391,13 +447,23 @@ class SettingInterface(QFrame):
             "backup_path": backup_path,
             "firmware_path": firmware_path,
             "keep_firmware_archive": keep_firmware,
-            "verify_firmware_checksum": verify_firmware
+            "verify_firmware_checksum": verify_firmware,
+            "api_mirror": api_mirror,
+            "download_mirror": download_mirror
         }
 
     def save_config_to_file(self):
         cfg = self.get_current_config_dict()
+        # Keep keys that have no widget here (gh_token, cache tuning, ...)
+        merged = {}
+        if os.path.exists(self.config_file):
+            try:
+                with open(self.config_file, 'r', encoding='utf-8') as f:
+                    merged = json.load(f)
+            except: pass
+        merged.update(cfg)
         with open(self.config_file, 'w', encoding='utf-8') as f:
-            json.dump(cfg, f, indent=4, ensure_ascii=False)
+            json.dump(merged, f, indent=4, ensure_ascii=False)
         return cfg
 
     def save_and_apply(self):
@@ -419,6 +485,8 @@ class SettingInterface(QFrame):
         remember_selection_val = cfg["remember_last_selection"]
         dl_val = cfg["downloader_type"]
         fetch_limit_val = str(cfg["fetch_limit"])
+        concurrent_val = cfg["max_concurrent_downloads"]
+        speed_limit_val = cfg["download_speed_limit"]
         keep_archive = cfg["keep_archive"]
         disable_ipv6 = cfg["disable_ipv6"]
         aria2_verbose = cfg["aria2_verbose_log"]
@@ -427,6 +495,8 @@ class SettingInterface(QFrame):
         firmware_path = cfg["firmware_path"]
         keep_firmware = cfg["keep_firmware_archive"]
         verify_firmware = cfg["verify_firmware_checksum"]
+        api_mirror = cfg["api_mirror"]
+        download_mirror = cfg["download_mirror"]
         
         # 3. Detect Changes
         lang_changed = (lang != old_cfg.get("lang"))
@@ -436,6 +506,8 @@ class SettingInterface(QFrame):
         remember_selection_changed = (remember_selection_val != old_cfg.get("remember_last_selection", True))
         dl_changed = (dl_val != old_cfg.get("downloader_type"))
         fetch_limit_changed = (fetch_limit_val != str(old_cfg.get("fetch_limit")))
+        concurrent_changed = (concurrent_val != old_cfg.get("max_concurrent_downloads", DEFAULT_MAX_CONCURRENT))
+        speed_limit_changed = (speed_limit_val != old_cfg.get("download_speed_limit", 0))
         keep_archive_changed = (keep_archive != old_cfg.get("keep_archive"))
         disable_ipv6_changed = (disable_ipv6 != old_cfg.get("disable_ipv6"))
         aria2_verbose_changed = (aria2_verbose != old_cfg.get("aria2_verbose_log"))
@@ -444,6 +516,8 @@ class SettingInterface(QFrame):
         firmware_path_changed = (firmware_path != old_cfg.get("firmware_path"))
         keep_firmware_changed = (keep_firmware != old_cfg.get("keep_firmware_archive"))
         verify_firmware_changed = (verify_firmware != old_cfg.get("verify_firmware_checksum"))
+        api_mirror_changed = (api_mirror != old_cfg.get("api_mirror", ""))
+        download_mirror_changed = (download_mirror != old_cfg.get("download_mirror", ""))
 
         # 4. Save
         self.save_config_to_file()
@@ -469,6 +543,14 @@ class SettingInterface(QFrame):
         if fetch_limit_changed:
             logger.info(f"User changed fetch limit to: {fetch_limit_val}")
 
+        if concurrent_changed:
+            logger.info(f"User changed concurrent downloads to: {concurrent_val}")
+            get_download_queue().set_max_concurrent(concurrent_val)
+
+        if speed_limit_changed:
+            logger.info(f"User changed download speed limit to: {f'{speed_limit_val} KiB/s' if speed_limit_val else 'unlimited'}")
+            get_limiter().set_rate(speed_limit_val * 1024)
+
         if keep_archive_changed:
             logger.info(f"User changed keep archive to: {keep_archive}")
 
@@ -487,6 +569,12 @@ class SettingInterface(QFrame):
         if verify_firmware_changed:
             logger.info(f"User changed verify firmware checksum to: {verify_firmware}")
 
+        if api_mirror_changed:
+            logger.info(f"User changed API mirror to: {api_mirror or 'GitHub'}")
+
+        if download_mirror_changed:
+            logger.info(f"User changed download mirror to: {download_mirror or 'GitHub'}")
+
         if lang_changed or theme_changed or dl_changed:
             self.update_combo_items()
             self.update_ui_texts()
@@ -526,6 +614,10 @@ class SettingInterface(QFrame):
                      win.homeInterface.update_status()
                      win.homeInterface.update_watcher_path()
 
+                 # A larger window pulls the deeper history now instead of at the next sync
+                 if fetch_limit_changed and int(fetch_limit_val) > int(old_cfg.get("fetch_limit") or 15):
+                     win.homeInterface.cache_manager.start_sync_task(backfill=True)
+
     def load_config(self):
         self.update_combo_items()
 
@@ -585,6 +677,18 @@ class SettingInterface(QFrame):
                     self.fetchLimitCombo.setCurrentIndex(limit_map.get(str(fetch_limit), 1))
                     self.fetchLimitCombo.blockSignals(False)
 
+                    # Download Queue
+                    concurrent = str(cfg.get("max_concurrent_downloads", DEFAULT_MAX_CONCURRENT))
+                    self.concurrentCombo.blockSignals(True)
+                    self.concurrentCombo.setCurrentIndex(self.CONCURRENT_DOWNLOADS.index(concurrent) if concurrent in self.CONCURRENT_DOWNLOADS else 1)
+                    self.concurrentCombo.blockSignals(False)
+
+                    # Speed Limit
+                    speed_limit = cfg.get("download_speed_limit", 0)
+                    self.speedLimitCombo.blockSignals(True)
+                    self.speedLimitCombo.setCurrentIndex(self.SPEED_LIMITS.index(speed_limit) if speed_limit in self.SPEED_LIMITS else 0)
+                    self.speedLimitCombo.blockSignals(False)
+
                     # Keep Archive
                     keep_archive = cfg.get("keep_archive", False)
                     self.keepArchiveSwitch.blockSignals(True)
@@ -624,6 +728,10 @@ class SettingInterface(QFrame):
                     self.verifyFirmwareSwitch.blockSignals(True)
                     self.verifyFirmwareSwitch.setChecked(verify_firmware)
                     self.verifyFirmwareSwitch.blockSignals(False)
+
+                    # Mirrors
+                    self.apiMirrorEdit.setText(cfg.get("api_mirror", ""))
+                    self.downloadMirrorEdit.setText(cfg.get("download_mirror", ""))
             except Exception as e:
                 logger.warning(f"Failed to load config.json, using defaults. Error: {e}")
         else:
@@ -633,6 +741,8 @@ class SettingInterface(QFrame):
             self.dlCombo.setCurrentIndex(0) # Default to Aria2 (Auto)
             self.rememberSelectionSwitch.setChecked(True)
             self.fetchLimitCombo.setCurrentIndex(1) # 15
+            self.concurrentCombo.setCurrentIndex(1) # 2
+            self.speedLimitCombo.setCurrentIndex(0) # Unlimited
             self.disableIPv6Switch.setChecked(True)
             self.keepFirmwareSwitch.setChecked(True)
             self.verifyFirmwareSwitch.setChecked(True)
@@ -24,7 +24,11 @@ from app.core.backup_manager import BackupManager
 from app.core.keys_manager import KeysManager
 from app.core.mod_manager import ModManager
 from app.core.firmware_manager import FirmwareManager, FirmwareInstallWorker, FirmwareUpdateCheckWorker
-from app.utils.path_utils import open_directory
+from app.utils.rate_limit import PRIORITY_USER, PRIORITY_BACKGROUND
+from app.utils.connectivity import get_monitor
+from app.utils.download_queue import QUEUED, PAUSED
+from app.utils.path_utils import open_directory, get_cache_dir
+from app.utils.json_store import update_json_file
 
 
 class RestoreDialog(MessageBoxBase):
@@ -304,15 +308,9 @@ class FirmwareManagerDialog(MessageBoxBase):
         fw_list = FirmwareManager.list_local_firmware()
         
         # Check cache for remote version (non-blocking)
-        remote_info = None
-        try:
-             cache_path = Path("cache") / "firmware_cache.json"
-             if cache_path.exists():
-                 with open(cache_path, 'r') as f:
-                     data = json.load(f)
-                     if data.get("version"):
-                         remote_info = data
-        except: pass
+        remote_info = FirmwareManager.get_cached_remote_info()
+        if not remote_info.get("version"):
+            remote_info = None
 
         # Combine lists? Or just append remote if not in local?
         # Note: Remote item needs special handling in install
@@ -461,15 +459,27 @@ class FirmwareManagerDialog(MessageBoxBase):
                     
             progress.cancelButton.clicked.connect(on_cancel)
 
+            # Pause / resume (download phase only; the dialog's yes button is otherwise unused here)
+            progress.yesButton.setText(self.lang.get("pause", "Pause"))
+            progress.yesButton.show()
+            try: progress.yesButton.clicked.disconnect()
+            except: pass
+            progress.yesButton.clicked.connect(lambda: self.worker_thread and self.worker_thread.toggle_pause())
+
             # 2. Init Worker
             self.worker_thread = FirmwareInstallWorker(path, self.get_eden_exe(), version)
+            def update_state(state):
+                paused = state == PAUSED
+                progress.yesButton.setText(self.lang.get("resume" if paused else "pause", ""))
+                if state in (PAUSED, QUEUED):
+                    progress.contentLabel.setText(self.lang.get(f"download_{state}", state.capitalize()))
             def update_progress(phase, c, t, s):
-                if phase == 'verifying':
-                    progress.titleLabel.setText(self.lang.get("firmware_verifying", "Verifying Integrity..."))
-                    progress.contentLabel.setText(s)
-                elif phase == 'install':
+                if phase == 'install':
+                    progress.yesButton.hide()
                     progress.titleLabel.setText(self.lang.get("firmware_installing", "Installing Firmware..."))
                     progress.contentLabel.setText(f"{c}/{t}")
+                elif self.worker_thread.item and self.worker_thread.item.state == PAUSED:
+                    pass  # Keep showing "Paused"
                 elif phase == 'download':
                     progress.titleLabel.setText(self.lang.get("firmware_downloading", "Downloading Firmware..."))
                     # If connecting or preparing, show status only
@@ -479,6 +489,7 @@ class FirmwareManagerDialog(MessageBoxBase):
                         progress.contentLabel.setText(f"{c}/{t} {s}")
 
             self.worker_thread.progress.connect(update_progress)
+            self.worker_thread.state_changed.connect(update_state)
         else:
             # Local Install
             self.worker_thread = LocalInstallThread(path, self.get_eden_exe())
@@ -638,6 +649,8 @@ class ToolsInterface(QFrame):
         self.mainLayout.addWidget(self.scrollArea)
         
         self.fw_check_worker = None
+        # Re-check once the network is back if the last check ran offline
+        get_monitor().online.connect(self._on_back_online)
         self.init_cards()
         
     def init_cards(self):
@@ -820,16 +833,8 @@ class ToolsInterface(QFrame):
                         version = match.group(1)
                         logger.info(f"Synced installed firmware version: {version}")
                         
-                        cache_path = Path("cache") / "firmware_cache.json"
-                        data = {}
-                        if cache_path.exists():
-                            try:
-                                with open(cache_path, 'r') as f: data = json.load(f)
-                            except: pass
-                        
-                        data["installed_version"] = version
-                        cache_path.parent.mkdir(exist_ok=True)
-                        with open(cache_path, 'w') as f: json.dump(data, f)
+                        cache_path = Path(get_cache_dir()) / "firmware_cache.json"
+                        update_json_file(str(cache_path), {"installed_version": version})
         except Exception as e:
             logger.warning(f"Failed to sync installed firmware version: {e}")
 
@@ -851,10 +856,14 @@ class ToolsInterface(QFrame):
         self.is_manual_check = manual
         
         current_version, _ = FirmwareManager._load_local_firmware_record()
-        self.fw_check_worker = FirmwareUpdateCheckWorker(current_version)
+        self.fw_check_worker = FirmwareUpdateCheckWorker(current_version, PRIORITY_USER if manual else PRIORITY_BACKGROUND)
         self.fw_check_worker.finished.connect(self.on_firmware_check_finished)
         self.fw_check_worker.start()
 
+    def _on_back_online(self):
+        if self.fw_check_worker and self.fw_check_worker.offline and not self.fw_check_worker.isRunning():
+            self.check_firmware_update()
+
     def on_firmware_check_finished(self, version, url):
         self.firmwareUpdateBtn.setEnabled(True)
         self.update_firmware_status() # Restore "Installed: ..." text
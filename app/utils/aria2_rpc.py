@@ -0,0 +1,276 @@
+import os
+import sys
+import time
+import atexit
+import shutil
+import socket
+import secrets
+import threading
+import subprocess
+
+import requests
+
+from app.utils import bandwidth
+from app.utils.config_store import load_config
+
+from app.utils.logger import get_logger
+logger = get_logger(__name__)
+
+# Engine-wide limits, shared by every download submitted to the daemon
+DEFAULT_MAX_DOWNLOADS = 3
+CONNECTIONS_PER_DOWNLOAD = 8
+STARTUP_TIMEOUT = 5.0
+RPC_TIMEOUT = 5
+
+# errorCode of a download whose --checksum did not match
+CHECKSUM_ERROR = "32"
+
+# Keys every status poll asks for (tellStatus returns all fields otherwise)
+STATUS_KEYS = ["gid", "status", "totalLength", "completedLength", "downloadSpeed", "errorCode", "errorMessage"]
+
+
+class Aria2Error(Exception):
+    """The daemon could not be started, or an RPC call failed."""
+
+
+def _free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class Aria2Daemon:
+    """
+    One long-lived aria2c, driven over JSON-RPC on a loopback port guarded by a random
+    secret. Downloads are submitted with add_uri and polled with tell_status (exact byte
+    counts); aria2 keeps its own control files, so paused or failed downloads resume.
+    The process stops with EmuMan (--stop-with-process, plus a clean shutdown at exit).
+    """
+
+    def __init__(self, executable, options):
+        self.executable = executable
+        self.options = options  # Launch options; a config change restarts the daemon when idle
+        self.port = _free_port()
+        self.secret = secrets.token_hex(16)
+        self.url = f"http://127.0.0.1:{self.port}/jsonrpc"
+        self.process = None
+        self.speed_limit = None  # max-overall-download-limit last applied (bytes/s)
+        self.tracked = set()  # GIDs added here whose result has not been removed yet
+        self._session = requests.Session()
+        self._session.trust_env = False  # Never route loopback RPC through a proxy
+        self._ids = 0
+        self._lock = threading.Lock()
+
+    # =========================================
+    #             Process
+    # =========================================
+
+    def _command(self, executable):
+        return [
+            executable,
+            "--enable-rpc=true",
+            "--rpc-listen-all=false",
+            f"--rpc-listen-port={self.port}",
+            f"--rpc-secret={self.secret}",
+            f"--stop-with-process={os.getpid()}",
+            "--continue=true",
+            "--allow-overwrite=true",
+            "--auto-file-renaming=false",
+            "--check-certificate=false",
+            "--min-split-size=1M",
+        ] + [f"--{key}={value}" for key, value in self.options.items()]
+
+    def start(self):
+        startupinfo = None
+        if sys.platform == "win32":
+            startupinfo = subprocess.STARTUPINFO()
+            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+
+        cmd = self._command(self.executable)
+        try:
+            self.process = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                                            stdin=subprocess.DEVNULL, startupinfo=startupinfo)
+        except OSError as e:
+            # If bundled binary failed (e.g. library mismatch), try system 'aria2c'
+            if os.path.isabs(self.executable) and shutil.which("aria2c"):
+                logger.warning(f"Bundled aria2c failed ({e}), trying system 'aria2c'...")
+                self.executable = "aria2c"
+                self.process = subprocess.Popen(self._command("aria2c"), stdout=subprocess.DEVNULL,
+                                                stderr=subprocess.DEVNULL, stdin=subprocess.DEVNULL,
+                                                startupinfo=startupinfo)
+            else:
+                raise Aria2Error(f"Failed to start aria2c: {e}")
+
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise Aria2Error(f"aria2c exited with code {self.process.returncode} on startup")
+            try:
+                version = self.call("getVersion")["version"]
+                logger.info(f"aria2c {version} RPC daemon started on port {self.port} (pid {self.process.pid})")
+                return self
+            except Aria2Error:
+                time.sleep(0.1)
+        self.stop()
+        raise Aria2Error("aria2c RPC did not come up in time")
+
+    @property
+    def alive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def stop(self):
+        """Graceful shutdown (aria2 writes its control files), then make sure the process is gone."""
+        if not self.alive:
+            return
+        try:
+            self.call("shutdown")
+            self.process.wait(timeout=3)
+        except Exception:
+            try:
+                self.process.kill()
+                self.process.wait(timeout=2)
+            except Exception as e:
+                logger.warning(f"Error killing aria2c daemon: {e}")
+        logger.info("aria2c RPC daemon stopped.")
+
+    # =========================================
+    #             RPC
+    # =========================================
+
+    def call(self, method, *params):
+        with self._lock:
+            self._ids += 1
+            request_id = self._ids
+        payload = {"jsonrpc": "2.0", "id": str(request_id), "method": f"aria2.{method}",
+                   "params": [f"token:{self.secret}", *params]}
+        try:
+            res = self._session.post(self.url, json=payload, timeout=RPC_TIMEOUT)
+            data = res.json()
+        except (requests.RequestException, ValueError) as e:
+            raise Aria2Error(f"aria2.{method} failed: {e}")
+        if "error" in data:
+            raise Aria2Error(f"aria2.{method}: {data['error'].get('message')}")
+        return data["result"]
+
+    def add_uri(self, urls, options=None):
+        """Queue a download (urls: mirrors of the same file); returns its GID."""
+        gid = self.call("addUri", list(urls), options or {})
+        with self._lock:
+            self.tracked.add(gid)
+        return gid
+
+    def tell_status(self, gid, keys=STATUS_KEYS):
+        return self.call("tellStatus", gid, keys)
+
+    def pause(self, gid):
+        return self.call("pause", gid)
+
+    def unpause(self, gid):
+        return self.call("unpause", gid)
+
+    def remove(self, gid):
+        """Stop a download; aria2 keeps the partial file and control file (see cancel cleanup in Downloader)."""
+        try:
+            return self.call("remove", gid)
+        except Aria2Error:
+            # Still starting or already finished: force it
+            return self.call("forceRemove", gid)
+
+    def remove_result(self, gid):
+        """Drop a finished/failed/removed download from aria2's memory."""
+        with self._lock:
+            self.tracked.discard(gid)
+        try:
+            self.call("removeDownloadResult", gid)
+        except Aria2Error:
+            pass
+
+    def idle(self):
+        """
+        Nothing a restart would lose: no active, waiting or paused download in aria2 (paused
+        ones count as waiting), and no GID still being followed by a caller.
+        """
+        with self._lock:
+            if self.tracked:
+                return False
+        try:
+            stat = self.call("getGlobalStat")
+        except Aria2Error:
+            return True  # Unreachable daemon: nothing to keep
+        return int(stat["numActive"]) + int(stat["numWaiting"]) == 0
+
+    def change_global_option(self, options):
+        return self.call("changeGlobalOption", {k: str(v) for k, v in options.items()})
+
+    def apply_speed_limit(self, rate):
+        """aria2's share of download_speed_limit, enforced across everything it downloads."""
+        if rate != self.speed_limit:
+            self.change_global_option({"max-overall-download-limit": rate})
+            self.speed_limit = rate
+
+
+# =========================================
+#             Process-wide Daemon
+# =========================================
+
+_daemon = None
+_daemon_lock = threading.Lock()
+
+
+def _launch_options():
+    cfg = load_config()
+    options = {
+        "max-concurrent-downloads": int(cfg.get("aria2_max_downloads", DEFAULT_MAX_DOWNLOADS)),
+        "max-connection-per-server": CONNECTIONS_PER_DOWNLOAD,
+        "split": CONNECTIONS_PER_DOWNLOAD,
+    }
+    if cfg.get("disable_ipv6", False):
+        options["disable-ipv6"] = "true"
+    if cfg.get("aria2_verbose_log", False):
+        options["log"] = os.path.abspath(os.path.join("logs", "aria2.log"))
+        options["log-level"] = "info"
+    return options
+
+
+def get_daemon(executable):
+    """
+    The shared daemon, started (or restarted after a crash) on first use. Raises Aria2Error
+    if aria2c cannot be started. Changed settings (IPv6, verbose log, concurrency) apply
+    by restarting it once no download is running, waiting or paused.
+    """
+    global _daemon
+    with _daemon_lock:
+        options = _launch_options()
+        if _daemon is not None and _daemon.alive and _daemon.options != options:
+            # Otherwise keep the old daemon (and its settings) until it drains
+            if _daemon.idle():
+                logger.info("aria2c settings changed, restarting the daemon.")
+                _daemon.stop()
+                _daemon = None
+        if _daemon is None or not _daemon.alive:
+            if _daemon is not None:
+                logger.warning("aria2c daemon is not running, starting a new one.")
+            _daemon = Aria2Daemon(executable, options).start()
+        limiter = bandwidth.get_limiter()
+        limiter.add_listener(_on_limit_changed)
+        _daemon.apply_speed_limit(limiter.share(bandwidth.ENGINE_ARIA2))
+        return _daemon
+
+
+def _on_limit_changed(limiter):
+    """Limiter listener: apply a changed limit or split to the running daemon (if any) right away."""
+    with _daemon_lock:
+        if _daemon is not None and _daemon.alive:
+            try:
+                _daemon.apply_speed_limit(limiter.share(bandwidth.ENGINE_ARIA2))
+            except Aria2Error as e:
+                logger.warning(f"Failed to apply speed limit to aria2c: {e}")
+
+
+def shutdown():
+    with _daemon_lock:
+        if _daemon is not None:
+            _daemon.stop()
+
+
+atexit.register(shutdown)
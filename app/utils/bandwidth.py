@@ -0,0 +1,123 @@
+import time
+import threading
+from contextlib import contextmanager
+
+from app.utils.config_store import load_config
+
+from app.utils.logger import get_logger
+logger = get_logger(__name__)
+
+# Burst allowance: a limiter may run this far ahead of its average rate
+BURST_SECONDS = 0.5
+
+# Engines sharing the cap
+ENGINE_INTERNAL = "internal"
+ENGINE_ARIA2 = "aria2"
+
+
+class BandwidthLimiter:
+    """
+    The configured download cap for EmuMan as a whole. rate is bytes/s; 0 = unlimited.
+    Transfers register with the engine moving their bytes, and the rate is split across
+    engines by their number of running transfers: the internal engines' share is enforced
+    here as a token bucket shared by all their connections, aria2's share is handed to
+    aria2c through the share listeners.
+    """
+
+    def __init__(self, rate=0):
+        self._lock = threading.Lock()
+        self._tokens = 0.0
+        self._last = time.monotonic()
+        self._active = {ENGINE_INTERNAL: 0, ENGINE_ARIA2: 0}
+        self._listeners = []
+        self.rate = 0
+        self.set_rate(rate)
+
+    def set_rate(self, rate):
+        with self._lock:
+            self.rate = max(0, int(rate))
+            self._tokens = 0.0
+            self._last = time.monotonic()
+        logger.info(f"Download speed limit: {f'{self.rate // 1024} KiB/s' if self.rate else 'unlimited'}")
+        self._notify()
+
+    def _share(self, engine):
+        active = sum(self._active.values())
+        if not self.rate or not active or not self._active[engine]:
+            return self.rate  # The next transfer of this engine would run alone
+        return max(1, self.rate * self._active[engine] // active)
+
+    def share(self, engine):
+        """The part of the rate (bytes/s, 0 = unlimited) the given engine may use right now."""
+        with self._lock:
+            return self._share(engine)
+
+    def add_listener(self, callback):
+        """callback(limiter) runs whenever the rate or the split between engines changes."""
+        with self._lock:
+            if callback not in self._listeners:
+                self._listeners.append(callback)
+
+    def _notify(self):
+        with self._lock:
+            listeners = list(self._listeners)
+        for callback in listeners:
+            try:
+                callback(self)
+            except Exception as e:
+                logger.warning(f"Speed limit listener failed: {e}")
+
+    def begin(self, engine):
+        with self._lock:
+            self._active[engine] += 1
+        self._notify()
+
+    def end(self, engine):
+        with self._lock:
+            self._active[engine] = max(0, self._active[engine] - 1)
+        self._notify()
+
+    @contextmanager
+    def transfer(self, engine):
+        """Count a running transfer of engine for the split while the block runs."""
+        self.begin(engine)
+        try:
+            yield
+        finally:
+            self.end(engine)
+
+    def consume(self, size):
+        """Account for size bytes the internal engines just received, sleeping as long as needed to stay under their share."""
+        with self._lock:
+            rate = self._share(ENGINE_INTERNAL)
+            if not rate:
+                return
+            now = time.monotonic()
+            self._tokens = min(rate * BURST_SECONDS, self._tokens + (now - self._last) * rate)
+            self._last = now
+            self._tokens -= size
+            wait = -self._tokens / rate if self._tokens < 0 else 0
+        if wait:
+            time.sleep(wait)
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def configured_rate():
+    """download_speed_limit from config.json (KiB/s, 0 = unlimited) in bytes/s."""
+    try:
+        return max(0, int(load_config().get("download_speed_limit", 0))) * 1024
+    except (TypeError, ValueError):
+        return 0
+
+
+def get_limiter():
+    """Process-wide BandwidthLimiter, initialised from config.json."""
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = BandwidthLimiter(configured_rate())
+    return _limiter
@@ -0,0 +1,34 @@
+import os
+import json
+import threading
+
+from app.utils.logger import get_logger
+logger = get_logger(__name__)
+
+CONFIG_FILE = "config.json"
+
+_cache = None  # ((mtime_ns, size), config)
+_cache_lock = threading.Lock()
+
+
+def load_config():
+    """
+    config.json as a dict ({} if missing or unreadable). Parsed again only when the file
+    changed, so hot paths (per-request mirror lookups, download setup) just stat it.
+    Returns a copy; write settings through the settings page, not through this dict.
+    """
+    global _cache
+    try:
+        st = os.stat(CONFIG_FILE)
+    except OSError:
+        return {}
+    stamp = (st.st_mtime_ns, st.st_size)
+    with _cache_lock:
+        if _cache is None or _cache[0] != stamp:
+            try:
+                with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
+                    _cache = (stamp, json.load(f))
+            except Exception as e:
+                logger.warning(f"Failed to read {CONFIG_FILE}: {e}")
+                return {}
+        return dict(_cache[1])
@@ -0,0 +1,139 @@
+import time
+import socket
+import threading
+from urllib.parse import urlparse
+
+import requests
+from PySide6.QtCore import QObject, Signal
+
+from app.utils import http_client
+from app.utils.config_store import load_config
+
+from app.utils.logger import get_logger
+logger = get_logger(__name__)
+
+# A probe is a bare TCP connect to the API host (and the API mirror, if any),
+# or a HEAD request through the shared session when the host is behind a proxy
+PROBE_TIMEOUT = 1.5
+# How long an "online" probe result is trusted
+PROBE_TTL = 60
+# While offline, re-probe with this backoff (seconds) until the connection is back
+RETRY_BACKOFF = (5, 10, 20, 40, 60)
+
+
+class OfflineError(Exception):
+    """Raised instead of sending a request that cannot succeed because the machine is offline."""
+
+    def __init__(self, url=None):
+        super().__init__(f"Offline, skipped request{f' to {url}' if url else ''}")
+
+
+def _probe_targets():
+    targets = []
+    mirror = (load_config().get("api_mirror") or "").strip()
+    for base in (mirror, http_client.GITHUB_API):
+        url = urlparse(base)
+        if url.hostname:
+            targets.append((base, url.hostname, url.port or (443 if url.scheme == "https" else 80)))
+    return targets
+
+
+def _reachable(base, host, port):
+    # Requests honour HTTPS_PROXY / HTTP_PROXY, so a direct connect says nothing when a proxy is set
+    if requests.utils.get_environ_proxies(base):
+        try:
+            http_client.get_session().head(base, timeout=PROBE_TIMEOUT, allow_redirects=False)
+            return True
+        except requests.RequestException:
+            return False
+    try:
+        with socket.create_connection((host, port), timeout=PROBE_TIMEOUT):
+            return True
+    except OSError:
+        return False
+
+
+def _probe():
+    return any(_reachable(*target) for target in _probe_targets())
+
+
+class ConnectivityMonitor(QObject):
+    """
+    Shared, cached connectivity state. Network workers ask is_online() before sending
+    anything; concurrent callers share one probe. Once offline, a background watcher
+    re-probes with backoff and emits `online` when the connection is back, so whoever
+    skipped work can retry it.
+    """
+    online = Signal()
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+        self._state = None      # True / False / None (never probed)
+        self._checked_at = 0
+        self._watcher = None
+
+    def is_online(self, refresh=False):
+        """Cached connectivity; probes (at most PROBE_TIMEOUT per target) when unknown, expired or refresh=True."""
+        with self._lock:
+            watching = self._watcher is not None and self._watcher.is_alive()
+            expired = time.monotonic() - self._checked_at >= PROBE_TTL
+            # While the watcher runs, the offline state is kept current by it
+            if not refresh and self._state is not None and (watching or not expired):
+                return self._state
+            state = _probe()
+            self._checked_at = time.monotonic()
+            self._set_state(state)
+            return state
+
+    def known_offline(self):
+        """True if the last probe failed (never probes)."""
+        return self._state is False
+
+    def mark_offline(self):
+        """Report a request that failed to connect; the watcher takes over from here."""
+        with self._lock:
+            self._checked_at = time.monotonic()
+            self._set_state(False)
+
+    def _set_state(self, state):
+        if state == self._state:
+            return
+        self._state = state
+        if state:
+            logger.info("Network connectivity is back.")
+            return
+        logger.warning("Network unreachable. Skipping network requests until it is back.")
+        if self._watcher is None or not self._watcher.is_alive():
+            self._watcher = threading.Thread(target=self._watch, name="connectivity", daemon=True)
+            self._watcher.start()
+
+    def _watch(self):
+        attempt = 0
+        while True:
+            time.sleep(RETRY_BACKOFF[min(attempt, len(RETRY_BACKOFF) - 1)])
+            attempt += 1
+            if _probe():
+                break
+        with self._lock:
+            self._checked_at = time.monotonic()
+            self._set_state(True)
+        self.online.emit()
+
+
+_monitor = None
+_monitor_lock = threading.Lock()
+
+
+def get_monitor():
+    """Process-wide ConnectivityMonitor (create it from the UI thread first so signals land there)."""
+    global _monitor
+    if _monitor is None:
+        with _monitor_lock:
+            if _monitor is None:
+                _monitor = ConnectivityMonitor()
+    return _monitor
+
+
+def is_online(refresh=False):
+    return get_monitor().is_online(refresh)
@@ -0,0 +1,112 @@
+import hashlib
+import threading
+
+from app.utils.logger import get_logger
+logger = get_logger(__name__)
+
+# GitHub asset digests ("sha256:<hex>") -> hashlib and aria2 --checksum names
+ALGORITHMS = {"sha256": "sha-256", "sha512": "sha-512", "sha1": "sha-1"}
+READ_BLOCK = 1024 * 1024
+
+
+class DigestMismatch(Exception):
+    """The downloaded file does not match the digest published for it."""
+
+
+def parse_digest(digest):
+    """(algorithm, hex) from an asset digest like "sha256:ab12..."; None if absent or unsupported."""
+    if not digest or ":" not in digest:
+        return None
+    algorithm, value = digest.split(":", 1)
+    algorithm = algorithm.strip().lower()
+    if algorithm not in ALGORITHMS or not value:
+        return None
+    return algorithm, value.strip().lower()
+
+
+def aria2_checksum(digest):
+    """The digest as an aria2 checksum option value ("sha-256=<hex>"), or None."""
+    parsed = parse_digest(digest)
+    return f"{ALGORITHMS[parsed[0]]}={parsed[1]}" if parsed else None
+
+
+class StreamingHasher:
+    """
+    Hashes a download while it is written, so verifying it needs no extra pass over the
+    finished file. Writers feed() what they just wrote; bytes that arrive in order are hashed
+    on the spot, and bytes that arrive ahead of the hashed prefix (other connections' pieces)
+    are held in memory, up to max_pending bytes, until the prefix reaches them. Only data the
+    hasher never saw (the part of a resumed file already on disk) or that overflowed the
+    buffer is read back by catch_up(); read_back counts those bytes.
+    """
+
+    def __init__(self, digest, path, max_pending=0):
+        self.algorithm, self.expected = parse_digest(digest)
+        self.path = str(path)
+        self.pos = 0
+        self.max_pending = max_pending
+        self.read_back = 0
+        self._pending = {}  # offset -> bytes written ahead of pos
+        self._pending_size = 0
+        self._hash = hashlib.new(self.algorithm)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def create(digest, path, max_pending=0):
+        """A hasher for digest, or None when there is nothing (supported) to verify against."""
+        return StreamingHasher(digest, path, max_pending) if parse_digest(digest) else None
+
+    def feed(self, offset, data):
+        """data was just written at offset; hashed now if it continues the hashed prefix, else buffered."""
+        with self._lock:
+            if offset <= self.pos < offset + len(data):
+                self._hash.update(data[self.pos - offset:])
+                self.pos = offset + len(data)
+                self._drain()
+            elif offset > self.pos and self._pending_size + len(data) <= self.max_pending:
+                # A takeover can write the same offset twice with identical bytes; keep the longer copy
+                if len(data) > len(self._pending.get(offset, b"")):
+                    self._pending_size += len(data) - len(self._pending.get(offset, b""))
+                    self._pending[offset] = bytes(data)
+
+    def _drain(self):
+        """Hash buffered chunks that the prefix has reached (called under the lock)."""
+        while self._pending:
+            ready = [o for o in self._pending if o <= self.pos]
+            if not ready:
+                return
+            for o in sorted(ready):
+                data = self._pending.pop(o)
+                self._pending_size -= len(data)
+                if o + len(data) > self.pos:
+                    self._hash.update(data[self.pos - o:])
+                    self.pos = o + len(data)
+
+    def catch_up(self, upto):
+        """Hash bytes [pos, upto) from the file; the caller guarantees they are written."""
+        if upto <= self.pos:
+            return
+        with open(self.path, 'rb') as f:
+            while True:
+                with self._lock:
+                    self._drain()
+                    if self.pos >= upto:
+                        return
+                    # Read only up to the next buffered chunk; the buffer covers the rest
+                    ahead = [o for o in self._pending if o < upto]
+                    f.seek(self.pos)
+                    block = f.read(min(READ_BLOCK, (min(ahead) if ahead else upto) - self.pos))
+                    if not block:
+                        return
+                    self._hash.update(block)
+                    self.pos += len(block)
+                    self.read_back += len(block)
+
+    def verify(self, size):
+        """Hash whatever is left up to size and compare; raises DigestMismatch."""
+        self.catch_up(size)
+        actual = self._hash.hexdigest()
+        if self.pos != size or actual != self.expected:
+            raise DigestMismatch(f"{self.algorithm} mismatch: expected {self.expected}, got {actual}")
+        logger.info(f"{self.algorithm} verified: {self.expected[:16]}..."
+                    + (f" ({self.read_back} bytes read back from disk)" if self.read_back else ""))
@@ -0,0 +1,189 @@
+import os
+import itertools
+import threading
+
+from app.utils.config_store import load_config
+
+from app.utils.logger import get_logger
+logger = get_logger(__name__)
+
+# Lower runs first; equal priorities run in submission order
+PRIORITY_HIGH = 0     # EmuMan self-update
+PRIORITY_NORMAL = 1   # Emulator builds and firmware
+PRIORITY_LOW = 2
+
+DEFAULT_MAX_CONCURRENT = 2
+
+# Item states
+QUEUED = "queued"
+ACTIVE = "active"
+PAUSED = "paused"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+# How often a waiting caller checks its own cancel_check
+WAIT_POLL = 0.2
+
+
+class DownloadItem:
+    """
+    One transfer in the queue. paused/cancelled are read by the running engine. state is
+    only assigned under the queue lock; on_state is told about it afterwards.
+    """
+
+    def __init__(self, item_id, url, dest_path, priority, label, seq):
+        self.id = item_id
+        self.url = url
+        self.dest_path = str(dest_path)
+        self.priority = priority
+        self.label = label or os.path.basename(self.dest_path)
+        self.seq = seq
+        self.state = QUEUED
+        self.paused = False
+        self.cancelled = False
+        self.granted = threading.Event()
+        self.on_state = None  # callable(state), called from whichever thread changes it
+
+    def _notify(self, state):
+        if self.on_state:
+            try:
+                self.on_state(state)
+            except Exception as e:
+                logger.warning(f"Download state callback failed: {e}")
+
+
+class DownloadQueue:
+    """
+    Central scheduler for every download (emulator builds, firmware, self-update). At most
+    max_concurrent items transfer at once, highest priority first. The transfer itself runs
+    in the caller's thread (see run()); the queue only grants slots. A paused item gives up
+    its slot while keeping its partial data, and gets the next free slot when resumed.
+    """
+
+    def __init__(self, max_concurrent=DEFAULT_MAX_CONCURRENT):
+        self.max_concurrent = max(1, max_concurrent)
+        self._lock = threading.Lock()
+        self._items = {}
+        self._ids = itertools.count(1)
+
+    def submit(self, url, dest_path, priority=PRIORITY_NORMAL, label=None):
+        with self._lock:
+            n = next(self._ids)
+            item = DownloadItem(f"dl-{n}", url, dest_path, priority, label, n)
+            self._items[item.id] = item
+        logger.info(f"Queued download {item.id} ({item.label}, priority {priority})")
+        return item
+
+    def run(self, item, transfer, cancel_check=None):
+        """
+        Wait for a slot, then call transfer(cancel_check, pause_check) -> bool in this thread.
+        Returns the transfer result (False if cancelled while waiting).
+        """
+        def cancelled():
+            if not item.cancelled and cancel_check and cancel_check():
+                self.cancel(item.id)
+            return item.cancelled
+
+        self._schedule()
+        while not item.granted.wait(WAIT_POLL):
+            if cancelled():
+                self._finish(item, CANCELLED)
+                return False
+
+        ok = False
+        try:
+            ok = transfer(cancelled, lambda: item.paused)
+        finally:
+            self._finish(item, DONE if ok else CANCELLED if item.cancelled else FAILED)
+        return ok
+
+    def _finish(self, item, state):
+        with self._lock:
+            self._items.pop(item.id, None)
+            item.state = state
+        item._notify(state)
+        logger.info(f"Download {item.id} {state}")
+        self._schedule()
+
+    def _schedule(self):
+        """Grant free slots to the best waiting items (queued, or resumed after a pause)."""
+        granted = []
+        with self._lock:
+            active = sum(1 for i in self._items.values() if i.state == ACTIVE)
+            waiting = sorted((i for i in self._items.values() if i.state == QUEUED and not i.cancelled),
+                             key=lambda i: (i.priority, i.seq))
+            for item in waiting[:max(0, self.max_concurrent - active)]:
+                item.state = ACTIVE
+                item.paused = False
+                granted.append(item)
+        for item in granted:
+            item._notify(ACTIVE)
+            item.granted.set()
+
+    # =========================================
+    #             Control
+    # =========================================
+
+    def pause(self, item_id):
+        with self._lock:
+            item = self._items.get(item_id)
+            if not item or item.state not in (QUEUED, ACTIVE):
+                return False
+            was_active = item.state == ACTIVE
+            item.paused = True
+            item.state = PAUSED
+        item._notify(PAUSED)
+        if was_active:
+            self._schedule()
+        return True
+
+    def resume(self, item_id):
+        """Back in line for a slot; the engine picks up where it stopped once granted."""
+        with self._lock:
+            item = self._items.get(item_id)
+            if not item or item.state != PAUSED:
+                return False
+            item.state = QUEUED
+        item._notify(QUEUED)
+        self._schedule()
+        return True
+
+    def cancel(self, item_id):
+        with self._lock:
+            item = self._items.get(item_id)
+            if not item:
+                return False
+            item.cancelled = True
+            item.paused = False
+        return True
+
+    def set_max_concurrent(self, count):
+        self.max_concurrent = max(1, int(count))
+        logger.info(f"Concurrent downloads: {self.max_concurrent}")
+        self._schedule()
+
+    def items(self):
+        with self._lock:
+            return sorted(self._items.values(), key=lambda i: (i.priority, i.seq))
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def configured_max_concurrent():
+    try:
+        return max(1, int(load_config().get("max_concurrent_downloads", DEFAULT_MAX_CONCURRENT)))
+    except (TypeError, ValueError):
+        return DEFAULT_MAX_CONCURRENT
+
+
+def get_download_queue():
+    """Process-wide DownloadQueue, initialised from config.json."""
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = DownloadQueue(configured_max_concurrent())
+    return _queue
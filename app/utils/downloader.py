@@ -1,31 +1,78 @@
 import os
 import sys
-import json
-import re
 import shutil
-import subprocess
 import time
+import threading
 from pathlib import Path
 
-import requests
 from PySide6.QtCore import QThread, Signal
 
+from app.utils import http_client, mirrors, aria2_rpc
+from app.utils.config_store import load_config
+from app.utils.bandwidth import get_limiter, ENGINE_INTERNAL, ENGINE_ARIA2
+from app.utils.digest import StreamingHasher, DigestMismatch, aria2_checksum
+from app.utils.download_queue import get_download_queue, PRIORITY_NORMAL, QUEUED, PAUSED
+from app.utils.partial_download import PartialDownload
+from app.utils.segmented_download import SegmentedDownload, RangeNotSupported, DEFAULT_CONNECTIONS
 from app.utils.logger import get_logger
 logger = get_logger(__name__)
 
 class DownloadThread(QThread):
     progress = Signal(int, str) # percent, speed_str
+    state_changed = Signal(str) # download_queue state: queued / active / paused
     finished = Signal(bool, str)
     cancelled = Signal()
 
-    def __init__(self, url, save_path):
+    def __init__(self, url, save_path, priority=PRIORITY_NORMAL, label=None, digest=None):
         super().__init__()
         self.url = url
         self.save_path = save_path
+        self.priority = priority
+        self.label = label
+        self.digest = digest
         self._is_running = True
-    
+        # Submitted to the queue in run(), so a thread that never starts holds no slot;
+        # until then pause()/resume() only record what to do on submission
+        self.item = None
+        self.state = QUEUED
+        self._lock = threading.Lock()
+
+    def _on_state(self, state):
+        self.state = state
+        self.state_changed.emit(state)
+
+    def _on_submit(self, item):
+        with self._lock:
+            self.item = item
+            item.on_state = self._on_state
+            if self.state == PAUSED:
+                get_download_queue().pause(item.id)
+
     def stop(self):
         self._is_running = False
+        with self._lock:
+            if self.item:
+                get_download_queue().cancel(self.item.id)
+
+    def pause(self):
+        with self._lock:
+            if self.item:
+                return get_download_queue().pause(self.item.id)
+            if self.state != QUEUED:
+                return False
+            self.state = PAUSED  # Under the lock, so _on_submit cannot miss it
+        self.state_changed.emit(PAUSED)
+        return True
+
+    def resume(self):
+        with self._lock:
+            if self.item:
+                return get_download_queue().resume(self.item.id)
+            if self.state != PAUSED:
+                return False
+            self.state = QUEUED
+        self.state_changed.emit(QUEUED)
+        return True
 
     def run(self):
         logger.info(f"Starting download: {self.url} -> {self.save_path}")
@@ -37,7 +84,9 @@ class DownloadThread(QThread):
             def cancel_check():
                 return not self._is_running
             
-            success = Downloader.download(self.url, self.save_path, progress_cb, cancel_check)
+            success = self._is_running and Downloader.download_queued(
+                self.url, self.save_path, progress_cb, cancel_check, self.priority, self.label, self.digest,
+                on_submit=self._on_submit)
             
             if not self._is_running:
                 self.cancelled.emit()
@@ -54,7 +103,8 @@ class DownloadThread(QThread):
 class Downloader:
     """
     Unified Downloader utility.
-    Prioritizes Aria2c for multi-threaded downloads, falls back to requests.
+    Prioritizes the shared aria2c RPC daemon for multi-threaded downloads, falls back to the built-in
+    segmented engine (single requests stream if the server cannot serve ranges).
     Respects 'downloader_type' in config.json.
     """
     
@@ -119,7 +169,21 @@ class Downloader:
             return f"{bytes_per_sec/(1024*1024):.1f} MB/s"
 
     @staticmethod
-    def download(url, dest_path, progress_callback=None, cancel_check=None):
+    def download_queued(url, dest_path, progress_callback=None, cancel_check=None, priority=PRIORITY_NORMAL, label=None,
+                        digest=None, on_submit=None):
+        """
+        download() through the shared DownloadQueue: waits for a slot first (blocking).
+        on_submit(item) receives the queue item right away, to pause/resume it or follow its state.
+        """
+        queue = get_download_queue()
+        item = queue.submit(url, dest_path, priority, label)
+        if on_submit:
+            on_submit(item)
+        return queue.run(item, lambda cancel, pause: Downloader.download(url, dest_path, progress_callback, cancel, pause, digest),
+                         cancel_check)
+
+    @staticmethod
+    def download(url, dest_path, progress_callback=None, cancel_check=None, pause_check=None, digest=None):
         """
         Download a file to dest_path.
         
@@ -128,267 +192,292 @@ class Downloader:
             dest_path (str|Path): Destination file path
             progress_callback (callable, optional): func(phase, current, total, speed). phase='download'
             cancel_check (callable, optional): func() -> bool. Returns True to cancel.
+            pause_check (callable, optional): func() -> bool. While True the transfer is suspended
+                (partial data kept) and this call keeps waiting.
+            digest (str, optional): Published asset digest ("sha256:<hex>"), verified while downloading.
             
         Returns:
             bool: Success
+
+        Raises:
+            DigestMismatch: Every source delivered a file that failed verification (it is deleted).
         """
         dest_path = Path(dest_path)
         dest_path.parent.mkdir(parents=True, exist_ok=True)
-        
+
+        # Download mirror first (if configured), then the original URL
+        candidates = mirrors.download_urls(url)
+        for i, candidate in enumerate(candidates):
+            try:
+                if Downloader._download_from(candidate, dest_path, progress_callback, cancel_check, pause_check, digest):
+                    return True
+            except DigestMismatch as e:
+                logger.error(f"Verification failed for {dest_path.name} from {candidate}: {e}")
+                if i == len(candidates) - 1:
+                    raise
+            if cancel_check and cancel_check():
+                return False
+            if i < len(candidates) - 1:
+                logger.warning(f"Mirror download failed for {candidate}, falling back to upstream")
+        return False
+
+    @staticmethod
+    def _download_from(url, dest_path, progress_callback, cancel_check, pause_check=None, digest=None):
         # Check Config
-        use_aria2 = True
-        try:
-            if os.path.exists("config.json"):
-                with open("config.json", 'r', encoding='utf-8') as f:
-                    config = json.load(f)
-                    if config.get("downloader_type") == "requests":
-                        use_aria2 = False
-        except Exception as e:
-            logger.warning(f"Error reading config for downloader preference: {e}")
+        use_aria2 = load_config().get("downloader_type") != "requests"
 
         # Try Aria2 First
         if use_aria2 and Downloader.get_aria2_executable():
             try:
-                if Downloader._download_aria2(url, dest_path, progress_callback, cancel_check):
+                if Downloader._download_aria2(url, dest_path, progress_callback, cancel_check, pause_check, digest):
                     return True
                 
                 # If cancelled, do not fallback
                 if cancel_check and cancel_check():
                     return False
+            except DigestMismatch:
+                raise  # The same bytes would come through the internal engine
             except Exception as e:
                 logger.warning(f"Aria2 download failed, falling back to internal: {e}")
         
-        # Fallback to Requests
-        logger.info("Using internal downloader (requests)...")
-        return Downloader._download_requests(url, dest_path, progress_callback, cancel_check)
+        # Fallback to the internal engine
+        logger.info("Using internal downloader...")
+        if not Downloader._download_internal(url, dest_path, progress_callback, cancel_check, pause_check, digest):
+            return False
+        # aria2 may have left its control file behind before falling back
+        stale_control = str(dest_path) + ".aria2"
+        if os.path.exists(stale_control):
+            try: os.remove(stale_control)
+            except OSError: pass
+        return True
 
     @staticmethod
-    def _download_aria2(url, dest_path, progress_callback, cancel_check):
-        aria2c_path = Downloader.get_aria2_executable()
-        dest_dir = dest_path.parent
-        filename = dest_path.name
-        # Build Aria2 command
-        # Read user preferences for log level
-        console_log_level = "warn"  # Default
-        try:
-            if os.path.exists("config.json"):
-                import json
-                with open("config.json", 'r', encoding='utf-8') as f:
-                    cfg = json.load(f)
-                    if cfg.get("aria2_verbose_log", False):
-                        console_log_level = "info"
-                        logger.info("Aria2 verbose logging enabled (info level)")
-        except Exception as e:
-            logger.warning(f"Failed to read aria2_verbose_log setting: {e}")
-        
-        cmd = [
-            aria2c_path,
-            url,
-            "-d", str(dest_path.parent),
-            "-o", dest_path.name,
-            "-j", "8",
-            "-x", "8",
-            "-s", "8",
-            "-k", "1M",
-            "--check-certificate=false",
-            f"--console-log-level={console_log_level}",
-            "--summary-interval=1",
-            "--allow-overwrite=true"
-        ]
-        
-        # Check if user wants to disable IPv6
+    def _download_internal(url, dest_path, progress_callback, cancel_check, pause_check=None, digest=None):
+        """
+        Run the internal engine; a pause stops it with the partial data kept, and the
+        transfer resumes from that data once unpaused.
+        """
+        while True:
+            with get_limiter().transfer(ENGINE_INTERNAL):
+                done = Downloader._download_internal_once(url, dest_path, progress_callback, cancel_check, pause_check, digest)
+            if done:
+                return True
+            if not (pause_check and pause_check()) or (cancel_check and cancel_check()):
+                return False
+            logger.info(f"Download paused: {dest_path}")
+            while pause_check() and not (cancel_check and cancel_check()):
+                time.sleep(0.2)
+            if cancel_check and cancel_check():
+                PartialDownload(dest_path, url).discard()
+                return False
+            logger.info(f"Download resumed: {dest_path}")
+
+    @staticmethod
+    def _download_internal_once(url, dest_path, progress_callback, cancel_check, pause_check, digest=None):
+        """Parallel Range requests where possible, one stream otherwise."""
+        connections = int(load_config().get("download_connections", DEFAULT_CONNECTIONS))
+        if connections > 1:
+            def on_progress(done, total, speed):
+                if progress_callback:
+                    progress_callback('download', int(done * 100 / total), 100, Downloader.format_speed(speed) if speed else "")
+            try:
+                return SegmentedDownload(url, dest_path, connections, digest=digest).run(on_progress, cancel_check, pause_check)
+            except RangeNotSupported as e:
+                logger.info(f"Segmented download not possible ({e}), using a single connection")
+            except DigestMismatch:
+                raise
+            except Exception as e:
+                logger.warning(f"Segmented download setup failed ({e}), using a single connection")
+        return Downloader._download_requests(url, dest_path, progress_callback, cancel_check, pause_check, digest)
+
+    @staticmethod
+    def _download_aria2(url, dest_path, progress_callback, cancel_check, pause_check=None, digest=None):
+        daemon = aria2_rpc.get_daemon(Downloader.get_aria2_executable())
+        options = {"dir": str(dest_path.parent), "out": dest_path.name}
+        checksum = aria2_checksum(digest)
+        if checksum:
+            options["checksum"] = checksum  # aria2 verifies before reporting the download complete
+        limiter = get_limiter()
+        limiter.begin(ENGINE_ARIA2)  # Before adding, so aria2 starts out with its share
+        paused = False
         try:
-            if os.path.exists("config.json"):
-                import json
-                with open("config.json", 'r', encoding='utf-8') as f:
-                    cfg = json.load(f)
-                    if cfg.get("disable_ipv6", False):
-                        cmd.append("--disable-ipv6=true")
-                        logger.info("IPv6 disabled for Aria2 as per user setting")
-        except Exception as e:
-            logger.warning(f"Failed to read disable_ipv6 setting: {e}")
-        
-        logger.info(f"Starting Aria2 download: {' '.join(cmd)}")
-        
-        process = None
+            gid = daemon.add_uri([url], options)
+        except Exception:
+            limiter.end(ENGINE_ARIA2)
+            raise
+        logger.info(f"Submitted to aria2 ({gid}): {url} -> {dest_path}")
+
         try:
-            startupinfo = None
-            if sys.platform == "win32":
-                startupinfo = subprocess.STARTUPINFO()
-                startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-            
-            try:
-                process = subprocess.Popen(
-                    cmd,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.STDOUT,
-                    text=True,
-                    encoding='utf-8',
-                    errors='ignore',
-                    bufsize=1,
-                    startupinfo=startupinfo
-                )
-            except OSError as e:
-                # If bundled binary failed (e.g. library mismatch), try system 'aria2c'
-                if os.path.isabs(cmd[0]) and shutil.which("aria2c"):
-                    logger.warning(f"Bundled aria2c failed ({e}), trying system 'aria2c'...")
-                    cmd[0] = "aria2c"
-                    process = subprocess.Popen(
-                        cmd,
-                        stdout=subprocess.PIPE,
-                        stderr=subprocess.STDOUT,
-                        text=True,
-                        encoding='utf-8',
-                        errors='ignore',
-                        bufsize=1,
-                        startupinfo=startupinfo
-                    )
-                else:
-                    raise e
-            
-            # Progress regex: [#2b610d 0.9MiB/1.5MiB(58%) CN:1 DL:3.5MiB ETA:1s]
-            # Capture percent and DL speed (DL:...)
-            progress_pattern = re.compile(r'\((\d+)%\).*?DL:([0-9.]+[a-zA-Z]+)')
-            
-            last_lines = []
-            
             while True:
                 if cancel_check and cancel_check():
-                    logger.info("Cancelling Aria2 download...")
-                    
-                    # Terminate the process
-                    try:
-                        process.kill()
-                        process.wait(timeout=2)
-                        logger.info("Aria2 process killed successfully")
-                    except Exception as e:
-                        logger.warning(f"Error killing Aria2 process: {e}")
-                    
-                    # Wait for Windows to release file handles
-                    time.sleep(0.3)
-                    
-                    # Cleanup both .aria2 control file and partial download file
-                    aria2_control_file = str(dest_path) + ".aria2"
-                    files_to_remove = [aria2_control_file, str(dest_path)]
-                    
-                    for file_path in files_to_remove:
-                        if not os.path.exists(file_path):
-                            continue
-                            
-                        # Retry mechanism for file deletion
-                        deleted = False
-                        for attempt in range(3):
-                            try:
-                                os.remove(file_path)
-                                logger.info(f"Cleaned up: {file_path}")
-                                deleted = True
-                                break
-                            except PermissionError:
-                                if attempt < 2:
-                                    time.sleep(0.2)
-                                else:
-                                    logger.warning(f"Failed to remove {file_path} after {attempt + 1} attempts: file is locked")
-                            except Exception as e:
-                                logger.warning(f"Failed to remove {file_path}: {e}")
-                                break
-                    
+                    logger.info(f"Cancelling aria2 download {gid}...")
+                    Downloader._cancel_aria2(daemon, gid, dest_path)
                     return False
-                
-                output = process.stdout.readline()
-                if output == '' and process.poll() is not None:
+
+                if pause_check and pause_check() != paused:
+                    paused = not paused
+                    # A paused download leaves its share to the running ones
+                    (limiter.end if paused else limiter.begin)(ENGINE_ARIA2)
+                    (daemon.pause if paused else daemon.unpause)(gid)
+                    logger.info(f"Aria2 download {gid} {'paused' if paused else 'resumed'}")
+
+                status = daemon.tell_status(gid)
+                state = status["status"]
+                if state == "complete":
+                    if progress_callback: progress_callback('download', 100, 100, "")
+                    return True
+                if state == "error":
+                    logger.error(f"Aria2 download failed ({status.get('errorCode')}): {status.get('errorMessage')}")
+                    if status.get("errorCode") == aria2_rpc.CHECKSUM_ERROR:
+                        Downloader._remove_files(dest_path)
+                        raise DigestMismatch(status.get("errorMessage") or "checksum validation failed")
+                    return False
+                if state == "removed":
+                    logger.warning(f"Aria2 download {gid} was removed")
+                    return False
+
+                total = int(status["totalLength"])
+                if progress_callback and total > 0:
+                    speed = int(status["downloadSpeed"])
+                    progress_callback('download', int(status["completedLength"]) * 100 // total, 100,
+                                      Downloader.format_speed(speed) if state == "active" else "")
+                time.sleep(0.5)
+        finally:
+            if not paused:
+                limiter.end(ENGINE_ARIA2)
+            daemon.remove_result(gid)
+
+    @staticmethod
+    def _cancel_aria2(daemon, gid, dest_path):
+        try:
+            daemon.remove(gid)
+            # Wait for aria2 to let go of the file before cleaning up
+            deadline = time.monotonic() + 3
+            while time.monotonic() < deadline and daemon.tell_status(gid, ["status"])["status"] != "removed":
+                time.sleep(0.1)
+        except aria2_rpc.Aria2Error as e:
+            logger.warning(f"Error removing aria2 download {gid}: {e}")
+
+        # Explicit cancel: drop both the control file and the partial download
+        Downloader._remove_files(dest_path)
+
+    @staticmethod
+    def _remove_files(dest_path):
+        """Delete an aria2 download and its control file."""
+        for file_path in (str(dest_path) + ".aria2", str(dest_path)):
+            if not os.path.exists(file_path):
+                continue
+            for attempt in range(3):
+                try:
+                    os.remove(file_path)
+                    logger.info(f"Cleaned up: {file_path}")
+                    break
+                except PermissionError:
+                    if attempt < 2:
+                        time.sleep(0.2)
+                    else:
+                        logger.warning(f"Failed to remove {file_path} after {attempt + 1} attempts: file is locked")
+                except Exception as e:
+                    logger.warning(f"Failed to remove {file_path}: {e}")
                     break
-                
-                if output:
-                    last_lines.append(output.strip())
-                    if len(last_lines) > 20: last_lines.pop(0) # Keep last 20 lines
-                    
-                    # Log Aria2 output in real-time if verbose logging is enabled
-                    if console_log_level in ("info", "debug"):
-                        logger.info(f"[Aria2] {output.strip()}")
-                    
-                    match = progress_pattern.search(output)
-                    if match and progress_callback:
-                        try:
-                            percent = int(match.group(1))
-                            speed = match.group(2) + "/s"
-                            progress_callback('download', percent, 100, speed)
-                        except: pass
-            
-            if process.returncode == 0:
-                if progress_callback: progress_callback('download', 100, 100, "")
-                return True
-            
-            logger.error(f"Aria2 exited with code {process.returncode}")
-            logger.error(f"Aria2 output snippet:\n" + "\n".join(last_lines))
-            return False
-            
-        except Exception as e:
-            logger.error(f"Aria2 execution error: {e}")
-            if process:
-                try: 
-                    process.kill()
-                    process.wait(timeout=1)
-                except: pass
-            raise e
 
     @staticmethod
-    def _download_requests(url, dest_path, progress_callback, cancel_check):
+    def _download_requests(url, dest_path, progress_callback, cancel_check, pause_check=None, digest=None):
+        """
+        Single stream into a .part file; resumes an interrupted attempt with Range/If-Range.
+        With a digest, chunks are hashed as they arrive (raises DigestMismatch).
+        """
+        partial = PartialDownload(dest_path, url)
+        hasher = StreamingHasher.create(digest, partial.path)
+        headers = {}
+        offset = 0
+        writing = False
+        if partial.load() and len(partial.ranges) == 1 and partial.ranges[0][1] == partial.size:
+            offset = partial.ranges[0][0]
+            headers = {"Range": f"bytes={offset}-", "If-Range": partial.validator}
+
         try:
-            response = requests.get(url, stream=True, timeout=30)
-            response.raise_for_status()
-            
-            total_size = int(response.headers.get('content-length', 0))
-            downloaded = 0
-            
-            start_time = time.time()
-            last_speed_update = start_time
-            
-            with open(dest_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=1024*64):
-                    if cancel_check and cancel_check():
-                        logger.info("Cancelling requests download...")
-                        # File will be closed by context manager
-                        # Then cleanup the partial file
-                        f.close()
-                        if os.path.exists(dest_path):
-                            try:
-                                os.remove(dest_path)
-                                logger.info(f"Cleaned up partial download: {dest_path}")
-                            except Exception as e:
-                                logger.warning(f"Failed to remove partial file: {e}")
-                        return False
-                        
-                    f.write(chunk)
-                    downloaded += len(chunk)
-                    
-                    current_time = time.time()
-                    if progress_callback and total_size > 0:
-                        # Calculate speed every ~0.5s or so? Or just every chunk? 
-                        # Chunk is 64KB, might be too jittery. 
-                        # Use average since start for simplicity or windowed?
-                        # Let's use average since start for valid speed or simple window.
-                        # Simple window:
-                        speed_str = ""
-                        if current_time - last_speed_update > 0.5:
-                            duration = current_time - start_time
-                            if duration > 0:
-                                speed = downloaded / duration
-                                speed_str = Downloader.format_speed(speed)
-                                # Consider updating last_speed_update mechanism if we want instantaneous speed
-                                # But simple average is robust enough for simple fallback
-                        
-                        progress_callback('download', int(downloaded / total_size * 100), 100, speed_str)
-            
+            response = http_client.get(url, stream=True, timeout=30, headers=headers)
+            if headers and 400 <= response.status_code < 500:
+                # e.g. 416 when the file shrank: the saved state can never be resumed, start over
+                logger.info(f"Resume request rejected (HTTP {response.status_code}), starting over.")
+                response.close()
+                partial.discard()
+                offset, headers = 0, {}
+                response = http_client.get(url, stream=True, timeout=30)
+
+            with response:
+                response.raise_for_status()
+
+                if offset and response.status_code == 206:
+                    total_size = partial.size
+                    f = open(partial.path, 'r+b', buffering=0)
+                    f.seek(offset)
+                    f.truncate()
+                    if hasher:
+                        hasher.catch_up(offset)  # The part kept from the earlier attempt
+                else:
+                    if offset:
+                        logger.info("File changed since the interrupted download, starting over.")
+                    offset = 0
+                    content_length = int(response.headers.get('content-length', 0))
+                    total_size = content_length
+                    partial.remember(response, content_length or None)
+                    f = open(partial.path, 'wb', buffering=0)
+
+                writing = True
+                limiter = get_limiter()
+                downloaded = offset
+                start_time = time.time()
+                last_speed_update = start_time
+                speed_str = ""
+
+                with f:
+                    for chunk in response.iter_content(chunk_size=1024*64):
+                        if cancel_check and cancel_check():
+                            logger.info("Cancelling requests download...")
+                            f.close()
+                            partial.discard()
+                            return False
+                        if pause_check and pause_check():
+                            if total_size:
+                                partial.save([[downloaded, total_size]], force=True)
+                            return False
+
+                        f.write(chunk)
+                        if hasher:
+                            hasher.feed(downloaded, chunk)
+                        downloaded += len(chunk)
+                        if total_size:
+                            partial.save([[downloaded, total_size]])
+                        limiter.consume(len(chunk))
+
+                        current_time = time.time()
+                        if progress_callback and total_size > 0:
+                            # Average speed of this attempt, refreshed about every 0.5s
+                            if current_time - last_speed_update > 0.5:
+                                last_speed_update = current_time
+                                speed_str = Downloader.format_speed((downloaded - offset) / (current_time - start_time))
+
+                            progress_callback('download', int(downloaded / total_size * 100), 100, speed_str)
+
+            if total_size and downloaded != total_size:
+                raise IOError(f"Connection closed at {downloaded} of {total_size} bytes")
+            if hasher:
+                hasher.verify(downloaded)
+            partial.complete()
             if progress_callback: progress_callback('download', 100, 100, "")
             return True
-            
+
+        except DigestMismatch:
+            partial.discard()
+            raise
         except Exception as e:
             logger.error(f"Internal download failed: {e}")
-            # Cleanup partial file on error
-            if os.path.exists(dest_path):
-                try:
-                    os.remove(dest_path)
-                    logger.info(f"Cleaned up failed download: {dest_path}")
-                except:
-                    pass
+            if writing and partial.size:
+                # Keep what arrived so the next attempt resumes from there
+                partial.save([[os.path.getsize(partial.path), partial.size]], force=True)
+                logger.info(f"Kept partial download for resume: {partial.path}")
+            elif writing:
+                partial.discard()
             return False
@@ -0,0 +1,77 @@
+import os
+import sys
+import time
+
+if sys.platform == "win32":
+    import msvcrt
+else:
+    import fcntl
+
+from app.utils.logger import get_logger
+logger = get_logger(__name__)
+
+
+class FileLock:
+    """
+    Exclusive advisory lock on a lock file, shared by every process (and thread) that uses
+    the same path: fcntl.flock on POSIX, msvcrt.locking on Windows. The OS drops the lock
+    when its holder exits, so a crashed instance never leaves the cache locked.
+    Not reentrant: each holder uses its own FileLock instance.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._fd = None
+
+    def _try_lock(self, fd):
+        try:
+            if sys.platform == "win32":
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+            else:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            return False
+
+    def acquire(self, blocking=True, timeout=None, poll=0.1):
+        """Take the lock; returns False if it is held elsewhere (non-blocking) or timeout ran out."""
+        if self._fd is not None:
+            return True
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o666)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self._try_lock(fd):
+            if not blocking or (deadline is not None and time.monotonic() >= deadline):
+                os.close(fd)
+                return False
+            time.sleep(poll)
+        self._fd = fd
+        return True
+
+    def release(self):
+        fd, self._fd = self._fd, None
+        if fd is None:
+            return
+        try:
+            if sys.platform == "win32":
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+        except OSError as e:
+            logger.warning(f"Failed to release lock {self.path}: {e}")
+        finally:
+            os.close(fd)
+
+    @property
+    def locked(self):
+        """True while this instance holds the lock."""
+        return self._fd is not None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
@@ -0,0 +1,67 @@
+import os
+import threading
+from http.cookiejar import DefaultCookiePolicy
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.config import CURRENT_VERSION
+from app.utils import rate_limit
+from app.utils.config_store import load_config
+
+from app.utils.logger import get_logger
+logger = get_logger(__name__)
+
+# EMUMAN_GITHUB_API points the app at another API host (e.g. the local stub in benchmarks/)
+GITHUB_API = os.environ.get("EMUMAN_GITHUB_API", "https://api.github.com").rstrip("/")
+USER_AGENT = f"EmuMan-App-Client/{CURRENT_VERSION}"
+
+# Pool defaults: a handful of hosts (api.github.com, release asset CDN, mirrors),
+# each with enough warm connections for the parallel startup burst.
+DEFAULT_POOL_CONNECTIONS = 4
+DEFAULT_POOL_MAXSIZE = 8
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """
+    Process-wide requests.Session with keep-alive connection pooling per host.
+    Safe to share between worker threads: the session is never mutated after creation
+    and cookies are not persisted.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                cfg = load_config()
+                pool_connections = int(cfg.get("http_pool_connections", DEFAULT_POOL_CONNECTIONS))
+                pool_maxsize = int(cfg.get("http_pool_maxsize", DEFAULT_POOL_MAXSIZE))
+
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers["User-Agent"] = USER_AGENT
+                session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+                # Every response updates the shared API budget
+                session.hooks["response"].append(rate_limit.get_tracker().observe)
+
+                logger.info(f"HTTP session created (pools: {pool_connections}, max size: {pool_maxsize})")
+                _session = session
+    return _session
+
+
+def github_headers():
+    """Standard GitHub API headers, including the optional token from config."""
+    headers = {'Accept': 'application/vnd.github.v3+json'}
+    token = load_config().get("gh_token")
+    if token:
+        headers['Authorization'] = f'token {token}'
+    return headers
+
+
+def get(url, **kwargs):
+    """GET through the shared session."""
+    return get_session().get(url, **kwargs)
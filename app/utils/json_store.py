@@ -0,0 +1,133 @@
+import os
+import json
+import atexit
+import tempfile
+import threading
+
+from app.utils.file_lock import FileLock
+from app.utils.logger import get_logger
+logger = get_logger(__name__)
+
+DEFAULT_DEBOUNCE = 2.0
+
+
+def read_json(path):
+    if os.path.exists(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                return data
+        except Exception as e:
+            logger.warning(f"Discarding unreadable cache file {path}: {e}")
+    return {}
+
+
+def write_json_atomic(path, data):
+    """Write a temp file and atomically replace the target, so readers never see a torn file."""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path), suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def update_json_file(path, updates):
+    """Read-modify-write of a small JSON file that other processes may update too."""
+    with FileLock(path + ".lock"):
+        data = read_json(path)
+        data.update(updates)
+        write_json_atomic(path, data)
+    return data
+
+
+class JsonStore:
+    """
+    In-memory dict backed by a JSON file.
+    The file is read once; writes only mark the store dirty and (re)arm a debounce timer, so a
+    burst of updates becomes a single flush. Flushes write a temp file and atomically replace
+    the target, so readers never see a torn file. Pending changes are flushed at exit.
+    Several processes may share the file: a flush merges only the keys changed here into the
+    current file contents, under a FileLock.
+    """
+
+    def __init__(self, path, debounce=DEFAULT_DEBOUNCE):
+        self.path = path
+        self.debounce = debounce
+        self._lock = threading.RLock()
+        self._data = None
+        self._dirty = False
+        self._changed = set()
+        self._deleted = set()
+        self._timer = None
+        atexit.register(self.flush)
+
+    def _load(self):
+        if self._data is None:
+            self._data = read_json(self.path)
+        return self._data
+
+    def get(self, key, default=None):
+        with self._lock:
+            return self._load().get(key, default)
+
+    def items(self):
+        with self._lock:
+            return list(self._load().items())
+
+    def set(self, key, value):
+        with self._lock:
+            self._load()[key] = value
+            self._changed.add(key)
+            self._deleted.discard(key)
+            self._mark_dirty()
+
+    def delete(self, key):
+        with self._lock:
+            if self._load().pop(key, None) is not None:
+                self._deleted.add(key)
+                self._changed.discard(key)
+                self._mark_dirty()
+
+    def _mark_dirty(self):
+        self._dirty = True
+        if self._timer:
+            self._timer.cancel()
+        self._timer = threading.Timer(self.debounce, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def flush(self):
+        """Write pending changes now (no-op if nothing changed)."""
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return
+            changed, deleted = self._changed, self._deleted
+            self._changed, self._deleted = set(), set()
+            self._dirty = False
+
+            try:
+                with FileLock(self.path + ".lock"):
+                    # Keep whatever other instances wrote since this one loaded the file
+                    data = read_json(self.path)
+                    for key in deleted:
+                        data.pop(key, None)
+                    for key in changed:
+                        data[key] = self._data[key]
+                    write_json_atomic(self.path, data)
+                self._data = data
+            except Exception as e:
+                # Keep the changes in memory; the next write retries the flush
+                self._changed |= changed
+                self._deleted |= deleted
+                self._dirty = True
+                logger.error(f"Failed to write cache file {self.path}: {e}")
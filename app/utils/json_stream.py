@@ -0,0 +1,34 @@
+import re
+import json
+
+_WS = re.compile(r'[ \t\n\r]*')
+_decoder = json.JSONDecoder()
+
+
+def iter_json_array(text):
+    """
+    Yield the elements of a top-level JSON array one at a time.
+    Only the current element is materialised, so callers that keep a few fields of each
+    element never hold the whole parsed document in memory.
+    """
+    if isinstance(text, (bytes, bytearray, memoryview)):
+        text = bytes(text).decode('utf-8')
+
+    idx = _WS.match(text, 0).end()
+    if text[idx:idx + 1] != '[':
+        raise ValueError("Expected a JSON array")
+    idx = _WS.match(text, idx + 1).end()
+    if text[idx:idx + 1] == ']':
+        return
+
+    while True:
+        obj, idx = _decoder.raw_decode(text, idx)
+        yield obj
+        idx = _WS.match(text, idx).end()
+        ch = text[idx:idx + 1]
+        if ch == ',':
+            idx = _WS.match(text, idx + 1).end()
+        elif ch == ']':
+            return
+        else:
+            raise ValueError(f"Malformed JSON array at offset {idx}")
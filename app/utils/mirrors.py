@@ -0,0 +1,74 @@
+import time
+import threading
+
+from app.utils import http_client
+from app.utils.config_store import load_config
+
+from app.utils.logger import get_logger
+logger = get_logger(__name__)
+
+# Upstream hosts a mirror stands in for. A mirror serves the same paths under its own base URL:
+#   api_mirror:      <base>/repos/{owner}/{repo}/releases...            (same JSON as the API)
+#   download_mirror: <base>/{owner}/{repo}/releases/download/{tag}/{name}
+UPSTREAM_API = http_client.GITHUB_API
+UPSTREAM_DOWNLOAD = "https://github.com"
+
+# A mirror that failed is skipped (straight to upstream) for this long
+MIRROR_RETRY_AFTER = 300
+
+_failed = {}  # mirror base -> monotonic time it may be tried again
+_failed_lock = threading.Lock()
+
+
+def _mirror_base(key):
+    base = (load_config().get(key) or "").strip().rstrip("/")
+    return base or None
+
+
+def _available(base):
+    with _failed_lock:
+        until = _failed.get(base)
+        if until is None:
+            return True
+        if time.monotonic() >= until:
+            del _failed[base]
+            return True
+    return False
+
+
+def _rewrite(url, upstream, key):
+    base = _mirror_base(key)
+    if base and url.startswith(upstream + "/") and _available(base):
+        return base + url[len(upstream):]
+    return None
+
+
+def api_url(url):
+    """Mirror URL for an API request, or None if no usable API mirror is configured."""
+    return _rewrite(url, UPSTREAM_API, "api_mirror")
+
+
+def download_urls(url):
+    """Candidate URLs for an asset download: the download mirror (if any) first, then upstream."""
+    mirrored = _rewrite(url, UPSTREAM_DOWNLOAD, "download_mirror")
+    return [mirrored, url] if mirrored else [url]
+
+
+def to_upstream(url):
+    """Map a mirror URL (e.g. from a mirror's Link header) back to its upstream form."""
+    for key, upstream in (("api_mirror", UPSTREAM_API), ("download_mirror", UPSTREAM_DOWNLOAD)):
+        base = _mirror_base(key)
+        if base and url.startswith(base + "/"):
+            return upstream + url[len(base):]
+    return url
+
+
+def mark_failed(url, reason):
+    """Record a mirror miss/error so following requests go straight to upstream for a while."""
+    for key in ("api_mirror", "download_mirror"):
+        base = _mirror_base(key)
+        if base and url.startswith(base + "/"):
+            with _failed_lock:
+                _failed[base] = time.monotonic() + MIRROR_RETRY_AFTER
+            logger.warning(f"Mirror {base} failed ({reason}), using upstream for {MIRROR_RETRY_AFTER}s")
+            return
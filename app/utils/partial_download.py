@@ -0,0 +1,112 @@
+import os
+import time
+
+from app.utils.json_store import read_json, write_json_atomic
+
+from app.utils.logger import get_logger
+logger = get_logger(__name__)
+
+PART_SUFFIX = ".part"
+SIDECAR_SUFFIX = ".part.json"
+# Minimum interval between sidecar writes while downloading
+SAVE_INTERVAL = 1.0
+
+
+class PartialDownload:
+    """
+    An unfinished download: <dest>.part holds the data, <dest>.part.json the URL, validator
+    (ETag or Last-Modified), total size and the byte ranges still missing. Both survive
+    errors and restarts so the next attempt resumes with Range/If-Range; only complete()
+    (renamed into place) and discard() (explicit cancel, or the file changed) remove them.
+    """
+
+    def __init__(self, dest_path, url):
+        self.dest_path = str(dest_path)
+        self.path = self.dest_path + PART_SUFFIX
+        self.sidecar = self.dest_path + SIDECAR_SUFFIX
+        self.url = url
+        self.etag = None
+        self.last_modified = None
+        self.size = None
+        self.ranges = None  # [[start, end), ...] still missing
+        self._saved_at = 0
+
+    def load(self):
+        """Restore the state of an earlier attempt at the same URL; False if there is nothing to resume."""
+        data = read_json(self.sidecar)
+        if not data or data.get("url") != self.url or not os.path.exists(self.path):
+            return False
+        self.etag = data.get("etag")
+        self.last_modified = data.get("last_modified")
+        self.size = data.get("size")
+        self.ranges = [list(r) for r in data.get("ranges") or []]
+        if not self.validator or not self.size or not self.ranges:
+            return False
+        # Everything before the first missing byte must already be on disk
+        if os.path.getsize(self.path) < self.ranges[0][0]:
+            return False
+        logger.info(f"Resuming {os.path.basename(self.dest_path)}: {self.size - self.missing} of {self.size} bytes present")
+        return True
+
+    def resumable(self):
+        """True if a .part file and its sidecar are on disk, i.e. a later attempt can pick them up."""
+        return os.path.exists(self.path) and os.path.exists(self.sidecar)
+
+    @property
+    def validator(self):
+        """Value for If-Range: a strong ETag, else Last-Modified (weak ETags are not allowed there)."""
+        if self.etag and not self.etag.startswith("W/"):
+            return self.etag
+        return self.last_modified
+
+    @property
+    def missing(self):
+        return sum(end - start for start, end in self.ranges or [])
+
+    def remember(self, response, size):
+        """Take the validator and size of the response a fresh download starts from."""
+        self.etag = response.headers.get("ETag")
+        self.last_modified = response.headers.get("Last-Modified")
+        self.size = size
+        self.ranges = None
+
+    def save(self, ranges, force=False):
+        """Persist the missing ranges (at most every SAVE_INTERVAL unless forced); no-op when not resumable."""
+        self.ranges = [list(r) for r in ranges]
+        if not self.validator or not self.size:
+            return
+        now = time.monotonic()
+        if not force and now - self._saved_at < SAVE_INTERVAL:
+            return
+        self._saved_at = now
+        try:
+            write_json_atomic(self.sidecar, {"url": self.url, "etag": self.etag, "last_modified": self.last_modified,
+                                              "size": self.size, "ranges": self.ranges})
+        except Exception as e:
+            logger.warning(f"Failed to save download state {self.sidecar}: {e}")
+
+    def complete(self):
+        os.replace(self.path, self.dest_path)
+        self._remove(self.sidecar)
+
+    def discard(self):
+        for path in (self.path, self.sidecar):
+            self._remove(path)
+        self.ranges = None
+
+    @staticmethod
+    def _remove(path):
+        if not os.path.exists(path):
+            return
+        # Windows may still hold the handle for a moment after the writers closed it
+        for attempt in range(3):
+            try:
+                os.remove(path)
+                logger.info(f"Cleaned up: {path}")
+                return
+            except PermissionError:
+                time.sleep(0.2)
+            except Exception as e:
+                logger.warning(f"Failed to remove {path}: {e}")
+                return
+        logger.warning(f"Failed to remove {path}: file is locked")
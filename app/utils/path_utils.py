@@ -4,6 +4,8 @@ import subprocess
 import platform
 import shutil
 
+from app.utils.config_store import load_config
+
 def get_resource_path(relative_path):
     """ Get absolute path to resource, works for dev and for PyInstaller """
     try:
@@ -14,6 +16,15 @@ def get_resource_path(relative_path):
 
     return os.path.join(base_path, relative_path)
 
+def get_cache_dir():
+    """
+    Directory for cached API data: "cache_dir" in config.json, else ./cache.
+    It may be shared by several EmuMan instances or users; everything written there is
+    either SQLite or updated under a FileLock.
+    """
+    cache_dir = load_config().get("cache_dir")
+    return os.path.expanduser(cache_dir) if cache_dir else "cache"
+
 from app.utils.logger import get_logger
 logger = get_logger(__name__)
 
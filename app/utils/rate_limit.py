@@ -0,0 +1,124 @@
+import time
+import threading
+
+from app.utils.config_store import load_config
+
+from app.utils.logger import get_logger
+logger = get_logger(__name__)
+
+# Request priorities. User-initiated requests may spend the whole budget; background
+# checks stop early and leave a reserve so a manual refresh still goes through.
+PRIORITY_USER = 0
+PRIORITY_BACKGROUND = 1
+
+DEFAULT_RESERVE = 10
+
+
+class RateLimitedError(Exception):
+    """Raised instead of sending a request the API budget cannot cover."""
+
+    def __init__(self, reset_at):
+        self.reset_at = reset_at
+        super().__init__(f"GitHub API rate limit reached, resets in {self.retry_after()}s")
+
+    def retry_after(self):
+        return max(0, int(self.reset_at - time.time()))
+
+
+class RateLimitTracker:
+    """
+    Tracks the GitHub API budget per rate-limit resource ("core", "graphql", ...) from the
+    X-RateLimit-* response headers, and decides whether a request of a given priority
+    may still be sent before the window resets.
+    """
+
+    def __init__(self, reserve=DEFAULT_RESERVE):
+        self.reserve = reserve
+        self._lock = threading.Lock()
+        self._buckets = {}  # resource -> [limit, remaining, reset_at]
+
+    def observe(self, response, *args, **kwargs):
+        """requests response hook: record the budget reported by the API."""
+        headers = response.headers
+        remaining = headers.get("X-RateLimit-Remaining")
+        try:
+            if remaining is not None:
+                resource = headers.get("X-RateLimit-Resource", "core")
+                limit = int(headers.get("X-RateLimit-Limit", 0))
+                reset_at = float(headers.get("X-RateLimit-Reset", 0))
+                with self._lock:
+                    self._buckets[resource] = [limit, int(remaining), reset_at]
+                if int(remaining) == 0:
+                    logger.warning(f"GitHub API rate limit ({resource}) exhausted until {time.strftime('%H:%M:%S', time.localtime(reset_at))}")
+            elif response.status_code in (403, 429) and headers.get("Retry-After"):
+                # Secondary rate limit: no budget headers, only a back-off hint
+                reset_at = time.time() + int(headers["Retry-After"])
+                with self._lock:
+                    bucket = self._buckets.setdefault("core", [0, 0, 0])
+                    bucket[1], bucket[2] = 0, max(bucket[2], reset_at)
+                logger.warning(f"GitHub API secondary rate limit hit, backing off {headers['Retry-After']}s")
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Ignoring malformed rate limit headers: {e}")
+        return response
+
+    def _floor(self, priority):
+        return 0 if priority == PRIORITY_USER else self.reserve
+
+    def allow(self, priority=PRIORITY_BACKGROUND, resource="core"):
+        """True if a request of this priority could be sent now (does not consume budget)."""
+        with self._lock:
+            bucket = self._buckets.get(resource)
+            if not bucket or time.time() >= bucket[2]:
+                return True
+            return bucket[1] > self._floor(priority)
+
+    def acquire(self, priority=PRIORITY_BACKGROUND, resource="core", conditional=False):
+        """
+        Reserve one request from the budget. Returns False if the request should not be sent.
+        The local count is corrected by the headers of the actual response.
+        Conditional requests (If-None-Match / If-Modified-Since) are free when answered with
+        304, so they pass the same priority check but do not reserve anything.
+        """
+        with self._lock:
+            bucket = self._buckets.get(resource)
+            if not bucket:
+                return True
+            if time.time() >= bucket[2]:
+                # Window has reset; the next response will report the new budget
+                del self._buckets[resource]
+                return True
+            if bucket[1] <= self._floor(priority):
+                return False
+            if conditional:
+                return True
+            bucket[1] -= 1
+            return True
+
+    def reset_at(self, resource="core"):
+        """Epoch time the current window ends, or 0 if the budget is unknown."""
+        with self._lock:
+            bucket = self._buckets.get(resource)
+            return bucket[2] if bucket else 0
+
+    def remaining(self, resource="core"):
+        with self._lock:
+            bucket = self._buckets.get(resource)
+            return bucket[1] if bucket else None
+
+
+_tracker = None
+_tracker_lock = threading.Lock()
+
+
+def get_tracker():
+    """Process-wide RateLimitTracker; the reserve is configurable via "rate_limit_reserve"."""
+    global _tracker
+    if _tracker is None:
+        with _tracker_lock:
+            if _tracker is None:
+                try:
+                    reserve = int(load_config().get("rate_limit_reserve", DEFAULT_RESERVE))
+                except (TypeError, ValueError):
+                    reserve = DEFAULT_RESERVE
+                _tracker = RateLimitTracker(reserve)
+    return _tracker
@@ -0,0 +1,296 @@
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+from contextlib import contextmanager
+
+import requests
+from requests.utils import parse_header_links
+
+from app.utils import http_client, mirrors, sqlite_store
+from app.utils.config_store import load_config
+from app.utils.connectivity import get_monitor, OfflineError
+from app.utils.path_utils import get_cache_dir
+from app.utils.rate_limit import get_tracker, RateLimitedError, PRIORITY_BACKGROUND, PRIORITY_USER
+
+from app.utils.logger import get_logger
+logger = get_logger(__name__)
+
+# Default freshness per endpoint kind (seconds). Override via "http_cache_ttl" in config.json,
+# e.g. {"releases": 1800}. This is the single place to trade freshness against request volume.
+DEFAULT_TTLS = {
+    "releases": 3600,       # Eden master/nightly release lists
+    "app_update": 86400,    # EmuMan latest release
+    "firmware": 86400,      # NX firmware latest release
+}
+DEFAULT_MAX_MB = 32
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    url TEXT PRIMARY KEY,
+    status INTEGER NOT NULL,
+    body BLOB,
+    etag TEXT,
+    last_modified TEXT,
+    link TEXT,
+    digest TEXT,
+    fetched_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_access ON responses (accessed_at);
+"""
+
+
+def ttl_for(kind):
+    """Freshness window for an endpoint kind, honouring config overrides."""
+    overrides = load_config().get("http_cache_ttl", {})
+    return int(overrides.get(kind, DEFAULT_TTLS.get(kind, 3600)))
+
+
+def _contains(full, part):
+    """True if every field of the decoded JSON part has the same value in full (lists item by item, absent = null)."""
+    if isinstance(part, dict):
+        return isinstance(full, dict) and all(_contains(full.get(k), v) for k, v in part.items())
+    if isinstance(part, list):
+        return isinstance(full, list) and len(full) == len(part) and all(map(_contains, full, part))
+    return full == part
+
+
+def _is_connect_failure(e):
+    """True if the request never reached the host; TLS and proxy errors say nothing about being offline."""
+    if isinstance(e, requests.ConnectTimeout):
+        return True
+    return isinstance(e, requests.ConnectionError) and not isinstance(e, (requests.exceptions.SSLError, requests.exceptions.ProxyError))
+
+
+class CachedResponse:
+    """A response served by ResponseCache, either from the network or from disk."""
+
+    def __init__(self, url, status, body, etag=None, last_modified=None, link=None, digest=None, fetched_at=0,
+                 from_cache=False, not_modified=False, stale=False):
+        self.url = url
+        self.status = status
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.link = link
+        self.digest = digest
+        self.fetched_at = fetched_at
+        self.from_cache = from_cache      # No network round trip was made
+        self.not_modified = not_modified  # Revalidated with a 304
+        self.stale = stale                # Served past its TTL because the network failed
+
+    def json(self):
+        return json.loads(self.body)
+
+    @property
+    def links(self):
+        """Parsed `Link` header, keyed by rel (same shape as requests.Response.links)."""
+        if not self.link:
+            return {}
+        return {l.get("rel") or l.get("url"): l for l in parse_header_links(self.link)}
+
+
+class ResponseCache:
+    """
+    On-disk HTTP response cache keyed by URL.
+    Provides per-endpoint TTLs, ETag/Last-Modified revalidation, stale-if-error fallback
+    and a total-size cap with least-recently-used eviction.
+    """
+
+    def __init__(self, db_path, max_bytes=DEFAULT_MAX_MB * 1024 * 1024):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            sqlite_store.use_rollback_journal(conn)
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite_store.connect(self.db_path)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _get(self, url):
+        with self._connect() as conn:
+            row = conn.execute("SELECT status, body, etag, last_modified, link, digest, fetched_at FROM responses WHERE url = ?",
+                               (url,)).fetchone()
+            if row:
+                conn.execute("UPDATE responses SET accessed_at = ? WHERE url = ?", (time.time(), url))
+        if not row:
+            return None
+        status, body, etag, last_modified, link, digest, fetched_at = row
+        return CachedResponse(url, status, body, etag, last_modified, link, digest, fetched_at, from_cache=True)
+
+    def _store(self, url, status, body, etag, last_modified, link):
+        now = time.time()
+        digest = hashlib.sha1(body).hexdigest()
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO responses (url, status, body, etag, last_modified, link, digest, fetched_at, accessed_at, size) "
+                         "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                         (url, status, body, etag, last_modified, link, digest, now, now, len(body)))
+        self._evict()
+        return CachedResponse(url, status, body, etag, last_modified, link, digest, now)
+
+    def _touch(self, url):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("UPDATE responses SET fetched_at = ?, accessed_at = ? WHERE url = ?", (now, now, url))
+        return now
+
+    def _evict(self):
+        """Drop least recently used entries until the cache fits in max_bytes."""
+        with self._connect() as conn:
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            for url, size in conn.execute("SELECT url, size FROM responses ORDER BY accessed_at").fetchall():
+                conn.execute("DELETE FROM responses WHERE url = ?", (url,))
+                total -= size
+                logger.info(f"Response cache evicted: {url}")
+                if total <= self.max_bytes:
+                    break
+
+    def peek(self, url, max_age=None):
+        """Return the cached response without touching the network (None if missing or older than max_age)."""
+        try:
+            entry = self._get(url)
+        except Exception as e:
+            logger.warning(f"Response cache read failed: {e}")
+            return None
+        if entry and max_age is not None and time.time() - entry.fetched_at >= max_age:
+            return None
+        return entry
+
+    def _serve_stale(self, entry, reason):
+        logger.warning(f"{reason}, serving stale cached response for {entry.url}")
+        entry.stale = True
+        return entry
+
+    def _not_modified(self, entry):
+        entry.fetched_at = self._touch(entry.url)
+        entry.from_cache = False
+        entry.not_modified = True
+        return entry
+
+    def _store_response(self, url, res):
+        link = res.headers.get("Link")
+        if link:
+            # Pages served by a mirror link to the mirror; keep the cache keyed by upstream URLs
+            link = re.sub(r"<([^>]+)>", lambda m: f"<{mirrors.to_upstream(m.group(1))}>", link)
+        return self._store(url, res.status_code, res.content,
+                           res.headers.get("ETag"), res.headers.get("Last-Modified"), link)
+
+    def _fetch_mirror(self, url, entry, req_headers, timeout):
+        """Try the configured API mirror; None on miss or error so the caller falls back to upstream."""
+        mirror_url = mirrors.api_url(url)
+        if not mirror_url:
+            return None
+        # The GitHub token is for GitHub only
+        mirror_headers = {k: v for k, v in req_headers.items() if k != 'Authorization'}
+        try:
+            res = http_client.get(mirror_url, headers=mirror_headers, timeout=timeout)
+            if res.status_code == 304 and entry:
+                return self._not_modified(entry)
+            if res.status_code == 404:
+                logger.info(f"Mirror miss for {url}, falling back to upstream")
+                return None
+            res.raise_for_status()
+            return self._store_response(url, res)
+        except Exception as e:
+            mirrors.mark_failed(mirror_url, e)
+            return None
+
+    def fetch(self, url, max_age, headers=None, timeout=8, stale_if_error=True, priority=PRIORITY_BACKGROUND):
+        """
+        Return a response for url, hitting the network only when the cached copy is older
+        than max_age (max_age=0 always revalidates). A configured API mirror is tried first and
+        does not count against the GitHub budget. Raises if the request fails and no usable
+        cached copy exists; RateLimitedError if the API budget does not allow the request at
+        this priority; OfflineError (without waiting for a timeout) if the machine is offline.
+        """
+        entry = self.peek(url)
+        if entry and time.time() - entry.fetched_at < max_age:
+            return entry
+
+        monitor = get_monitor()
+        if not monitor.is_online():
+            if entry and stale_if_error:
+                return self._serve_stale(entry, "Offline")
+            raise OfflineError(url)
+
+        req_headers = dict(headers or {})
+        if entry:
+            if entry.etag:
+                req_headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                req_headers['If-Modified-Since'] = entry.last_modified
+
+        mirrored = self._fetch_mirror(url, entry, req_headers, timeout)
+        if mirrored:
+            return mirrored
+
+        tracker = get_tracker()
+        conditional = 'If-None-Match' in req_headers or 'If-Modified-Since' in req_headers
+        if not tracker.acquire(priority, conditional=conditional):
+            if entry and stale_if_error:
+                return self._serve_stale(entry, "Rate limit budget low")
+            raise RateLimitedError(tracker.reset_at())
+
+        try:
+            res = http_client.get(url, headers=req_headers, timeout=timeout)
+            if res.status_code == 304 and entry:
+                return self._not_modified(entry)
+            if res.status_code in (403, 429) and not tracker.allow(PRIORITY_USER):
+                raise RateLimitedError(tracker.reset_at())
+            res.raise_for_status()
+            return self._store_response(url, res)
+        except Exception as e:
+            if _is_connect_failure(e):
+                monitor.mark_offline()
+            if entry and stale_if_error:
+                return self._serve_stale(entry, f"Request failed ({e})")
+            raise
+
+    def put(self, url, body, link=None):
+        """
+        Store a response obtained another way (e.g. a batched GraphQL query) under its REST URL.
+        body may hold only part of the REST fields; if the cached REST response agrees with it,
+        that entry is kept with its ETag / Last-Modified and only marked fresh, so the next
+        revalidation can still end in a 304.
+        """
+        entry = self.peek(url)
+        if entry and (entry.etag or entry.last_modified):
+            try:
+                unchanged = _contains(entry.json(), json.loads(body))
+            except ValueError:
+                unchanged = False
+            if unchanged:
+                return self._not_modified(entry)
+        return self._store(url, 200, body, None, None, link)
+
+    def invalidate(self, url):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM responses WHERE url = ?", (url,))
+
+
+_instance = None
+_instance_lock = threading.Lock()
+
+
+def get_response_cache():
+    """Process-wide ResponseCache living in <cache dir>/http_cache.db (shared with other instances)."""
+    global _instance
+    if _instance is None:
+        with _instance_lock:
+            if _instance is None:
+                max_mb = load_config().get("http_cache_max_mb", DEFAULT_MAX_MB)
+                _instance = ResponseCache(os.path.join(get_cache_dir(), "http_cache.db"), int(max_mb) * 1024 * 1024)
+    return _instance
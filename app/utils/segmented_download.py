@@ -0,0 +1,353 @@
+import os
+import re
+import time
+import threading
+
+import requests
+
+from app.utils import http_client
+from app.utils.bandwidth import get_limiter
+from app.utils.digest import StreamingHasher, DigestMismatch
+from app.utils.partial_download import PartialDownload
+
+from app.utils.logger import get_logger
+logger = get_logger(__name__)
+
+# Defaults match the aria2c invocation in downloader.py (-x 8 -s 8 -k 1M)
+DEFAULT_CONNECTIONS = 8
+MIN_SEGMENT = 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+# With a digest, work is handed out in pieces of this size, in file order, so the data written
+# ahead of the hashed prefix stays within a few pieces per connection and is hashed from memory
+HASH_PIECE = 4 * 1024 * 1024
+# Smallest tail worth moving to another connection at the end of a download
+MIN_TAKEOVER = 256 * 1024
+# Failed requests per segment (without progress in between) before the download fails
+SEGMENT_RETRIES = 3
+# How often the coordinating thread reports progress and checks for cancellation
+POLL_INTERVAL = 0.25
+# Signed CDN URLs expire; on these a segment goes back through the original URL
+EXPIRED_STATUSES = (401, 403, 410)
+
+_CONTENT_RANGE = re.compile(r"bytes (\d+)-(\d+)/(\d+)")
+
+
+class RangeNotSupported(Exception):
+    """The download cannot be split (no Range support, unknown or small size): use one stream."""
+
+
+class SegmentError(Exception):
+    pass
+
+
+class FileChanged(Exception):
+    """The server answered If-Range with the whole (new) file: the partial data is stale."""
+
+
+class _Segment:
+    """Byte range [pos, end) still to be written; end shrinks when another connection takes over its tail."""
+    __slots__ = ("start", "pos", "end", "speed", "active")
+
+    def __init__(self, start, end, speed=0.0):
+        self.start = start
+        self.pos = start
+        self.end = end
+        self.speed = speed  # bytes/s of the connection working on it
+        self.active = False
+
+    @property
+    def remaining(self):
+        return max(0, self.end - self.pos)
+
+
+class SegmentedDownload:
+    """
+    Multi-connection HTTP download with Range requests, the built-in counterpart of aria2c.
+    The file is preallocated and every connection writes its segment at the right offset.
+    When a connection runs out of work it takes over the tail of the segment that would
+    finish last (sized by the two connections' speeds), so slow connections do not hold up the end of the download.
+    Data goes to a PartialDownload (.part file plus sidecar), so an interrupted download
+    resumes with the ranges still missing. With a digest, the file is fetched in ordered
+    pieces and hashed in a single pass while it streams (pieces that finish early wait in
+    memory for the prefix); the result is checked before the file is moved into place.
+    """
+
+    def __init__(self, url, dest_path, connections=DEFAULT_CONNECTIONS, min_segment=MIN_SEGMENT, digest=None):
+        self.source_url = url
+        self.url = url
+        self.dest_path = str(dest_path)
+        self.connections = max(1, connections)
+        self.min_segment = max(CHUNK_SIZE, min_segment)
+        self.total = 0
+        self.segments = []
+        self.partial = PartialDownload(dest_path, url)
+        self.hasher = StreamingHasher.create(digest, self.partial.path,
+                                             max_pending=2 * self.connections * HASH_PIECE)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._error = None
+
+    # =========================================
+    #             Setup
+    # =========================================
+
+    def _probe(self):
+        """
+        Total size and final (redirected) URL, from a one-byte range request. Returns True if
+        the data of an earlier attempt is still valid (If-Range matched) and can be resumed.
+        """
+        resuming = self.partial.load()
+        headers = {"Range": "bytes=0-0"}
+        if resuming:
+            headers["If-Range"] = self.partial.validator
+        with http_client.get(self.url, headers=headers, stream=True, timeout=30) as res:
+            if resuming and 400 <= res.status_code < 500:
+                logger.info(f"Resume request rejected (HTTP {res.status_code}), starting over.")
+                self.partial.discard()
+                return self._probe()
+            res.raise_for_status()
+            match = _CONTENT_RANGE.match(res.headers.get("Content-Range", ""))
+            if resuming and (res.status_code != 206 or not match or int(match.group(3)) != self.partial.size):
+                logger.info("File changed since the interrupted download, starting over.")
+                self.partial.discard()
+                return self._probe()
+            if res.status_code != 206 or not match:
+                raise RangeNotSupported("server does not support range requests")
+            self.total = int(match.group(3))
+            if not resuming:
+                self.partial.remember(res, self.total)
+            # Segments go straight to the CDN instead of following the redirect every time
+            self.url = res.url
+            return resuming
+
+    def _preallocate(self):
+        with open(self.partial.path, 'wb') as f:
+            f.truncate(self.total)
+            if hasattr(os, "posix_fallocate"):
+                try:
+                    os.posix_fallocate(f.fileno(), 0, self.total)
+                except OSError:
+                    pass  # Not supported by the filesystem; the sparse file works as well
+
+    def _split(self, ranges):
+        """Segments covering ranges, with the connections shared out by range length."""
+        missing = sum(end - start for start, end in ranges)
+        segments = []
+        for start, end in ranges:
+            count = max(1, min(round(self.connections * (end - start) / missing), (end - start) // self.min_segment))
+            if self.hasher:
+                count = max(count, -(-(end - start) // HASH_PIECE))
+            size = (end - start) // count
+            bounds = [start + i * size for i in range(count)] + [end]
+            segments += [_Segment(bounds[i], bounds[i + 1]) for i in range(count)]
+        return segments
+
+    # =========================================
+    #             Scheduling
+    # =========================================
+
+    def _next_segment(self, speed):
+        """An idle segment, or the tail of the one expected to finish last (None when done)."""
+        with self._lock:
+            for seg in self.segments:
+                if not seg.active and seg.remaining:
+                    seg.active = True
+                    return seg
+
+            def finish_time(seg):
+                return seg.remaining / seg.speed if seg.speed else float("inf")
+
+            busy = [s for s in self.segments if s.active and s.remaining >= MIN_TAKEOVER]
+            if not busy:
+                return None
+            slowest = max(busy, key=lambda s: (finish_time(s), s.remaining))
+            # Split so both connections finish together (halves while a speed is unknown)
+            share = speed / (speed + slowest.speed) if speed and slowest.speed else 0.5
+            take = int(slowest.remaining * share)
+            if take < MIN_TAKEOVER:
+                return None
+            stolen = _Segment(slowest.end - take, slowest.end, speed)
+            stolen.active = True
+            slowest.end = stolen.start
+            self.segments.append(stolen)
+            return stolen
+
+    def downloaded(self):
+        with self._lock:
+            return self.total - sum(s.remaining for s in self.segments)
+
+    def missing_ranges(self):
+        with self._lock:
+            return sorted([s.pos, s.end] for s in self.segments if s.remaining)
+
+    def _hash_prefix(self):
+        """Bring the digest up to the first byte still missing (only reads what the hasher never saw)."""
+        if self.hasher:
+            missing = self.missing_ranges()
+            self.hasher.catch_up(missing[0][0] if missing else self.total)
+
+    # =========================================
+    #             Workers
+    # =========================================
+
+    def _worker(self):
+        speed = 0.0
+        try:
+            # Unbuffered: whatever a segment's position covers is already with the OS
+            with open(self.partial.path, 'r+b', buffering=0) as f:
+                while not self._stop.is_set():
+                    seg = self._next_segment(speed)
+                    if seg is None:
+                        return
+                    speed = self._fetch_segment(seg, f)
+                    with self._lock:
+                        seg.active = False
+        except Exception as e:
+            with self._lock:
+                if self._error is None:
+                    self._error = e
+            self._stop.set()
+
+    def _fetch_segment(self, seg, f):
+        """Download seg until it is complete (or cut short by a takeover); returns the measured speed."""
+        failures = 0
+        while seg.remaining and not self._stop.is_set():
+            before = seg.pos
+            try:
+                self._stream_range(seg, f)
+                if seg.remaining and not self._stop.is_set() and seg.pos == before:
+                    raise SegmentError("response ended without data")
+                failures = 0
+            except (requests.RequestException, SegmentError) as e:
+                if seg.pos != before:
+                    failures = 0  # Progress was made; only consecutive empty attempts count
+                failures += 1
+                if failures > SEGMENT_RETRIES:
+                    raise SegmentError(f"bytes {seg.pos}-{seg.end - 1} failed {failures} times: {e}")
+                logger.warning(f"Segment at {seg.pos} failed ({e}), retrying ({failures}/{SEGMENT_RETRIES})")
+                time.sleep(failures)
+        return seg.speed
+
+    def _stream_range(self, seg, f):
+        start = seg.pos
+        headers = {"Range": f"bytes={start}-{seg.end - 1}"}
+        if self.partial.validator:
+            headers["If-Range"] = self.partial.validator
+        with http_client.get(self.url, headers=headers, stream=True, timeout=30) as res:
+            if res.status_code == 200 and "If-Range" in headers:
+                raise FileChanged(f"{self.source_url} changed during the download")
+            if res.status_code == 416:
+                raise FileChanged(f"{self.source_url} no longer has bytes {start}-{seg.end - 1}")
+            if res.status_code in EXPIRED_STATUSES and self.url != self.source_url:
+                self.url = self.source_url
+                raise SegmentError(f"HTTP {res.status_code}, signed URL expired")
+            match = _CONTENT_RANGE.match(res.headers.get("Content-Range", ""))
+            if res.status_code != 206 or not match or int(match.group(1)) != start:
+                raise SegmentError(f"HTTP {res.status_code} for range request at {start}")
+
+            f.seek(start)
+            offset = start
+            limiter = get_limiter()
+            window_start, window_bytes = time.monotonic(), 0
+            for chunk in res.iter_content(chunk_size=CHUNK_SIZE):
+                if self._stop.is_set():
+                    return
+                with self._lock:
+                    room = seg.end - seg.pos
+                if room <= 0:
+                    return  # The rest of this segment was taken over
+                chunk = chunk[:room]
+                # Written outside the lock; a takeover can only overlap this chunk with identical bytes
+                f.write(chunk)
+                if self.hasher:
+                    self.hasher.feed(offset, chunk)
+                offset += len(chunk)
+                with self._lock:
+                    seg.pos = min(seg.pos + len(chunk), seg.end)
+                limiter.consume(len(chunk))
+
+                window_bytes += len(chunk)
+                elapsed = time.monotonic() - window_start
+                if elapsed >= 0.25:
+                    rate = window_bytes / elapsed
+                    seg.speed = rate if not seg.speed else (seg.speed + rate) / 2
+                    window_start, window_bytes = time.monotonic(), 0
+
+    # =========================================
+    #             Run
+    # =========================================
+
+    def run(self, progress_callback=None, cancel_check=None, pause_check=None):
+        """
+        Download to dest_path, reporting progress_callback(done_bytes, total_bytes, bytes_per_sec).
+        Returns True on success, False on failure, pause or cancellation. A failed or paused
+        download keeps its partial data for the next attempt; a cancelled one is removed.
+        Raises RangeNotSupported before touching the destination if the download cannot be split,
+        and DigestMismatch (after removing the data) if the finished file fails verification.
+        """
+        resuming = self._probe()
+        if self.total < 2 * self.min_segment:
+            raise RangeNotSupported(f"only {self.total} bytes")
+
+        if resuming:
+            self.segments = self._split(self.partial.ranges)
+        else:
+            self._preallocate()
+            self.segments = self._split([[0, self.total]])
+        initial = len(self.segments)
+        workers = [threading.Thread(target=self._worker, name=f"segment-{i}", daemon=True)
+                   for i in range(min(self.connections, initial))]
+        logger.info(f"Segmented download of {self.total} bytes over {len(workers)} connections: {self.url}")
+        for worker in workers:
+            worker.start()
+
+        cancelled = paused = False
+        last_time, last_bytes = time.monotonic(), self.downloaded()
+        speed = 0.0
+        while any(w.is_alive() for w in workers):
+            time.sleep(POLL_INTERVAL)
+            if cancel_check and cancel_check():
+                cancelled = True
+                self._stop.set()
+                break
+            if pause_check and pause_check():
+                paused = True
+                self._stop.set()
+                break
+            self.partial.save(self.missing_ranges())
+            self._hash_prefix()
+            now, done = time.monotonic(), self.downloaded()
+            if now - last_time >= 1.0:
+                speed = (done - last_bytes) / (now - last_time)
+                last_time, last_bytes = now, done
+            if progress_callback:
+                progress_callback(done, self.total, speed)
+        for worker in workers:
+            worker.join()
+
+        if cancelled:
+            logger.info("Segmented download cancelled.")
+            self.partial.discard()
+            return False
+        if paused and self._error is None and self.downloaded() != self.total:
+            self.partial.save(self.missing_ranges(), force=True)
+            return False
+        if self._error is not None or self.downloaded() != self.total:
+            logger.error(f"Segmented download failed: {self._error or 'incomplete'}")
+            if isinstance(self._error, FileChanged):
+                self.partial.discard()
+            else:
+                self.partial.save(self.missing_ranges(), force=True)
+                logger.info(f"Kept {self.downloaded()} of {self.total} bytes to resume later.")
+            return False
+
+        if self.hasher:
+            try:
+                self.hasher.verify(self.total)
+            except DigestMismatch:
+                self.partial.discard()
+                raise
+        self.partial.complete()
+        if progress_callback: progress_callback(self.total, self.total, 0.0)
+        logger.info(f"Segmented download finished ({len(self.segments) - initial} segments rebalanced).")
+        return True
@@ -0,0 +1,30 @@
+import sqlite3
+
+from app.utils.logger import get_logger
+logger = get_logger(__name__)
+
+# How long a connection waits for another instance's write lock before failing
+BUSY_TIMEOUT = 10
+
+
+def connect(db_path):
+    """Connection to a database in the (possibly shared) cache dir, waiting out other writers."""
+    conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT)
+    conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT * 1000}")
+    return conn
+
+
+def use_rollback_journal(conn):
+    """
+    Keep the database in the default rollback journal (DELETE) mode. WAL needs shared memory
+    on a local disk and breaks on network or synced folders, which a shared cache dir may be;
+    databases from versions that enabled WAL are switched back (journal mode is persistent).
+    """
+    try:
+        mode = conn.execute("PRAGMA journal_mode=DELETE").fetchone()[0]
+    except sqlite3.OperationalError as e:
+        # Another instance still has the WAL database open; retried on the next start
+        logger.warning(f"Could not switch journal mode to DELETE: {e}")
+        return
+    if mode.lower() != "delete":
+        logger.warning(f"Database journal mode is {mode}, expected delete")
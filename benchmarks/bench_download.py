@@ -0,0 +1,213 @@
+"""
+Measure the download engines against a local asset server that behaves like GitHub's
+release CDN: a redirect to a signed URL, Range support and a per-connection bandwidth cap
+(a single stream from the CDN is capped well below the line rate).
+
+Usage: python benchmarks/bench_download.py [--size-mb 64] [--rate-mb 8] [--repeat 3] [--engine NAME ...]
+
+Engines: single (one requests stream), segmented (the built-in multi-connection engine),
+segmented-digest (the same, verifying the sha256 while it streams; "read back" is what the
+hasher had to read from disk instead of memory), aria2 (the shared aria2c daemon driven over JSON-RPC, skipped when aria2c is not installed).
+"""
+import os
+import sys
+import time
+import shutil
+import random
+import hashlib
+import argparse
+import tempfile
+import threading
+import statistics
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from pathlib import Path
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app.utils.downloader import Downloader
+from app.utils.segmented_download import SegmentedDownload
+
+ASSET_PATH = "/pflyly/eden-nightly/releases/download/bench/Eden-bench.7z"
+CDN_PATH = "/cdn/Eden-bench.7z"
+
+
+# =========================================
+#             Asset Server
+# =========================================
+
+class _AssetHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server.assets
+        if self.path == ASSET_PATH:
+            self.send_response(302)
+            self.send_header("Location", f"{server.base_url}{CDN_PATH}?sig=bench")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if not self.path.startswith(CDN_PATH):
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        if server.dropped():
+            self.close_connection = True
+            return
+
+        data, size = server.data, len(server.data)
+        start, end = 0, size - 1
+        range_header = self.headers.get("Range")
+        if_range = self.headers.get("If-Range")
+        if if_range and if_range != server.etag:
+            range_header = None  # Changed since the client's copy: send the whole file
+        if range_header and server.ranges:
+            first, last = range_header.split("=", 1)[1].split("-")
+            start, end = int(first), min(int(last) if last else size - 1, size - 1)
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        else:
+            self.send_response(200)
+        self.send_header("Accept-Ranges", "bytes" if server.ranges else "none")
+        self.send_header("ETag", server.etag)
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+
+        rate = server.connection_rate()
+        pos, block = start, 64 * 1024
+        began = time.monotonic()
+        try:
+            while pos <= end:
+                if server.dropped():
+                    self.close_connection = True  # Cut off mid-body, like a lost connection
+                    return
+                n = min(block, end - pos + 1)
+                self.wfile.write(data[pos:pos + n])
+                pos += n
+                with server.lock:
+                    server.sent += n
+                # Per-connection bandwidth cap
+                ahead = (pos - start) / rate - (time.monotonic() - began)
+                if ahead > 0:
+                    time.sleep(ahead)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Client dropped the rest of the range (segment taken over or cancelled)
+        with server.lock:
+            server.connections += 1
+
+
+class AssetServer:
+    """
+    rate: bytes/s per connection. slow_every/slow_rate: every n-th connection is capped
+    at slow_rate instead, to exercise rebalancing. ranges=False answers every request with 200.
+    drop_after: once this many bytes were sent, every connection is cut until it is reset to None.
+    """
+
+    def __init__(self, size, rate, slow_every=0, slow_rate=None, ranges=True):
+        self.data = random.Random(0).randbytes(size)
+        self.digest = hashlib.sha256(self.data).hexdigest()
+        self.etag = f'"{self.digest[:32]}"'
+        self.rate = rate
+        self.slow_every = slow_every
+        self.slow_rate = slow_rate or rate / 8
+        self.ranges = ranges
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.sent = 0
+        self.drop_after = None
+        self._served = 0
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _AssetHandler)
+        self.server.daemon_threads = True
+        self.server.assets = self
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def connection_rate(self):
+        with self.lock:
+            self._served += 1
+            slow = self.slow_every and self._served % self.slow_every == 0
+        return self.slow_rate if slow else self.rate
+
+    def dropped(self):
+        return self.drop_after is not None and self.sent >= self.drop_after
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+# =========================================
+#             Engines
+# =========================================
+
+def engine_single(url, dest):
+    return Downloader._download_requests(url, Path(dest), None, None)
+
+
+def engine_segmented(url, dest):
+    return SegmentedDownload(url, dest).run()
+
+
+def engine_segmented_digest(url, dest, digest):
+    download = SegmentedDownload(url, dest, digest=f"sha256:{digest}")
+    ok = download.run()
+    engine_segmented_digest.read_back = download.hasher.read_back
+    return ok
+
+
+def engine_aria2(url, dest):
+    return Downloader._download_aria2(url, Path(dest), None, None)
+
+
+ENGINES = {"single": engine_single, "segmented": engine_segmented, "segmented-digest": engine_segmented_digest,
+           "aria2": engine_aria2}
+
+
+def run_engine(name, server, repeat):
+    timings, ok, read_back = [], True, []
+    for _ in range(repeat):
+        workdir = tempfile.mkdtemp(prefix="emuman-dl-bench-")
+        dest = os.path.join(workdir, "asset.7z")
+        try:
+            start = time.perf_counter()
+            if name == "segmented-digest":
+                success = engine_segmented_digest(server.base_url + ASSET_PATH, dest, server.digest)
+                read_back.append(engine_segmented_digest.read_back)
+            else:
+                success = ENGINES[name](server.base_url + ASSET_PATH, dest)
+            timings.append(time.perf_counter() - start)
+            with open(dest, 'rb') as f:
+                ok = ok and success and hashlib.sha256(f.read()).hexdigest() == server.digest
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+    seconds = statistics.median(timings)
+    return {"engine": name, "median_s": round(seconds, 2),
+            "mb_s": round(len(server.data) / seconds / 1024 / 1024, 1), "intact": ok,
+            "read_back_mb": round(max(read_back) / 1024 / 1024, 1) if read_back else None}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="EmuMan download engine benchmark")
+    parser.add_argument("--size-mb", type=int, default=64)
+    parser.add_argument("--rate-mb", type=float, default=8, help="Bandwidth cap per connection (MB/s)")
+    parser.add_argument("--slow-every", type=int, default=0, help="Make every n-th connection 8x slower")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--engine", action="append", choices=sorted(ENGINES))
+    args = parser.parse_args()
+
+    engines = args.engine or [e for e in ENGINES if e != "aria2" or Downloader.get_aria2_executable()]
+    server = AssetServer(args.size_mb * 1024 * 1024, args.rate_mb * 1024 * 1024, slow_every=args.slow_every)
+    results = [run_engine(name, server, args.repeat) for name in engines]
+    server.stop()
+
+    header = f"{'engine':<18}{'median s':>10}{'MB/s':>8}{'read back MB':>14}  intact"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        read_back = "-" if r["read_back_mb"] is None else r["read_back_mb"]
+        print(f"{r['engine']:<18}{r['median_s']:>10}{r['mb_s']:>8}{read_back:>14}  {r['intact']}")
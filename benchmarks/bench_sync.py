@@ -0,0 +1,287 @@
+"""
+Drive the real sync, self-update and firmware checks against the local GitHub stub
+and report latency and traffic per scenario.
+
+Usage: python benchmarks/bench_sync.py [--repeat 3] [--scenario NAME ...] [--memory] [--json out.json]
+
+Every run gets a fresh working directory (config.json, cache/) and fresh HTTP session,
+response cache and rate-limit state, so scenarios do not leak into each other.
+
+Release data comes from benchmarks/fixtures/ when record_fixtures.py has been run, and is
+synthetic otherwise (none is committed; see github_stub). The source is printed with
+the results, so numbers from the two are not compared by mistake.
+"""
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import statistics
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from github_stub import GitHubStub, load_fixtures, fixture_sources, synthetic_release
+
+# The API base is read at import time, so the stub must be up before the app is imported
+_stub = GitHubStub(load_fixtures()).start()
+os.environ["EMUMAN_GITHUB_API"] = _stub.base_url
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import QCoreApplication
+from PySide6.QtGui import QGuiApplication
+
+from app.utils import http_client, response_cache, rate_limit
+from app.core import github_api
+from app.core.cache_manager import CacheManager
+from app.core.app_updater import UpdateCheckWorker
+from app.core.firmware_manager import FirmwareManager
+
+BASE_FIXTURES = {repo: list(releases) for repo, releases in _stub.fixtures.items()}
+
+
+# =========================================
+#             Harness
+# =========================================
+
+def configure_stub(latency=0.0, error_rate=0.0, fail_paths=(), rate_limit=None, remaining=None, fixtures=None):
+    _stub.fixtures = fixtures or {repo: list(releases) for repo, releases in BASE_FIXTURES.items()}
+    _stub.latency = latency
+    _stub.error_rate = error_rate
+    _stub.fail_paths = [re.compile(p) for p in fail_paths]
+    _stub.rate_limit = rate_limit
+    _stub.reset_rate_limit(remaining)
+    _stub.stats.reset()
+
+
+def fresh_state(workdir, config):
+    """New working directory plus new process-wide HTTP state, as after an app restart."""
+    os.chdir(workdir)
+    with open("config.json", 'w', encoding='utf-8') as f:
+        json.dump(config, f)
+    http_client._session = None
+    response_cache._instance = None
+    rate_limit._tracker = None
+    github_api._last_attempt = 0
+
+
+def run_sync(manager, force=False, timeout=60):
+    """
+    One sync through CacheManager.start_sync_task, exactly as the UI triggers it (freshness
+    gate, rate-limit gate, worker thread, catalog save and compaction). Returns the emitted diff.
+    """
+    diffs = []
+    manager.sync_diff.connect(diffs.append)
+    previous = manager.sync_worker
+    manager.start_sync_task(force=force)
+    if manager.sync_worker is not previous:
+        manager.sync_worker.wait()
+        deadline = time.monotonic() + timeout
+        while not diffs and time.monotonic() < deadline:
+            QCoreApplication.processEvents()
+    manager.sync_diff.disconnect(diffs.append)
+    return {"manager": manager, "diff": diffs[0] if diffs else None}
+
+
+def sync_outcome(result):
+    manager, diff = result["manager"], result["diff"]
+    if diff is None:
+        state = "no-sync"
+    else:
+        state = f"ok={diff.get('success')} changed={diff.get('changed')}"
+    return (f"{state} master={len(manager.catalog.get_versions('master'))} "
+            f"nightly={len(manager.catalog.get_versions('nightly'))}"
+            f"{' deferred' if manager.deferred_sync_timer.isActive() else ''}")
+
+
+# =========================================
+#             Scenarios
+# =========================================
+# Each scenario gets a prepared workdir; setup is excluded from the measurement.
+# A scenario returns (measured callable, describe(result) -> str).
+
+def cold_sync(limit=30, latency=0.0):
+    def scenario():
+        configure_stub(latency=latency)
+        manager = CacheManager()
+        return lambda: run_sync(manager), sync_outcome
+    return scenario, {"fetch_limit": limit}
+
+
+def warm_within_ttl():
+    def scenario():
+        configure_stub()
+        manager = CacheManager()
+        run_sync(manager)
+        _stub.stats.reset()
+        return lambda: run_sync(manager), sync_outcome
+    return scenario, {"fetch_limit": 30}
+
+
+def forced_revalidate():
+    def scenario():
+        configure_stub()
+        manager = CacheManager()
+        # Full first sync, then the incremental steady state whose pages get revalidated
+        run_sync(manager)
+        run_sync(manager, force=True)
+        _stub.stats.reset()
+        return lambda: run_sync(manager, force=True), sync_outcome
+    return scenario, {"fetch_limit": 30}
+
+
+def incremental_new_releases(new=2):
+    def scenario():
+        configure_stub()
+        manager = CacheManager()
+        run_sync(manager)
+        nightly = _stub.fixtures["pflyly/eden-nightly"]
+        top = len(nightly)
+        _stub.fixtures["pflyly/eden-nightly"] = [synthetic_release("pflyly/eden-nightly", top + i)
+                                                 for i in range(new, 0, -1)] + nightly
+        _stub.stats.reset()
+        return lambda: run_sync(manager, force=True), sync_outcome
+    return scenario, {"fetch_limit": 30}
+
+
+def branch_error():
+    def scenario():
+        configure_stub(fail_paths=[r"eden-nightly"])
+        manager = CacheManager()
+        return lambda: run_sync(manager), sync_outcome
+    return scenario, {"fetch_limit": 30}
+
+
+def rate_limited():
+    def scenario():
+        configure_stub(rate_limit=60, remaining=1)
+        manager = CacheManager()
+        # Learn the budget from one response, as the app would from any earlier request
+        http_client.get(f"{http_client.GITHUB_API}/repos/pflyly/EmuMan/releases/latest")
+        _stub.stats.reset()
+        return lambda: run_sync(manager), sync_outcome
+    return scenario, {"fetch_limit": 30}
+
+
+def update_check():
+    def scenario():
+        configure_stub()
+        out = {}
+        worker = UpdateCheckWorker("pflyly/EmuMan")
+        worker.finished.connect(lambda ok, data: out.update(ok=ok, **data))
+        def measured():
+            worker.run()
+            return out
+        return measured, lambda d: f"ok={d.get('ok')} tag={d.get('tag')}"
+    return scenario, {}
+
+
+def firmware_check():
+    def scenario():
+        configure_stub()
+        return (lambda: FirmwareManager.check_for_updates("19.0.0"),
+                lambda r: f"update={r[0]} latest={r[1]} fetched={r[3]}")
+    return scenario, {}
+
+
+def cold_start(token=False):
+    """Everything the app fetches at startup: both release lists, self-update and firmware checks."""
+    def scenario():
+        configure_stub()
+        manager = CacheManager()
+        def measured():
+            out = {}
+            worker = UpdateCheckWorker("pflyly/EmuMan")
+            worker.finished.connect(lambda ok, data: out.update(ok=ok, **data))
+            worker.start()
+            firmware = FirmwareManager.check_for_updates("19.0.0")
+            result = run_sync(manager)
+            worker.wait()
+            return dict(result, update=out, firmware=firmware)
+        return measured, lambda r: f"{sync_outcome(r)} update={r['update'].get('tag')} firmware={r['firmware'][1]}"
+    config = {"fetch_limit": 30}
+    if token:
+        config["gh_token"] = "stub-token"  # enables the batched GraphQL prefetch
+    return scenario, config
+
+
+SCENARIOS = {
+    "cold_sync": cold_sync(),
+    "cold_sync_latency_200ms": cold_sync(latency=0.2),
+    "cold_sync_limit_100": cold_sync(limit=100),
+    "warm_within_ttl": warm_within_ttl(),
+    "forced_revalidate_304": forced_revalidate(),
+    "incremental_2_new": incremental_new_releases(),
+    "nightly_branch_error": branch_error(),
+    "rate_limited_background": rate_limited(),
+    "update_check": update_check(),
+    "firmware_check": firmware_check(),
+    "cold_start_rest": cold_start(),
+    "cold_start_graphql": cold_start(token=True),
+}
+
+
+def run_scenario(name, repeat, memory):
+    make, config = SCENARIOS[name]
+    timings, peaks = [], []
+    requests_, bytes_, statuses, outcome = 0, 0, {}, ""
+    for _ in range(repeat):
+        workdir = tempfile.mkdtemp(prefix="emuman-bench-")
+        try:
+            fresh_state(workdir, config)
+            measured, describe = make()
+            if memory:
+                tracemalloc.start()
+            start = time.perf_counter()
+            result = measured()
+            timings.append(time.perf_counter() - start)
+            if memory:
+                peaks.append(tracemalloc.get_traced_memory()[1])
+                tracemalloc.stop()
+            requests_, bytes_, statuses = _stub.stats.requests, _stub.stats.bytes_sent, dict(_stub.stats.statuses)
+            outcome = describe(result)
+        finally:
+            os.chdir(ROOT)
+            shutil.rmtree(workdir, ignore_errors=True)
+    return {
+        "scenario": name,
+        "median_ms": round(statistics.median(timings) * 1000, 1),
+        "min_ms": round(min(timings) * 1000, 1),
+        "requests": requests_,
+        "kb": round(bytes_ / 1024, 1),
+        "statuses": statuses,
+        "peak_mb": round(max(peaks) / 1024 / 1024, 2) if peaks else None,
+        "outcome": outcome,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="EmuMan sync/update-check benchmarks")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS))
+    parser.add_argument("--memory", action="store_true", help="Also report peak Python memory (slower)")
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    app = QGuiApplication(sys.argv[:1])
+    results = [run_scenario(name, args.repeat, args.memory) for name in (args.scenario or SCENARIOS)]
+    _stub.stop()
+
+    sources = fixture_sources()
+    print("fixtures: " + ", ".join(f"{repo} {source}" for repo, source in sources.items()))
+    header = f"{'scenario':<26}{'median ms':>10}{'min ms':>9}{'reqs':>6}{'KB':>9}{'peak MB':>9}  statuses / outcome"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        peak = f"{r['peak_mb']:.2f}" if r["peak_mb"] is not None else "-"
+        print(f"{r['scenario']:<26}{r['median_ms']:>10}{r['min_ms']:>9}{r['requests']:>6}{r['kb']:>9}{peak:>9}  "
+              f"{r['statuses']} {r['outcome']}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,332 @@
+"""
+Local stand-in for the parts of the GitHub REST API EmuMan talks to.
+
+Serves release listings (paged, with Link headers) and /releases/latest for the Eden
+master/nightly, NX firmware and EmuMan repos from fixtures, plus the batched
+GraphQL query EmuMan sends when a token is configured, with optional
+injected latency, errors, ETag/304 handling and rate-limit headers. Every request is
+counted (status, bytes) so benchmarks can report traffic per scenario.
+
+Fixtures: no recorded GitHub responses are committed. Recording needs network access and
+a token (to stay within the rate limit), and recorded bodies go stale with every release.
+Without benchmarks/fixtures/*.json the stub serves synthetic releases built to the real
+API shape (uploader objects, long bodies, several assets, digests). Run record_fixtures.py
+once to benchmark against real responses instead; fixture_sources() tells which was used.
+
+Run standalone:  python benchmarks/github_stub.py --port 8765 --latency 0.1
+Then start the app with EMUMAN_GITHUB_API=http://127.0.0.1:8765
+"""
+import os
+import re
+import sys
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# Repo -> fixture file, matching the repos hardcoded in the app
+REPOS = {
+    "eden-emulator/Releases": "eden_master.json",
+    "pflyly/eden-nightly": "eden_nightly.json",
+    "THZoria/NX_Firmware": "nx_firmware.json",
+    "pflyly/EmuMan": "emuman.json",
+}
+
+
+# =========================================
+#             Fixtures
+# =========================================
+
+def synthetic_release(repo, index):
+    """A release shaped like the real API output (uploader objects, long bodies and all)."""
+    uploader = {"login": "github-actions[bot]", "id": 41898282, "type": "Bot", "site_admin": False,
+                "avatar_url": "https://avatars.githubusercontent.com/in/15368?v=4",
+                "url": "https://api.github.com/users/github-actions%5Bbot%5D"}
+    if repo == "eden-emulator/Releases":
+        tag = f"v0.0.{index // 10}-rc{index % 10}" if index % 10 else f"v0.0.{index // 10}"
+        body = "## Changelog\n" + "".join(f"- Fix {index}.{i}: improved something in the renderer\n" for i in range(40))
+        body += "# Packages\n" + "".join(f"- Eden-{tag}-pkg{i}\n" for i in range(20))
+        names = [f"Eden-Windows-{tag}-amd64-msvc-standard.zip", f"Eden-Linux-{tag}-amd64-gcc-standard.AppImage",
+                 f"Eden-Windows-{tag}-arm64-clang-pgo.zip", f"Eden-Linux-{tag}-aarch64-clang-pgo.AppImage"]
+    elif repo == "pflyly/eden-nightly":
+        build = 28000 + index
+        tag = f"{time.strftime('%Y-%m-%d', time.gmtime(1735689600 + index * 86400))}-{build}"
+        body = "## Changelog:\n" + "".join(f"**commit {build}-{i}**\nnightly change number {i}\n" for i in range(30))
+        body += "## Build Info\nunused details\n"
+        names = [f"Eden-{build}-Windows-msvc-x86_64.7z", f"Eden-{build}-Windows-clang-x86_64.7z",
+                 f"Eden-{build}-Linux-x86_64.AppImage", f"Eden-{build}-Linux-aarch64.AppImage"]
+    elif repo == "THZoria/NX_Firmware":
+        tag = f"20.{index}.0"
+        body = f"Firmware {tag}"
+        names = [f"Firmware.{tag}.zip"]
+    else:
+        tag = f"v1.{index}.0"
+        body = f"EmuMan {tag}"
+        names = [f"EmuMan-{tag}-Windows.exe", f"EmuMan-{tag}-Linux.AppImage"]
+
+    assets = []
+    for n, name in enumerate(names):
+        size = 40_000_000 + index * 1000 + n
+        assets.append({
+            "url": f"https://api.github.com/repos/{repo}/releases/assets/{index * 10 + n}",
+            "id": index * 10 + n, "name": name, "label": "", "uploader": uploader,
+            "content_type": "application/octet-stream", "state": "uploaded", "size": size,
+            "digest": "sha256:" + hashlib.sha256(name.encode()).hexdigest(),
+            "download_count": index * 7, "created_at": "2026-01-01T00:00:00Z", "updated_at": "2026-01-01T00:00:00Z",
+            "browser_download_url": f"https://github.com/{repo}/releases/download/{tag}/{name}",
+        })
+    return {
+        "url": f"https://api.github.com/repos/{repo}/releases/{index}", "id": index,
+        "html_url": f"https://github.com/{repo}/releases/tag/{tag}", "author": uploader,
+        "tag_name": tag, "name": tag, "draft": False, "prerelease": False,
+        "created_at": "2026-01-01T00:00:00Z", "published_at": "2026-01-01T00:00:00Z",
+        "assets": assets, "body": body,
+    }
+
+
+def synthesize_fixtures(count=120):
+    """Fixture set with the shape of the real API, newest release first."""
+    return {repo: [synthetic_release(repo, i) for i in range(count, 0, -1)] for repo in REPOS}
+
+
+def fixture_sources(directory=FIXTURES_DIR):
+    """Repo -> "recorded" or "synthetic", as load_fixtures() would pick them."""
+    return {repo: "recorded" if os.path.exists(os.path.join(directory, filename)) else "synthetic"
+            for repo, filename in REPOS.items()}
+
+
+def load_fixtures(directory=FIXTURES_DIR, count=120):
+    """Recorded fixtures (see record_fixtures.py) where available, synthetic ones otherwise."""
+    synthetic = None
+    fixtures = {}
+    for repo, filename in REPOS.items():
+        path = os.path.join(directory, filename)
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                fixtures[repo] = json.load(f)
+        else:
+            synthetic = synthetic or synthesize_fixtures(count)
+            fixtures[repo] = synthetic[repo]
+    return fixtures
+
+
+# =========================================
+#             Server
+# =========================================
+
+class StubStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.requests = 0
+            self.bytes_sent = 0
+            self.statuses = {}
+            self.paths = []
+
+    def record(self, path, status, size):
+        with self.lock:
+            self.requests += 1
+            self.bytes_sent += size
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+            self.paths.append(path)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body=b"", headers=None):
+        stub = self.server.stub
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        for key, value in stub.rate_limit_headers().items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+        stub.stats.record(self.path, status, len(body))
+
+    def do_GET(self):
+        stub = self.server.stub
+        if stub.latency:
+            time.sleep(stub.latency + random.uniform(0, stub.jitter))
+
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+
+        if stub.should_fail(url.path):
+            return self._send(502, b'{"message": "Server Error (injected)"}', {"Content-Type": "application/json"})
+        if not stub.consume_rate_limit():
+            body = b'{"message": "API rate limit exceeded (stub)"}'
+            return self._send(403, body, {"Content-Type": "application/json"})
+
+        match = re.match(r"^/repos/([^/]+/[^/]+)/releases(/latest)?$", url.path)
+        if not match or match.group(1) not in stub.fixtures:
+            return self._send(404, b'{"message": "Not Found"}', {"Content-Type": "application/json"})
+
+        releases = stub.fixtures[match.group(1)]
+        headers = {"Content-Type": "application/json; charset=utf-8"}
+        if match.group(2):
+            payload = releases[0] if releases else {}
+        else:
+            per_page = min(int(query.get("per_page", ["30"])[0]), 100)
+            page = int(query.get("page", ["1"])[0])
+            payload = releases[(page - 1) * per_page: page * per_page]
+            if page * per_page < len(releases):
+                headers["Link"] = f'<{stub.base_url}{url.path}?per_page={per_page}&page={page + 1}>; rel="next"'
+
+        body = json.dumps(payload).encode()
+        etag = '"%s"' % hashlib.sha1(body).hexdigest()
+        if stub.etags and self.headers.get("If-None-Match") == etag:
+            stub.refund_rate_limit()  # Conditional hits are free on the real API too
+            return self._send(304, headers={"ETag": etag})
+        if stub.etags:
+            headers["ETag"] = etag
+        self._send(200, body, headers)
+
+    def do_POST(self):
+        """The startup GraphQL query (app/core/github_api.py): aliased repository lookups only."""
+        stub = self.server.stub
+        payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if stub.latency:
+            time.sleep(stub.latency + random.uniform(0, stub.jitter))
+        if urlparse(self.path).path != "/graphql" or stub.should_fail("/graphql"):
+            return self._send(502, b'{"message": "Server Error (injected)"}', {"Content-Type": "application/json"})
+        if not stub.consume_rate_limit():
+            return self._send(403, b'{"message": "API rate limit exceeded (stub)"}', {"Content-Type": "application/json"})
+
+        count = payload.get("variables", {}).get("count", 30)
+        lookups = re.findall(r'(\w+): repository\(owner: "([^"]+)", name: "([^"]+)"\) \{ (\w+)', payload.get("query", ""))
+        data = {}
+        for alias, owner, name, field in lookups:
+            releases = stub.fixtures.get(f"{owner}/{name}")
+            if releases is None:
+                data[alias] = None
+            elif field == "releases":
+                data[alias] = {"releases": {"pageInfo": {"hasNextPage": len(releases) > count},
+                                            "nodes": [_graphql_release(r) for r in releases[:count]]}}
+            else:
+                data[alias] = {"latestRelease": _graphql_release(releases[0]) if releases else None}
+        self._send(200, json.dumps({"data": data}).encode(), {"Content-Type": "application/json"})
+
+
+def _graphql_release(release):
+    return {
+        "tagName": release["tag_name"], "url": release.get("html_url"), "description": release.get("body"),
+        "releaseAssets": {"nodes": [{"name": a["name"], "size": a["size"], "downloadUrl": a["browser_download_url"],
+                                     "digest": a.get("digest")} for a in release.get("assets", [])]},
+    }
+
+
+class GitHubStub:
+    """
+    latency/jitter: seconds added to every response.
+    error_rate: probability of a 502; fail_paths: path regexes that always fail.
+    etags: send ETags and answer If-None-Match with 304.
+    rate_limit: budget per window (None disables the headers); rate_window: window length.
+    """
+
+    def __init__(self, fixtures=None, latency=0.0, jitter=0.0, error_rate=0.0, fail_paths=(),
+                 etags=True, rate_limit=None, rate_window=3600, port=0):
+        self.fixtures = fixtures if fixtures is not None else load_fixtures()
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.fail_paths = [re.compile(p) for p in fail_paths]
+        self.etags = etags
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.stats = StubStats()
+        self._rate_lock = threading.Lock()
+        self.reset_rate_limit()
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), _Handler)
+        self.server.daemon_threads = True
+        self.server.stub = self
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}"
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # --- Fault injection ---
+
+    def should_fail(self, path):
+        if any(p.search(path) for p in self.fail_paths):
+            return True
+        return self.error_rate > 0 and random.random() < self.error_rate
+
+    # --- Rate limit ---
+
+    def reset_rate_limit(self, remaining=None):
+        with self._rate_lock:
+            self.remaining = self.rate_limit if remaining is None else remaining
+            self.reset_at = int(time.time()) + self.rate_window
+
+    def consume_rate_limit(self):
+        if self.rate_limit is None:
+            return True
+        with self._rate_lock:
+            if time.time() >= self.reset_at:
+                self.remaining, self.reset_at = self.rate_limit, int(time.time()) + self.rate_window
+            if self.remaining <= 0:
+                return False
+            self.remaining -= 1
+            return True
+
+    def refund_rate_limit(self):
+        if self.rate_limit is not None:
+            with self._rate_lock:
+                self.remaining = min(self.rate_limit, self.remaining + 1)
+
+    def rate_limit_headers(self):
+        if self.rate_limit is None:
+            return {}
+        with self._rate_lock:
+            return {"X-RateLimit-Limit": str(self.rate_limit), "X-RateLimit-Remaining": str(self.remaining),
+                    "X-RateLimit-Reset": str(self.reset_at), "X-RateLimit-Resource": "core"}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local GitHub API stand-in for EmuMan")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=int, default=None)
+    parser.add_argument("--no-etags", action="store_true")
+    args = parser.parse_args()
+
+    stub = GitHubStub(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                      rate_limit=args.rate_limit, etags=not args.no_etags, port=args.port)
+    print(f"GitHub stub listening on {stub.base_url} (EMUMAN_GITHUB_API={stub.base_url})")
+    try:
+        stub.server.serve_forever()
+    except KeyboardInterrupt:
+        stub.stop()
+        sys.exit(0)
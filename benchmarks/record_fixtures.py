@@ -0,0 +1,49 @@
+"""
+Record real GitHub API responses into benchmarks/fixtures/ for the stub server.
+
+Usage: python benchmarks/record_fixtures.py [--pages 2] [--token GH_TOKEN]
+Release listings are stored newest first, exactly as the API returns them.
+The files are not committed (they go stale with every release); without them the
+stub and benchmarks fall back to synthetic releases.
+"""
+import os
+import json
+import argparse
+
+import requests
+
+from github_stub import FIXTURES_DIR, REPOS
+
+API = "https://api.github.com"
+
+
+def record(repo, pages, headers):
+    releases = []
+    url = f"{API}/repos/{repo}/releases?per_page=100"
+    for _ in range(pages):
+        res = requests.get(url, headers=headers, timeout=30)
+        res.raise_for_status()
+        releases.extend(res.json())
+        url = res.links.get("next", {}).get("url")
+        if not url:
+            break
+    return releases
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record GitHub release fixtures")
+    parser.add_argument("--pages", type=int, default=2, help="Pages of 100 releases per repo")
+    parser.add_argument("--token", default=os.environ.get("GH_TOKEN"))
+    args = parser.parse_args()
+
+    headers = {"Accept": "application/vnd.github.v3+json"}
+    if args.token:
+        headers["Authorization"] = f"token {args.token}"
+
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    for repo, filename in REPOS.items():
+        releases = record(repo, args.pages, headers)
+        path = os.path.join(FIXTURES_DIR, filename)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(releases, f)
+        print(f"{repo}: {len(releases)} releases -> {path} ({os.path.getsize(path) / 1024:.0f} KB)")